@@ -20,43 +20,60 @@ Included Functions:
     [1] BackendService (class)
         [i] fetch_buses_to_user_destination_from_user_origin
         [ii] display_bus_on_map
-        [iii] calculate_time_difference
-        [iv] fetch_bus_details
-        [v] get_traffic_level
-        [vi] fetch_bus_attributes
+        [iii] fetch_bus_details
+        [iv] get_traffic_level
+        [v] fetch_bus_attributes
+        [vi] is_bus_serving_user_trip
+        [vii] fetch_buses_to_user_destination_from_user_origin_concurrently
+        [viii] fetch_arrival_estimates
+        [ix] fetch_route_guide
+        [x] fetch_journeys_to_user_destination_from_user_origin
+        [xi] fetch_nearest_bus_stops
+        [xii] fetch_buses_near_user
 
     [2] BusFareCalculator (class)
         [i] bus_fare_calculator
 
-.. versionupdated:: 1.3.0
+.. versionupdated:: 1.4.0
 
 Read about the working of the app's backend in :ref:`CroMa - Application backend`
 """
 
 import pandas as pd
 from application import application_support_dictionary
+from application.application_eta_engine import eta_engine
+from application.application_journey_planner import journey_planner
+from application.application_route_index import route_index
+from application.application_geocoder import stop_geocoder
+from application.application_spatial_index import bus_index, stop_index
+from application.application_traffic import traffic_level_service
 from application.application_database import (
-    retrieve_bus_total_delay,
-    retrieve_current_bus_status,
-    retrieve_last_stop_arrival_time,
-    retrieve_bus_total_delay,
-    retrieve_bus_route_id,
+    retrieve_active_bus_snapshots,
     retrieve_bus_data_from_sql_database,
-    retrieve_current_location,
-    retrieve_available_seats,
-    retrieve_passengers_count,
+    retrieve_bus_snapshot,
 )
+from hardware import service_time
 
 import firebase_admin
 from firebase_admin import credentials
 
-import datetime
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import folium
 from streamlit_folium import folium_static
-from geopy.geocoders import Nominatim
 
-import openrouteservice as ors
-from application import application_credentials
+
+# Maximum number of bus nodes read in parallel during a concurrent bus search
+BUS_SEARCH_MAX_WORKERS = 8
+# Seconds after which a bus whose node is still being read is left out of search
+BUS_SEARCH_TIMEOUT_PER_BUS = 2.0
+
+# Number of bus stops suggested to the user, nearest first
+NEAREST_BUS_STOPS_COUNT = 3
+# Kilometres around the user, within which the buses are listed as nearby
+NEARBY_BUSES_RADIUS_KM = 2.0
 
 
 class BackendService:
@@ -86,6 +103,7 @@ class BackendService:
         series of support dictionaries, firebase real time database and SQL database.
 
         .. versionadded:: 1.3.0
+        .. versionupdated:: 1.4.0
 
         Parameters:
             [str] boarding_point: Bus stop from which the passenger boards the bus
@@ -102,55 +120,252 @@ class BackendService:
             application_support_dictionary.all_bus_stops[boarding_point]
         )
 
+        # Read the real-time values of only the active buses, in a single round trip
+        bus_snapshots = retrieve_active_bus_snapshots(
+            buses_passing_through_boarding_point
+        )
+
         # Initialize an empty list to store the list of available buses
         available_buses_to_destination = []
 
-        # Iterate through all buses passing through the boarding point
+        # Add the buses that are active and within reach of the user's boarding point
         for bus_id in buses_passing_through_boarding_point:
-            # retrueve the current bus status
-            current_bus_status = retrieve_current_bus_status(bus_id)
+            bus_snapshot = bus_snapshots.get(bus_id)
 
-            # Continue the operation only if the bus is active at the moment
-            if current_bus_status == "Active":
-                # Fetch the route id assigned to the bus
-                selected_bus_route_id = retrieve_bus_route_id(bus_id)
+            if BackendService.is_bus_serving_user_trip(
+                bus_snapshot, boarding_point, dropping_point
+            ):
+                available_buses_to_destination.append(bus_id)
 
-                # Fetch the list of bus stops corresponding to this route id
-                all_stops_of_bus = application_support_dictionary.all_routes[
-                    selected_bus_route_id
-                ]
+        return available_buses_to_destination  # Return the list of all available buses
+
+    def fetch_journeys_to_user_destination_from_user_origin(
+        boarding_point, dropping_point
+    ):
+        """
+        Method to fetch the journeys to the user's destination, including transfers.
+
+        Unlike the direct search, the journeys may change buses at the stops shared
+        by routes. Live positions of all the active buses are read in one round
+        trip, and the journey planner returns the Pareto optimal journeys.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] boarding_point: Bus stop from which the passenger boards the bus
+            [str] dropping_point: Bus stop at which the passenger deboards the bus
+
+        Returns:
+            [list] journeys: Journey records, each arriving earlier with a transfer
+        """
+        # Read the real-time values of all the active buses, in a single round trip
+        bus_snapshots = retrieve_active_bus_snapshots(
+            application_support_dictionary.all_bus_id
+        )
+
+        return journey_planner.plan_journeys(
+            boarding_point, dropping_point, bus_snapshots
+        )
+
+    def fetch_nearest_bus_stops(latitude, longitude, k=NEAREST_BUS_STOPS_COUNT):
+        """
+        Method to fetch the bus stops nearest to the user, without any geocoding call.
+
+        The coordinates of the known stops are loaded into the spatial index on the
+        first call, and only the cells of the grid around the user are looked at.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] latitude: Latitude of the user, in degrees
+            [float] longitude: Longitude of the user, in degrees
+            [int] k: Number of bus stops to be returned
+
+        Returns:
+            [list] bus_stops: Tuples of the bus stop & its distance in km, nearest first
+        """
+        if len(stop_index) == 0:
+            stop_index.load(stop_geocoder.located_stops())
+
+        return stop_index.nearest(latitude, longitude, k)
+
+    def fetch_buses_near_user(latitude, longitude, radius_km=NEARBY_BUSES_RADIUS_KM):
+        """
+        Method to fetch the active buses within a distance from the user.
+
+        Live positions of all the active buses are read in one round trip, & each bus
+        is moved in the spatial index to the coordinates of the stop it last reported.
+        Buses that are inactive, or at a stop that isn't located, are removed.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] latitude: Latitude of the user, in degrees
+            [float] longitude: Longitude of the user, in degrees
+            [float] radius_km: Distance from the user, in kilometres
+
+        Returns:
+            [list] buses: Tuples of the Bus Id & its distance in km, nearest first
+
+        NOTE: Buses are located at their last reported stop, which is their position
+        """
+        # Read the real-time values of all the active buses, in a single round trip
+        bus_snapshots = retrieve_active_bus_snapshots(
+            application_support_dictionary.all_bus_id
+        )
+        located_stops = stop_geocoder.located_stops()
+
+        for bus_id in application_support_dictionary.all_bus_id:
+            bus_snapshot = bus_snapshots.get(bus_id)
+            coordinates = None
+
+            if bus_snapshot is not None:
+                coordinates = located_stops.get(bus_snapshot.current_location)
+
+            if coordinates is None:
+                bus_index.remove(bus_id)
+            else:
+                bus_index.insert(bus_id, *coordinates)
+
+        return bus_index.within_radius(latitude, longitude, radius_km)
+
+    def is_bus_serving_user_trip(bus_snapshot, boarding_point, dropping_point):
+        """
+        Method to check if a bus can take the user from boarding to dropping point.
+
+        The bus is considered to be serving the trip, if it is active, is yet to pass
+        the user's dropping point and is within three stops of the boarding point.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [BusSnapshot] bus_snapshot: Real-time values of the bus being checked
+            [str] boarding_point: Bus stop from which the passenger boards the bus
+            [str] dropping_point: Bus stop at which the passenger deboards the bus
+
+        Returns:
+            [bool] is_serving: True if the bus serves the user's trip, else False
+
+        NOTE: Buses missing from the real-time database are never serving the trip
+        """
+        # Continue the operation only if the bus is active at the moment
+        if bus_snapshot is None or bus_snapshot.current_bus_status != "Active":
+            return False
+
+        # Check the bus's position against the precomputed window of its route
+        return route_index.is_bus_serving_trip(
+            bus_snapshot.current_route_id,
+            bus_snapshot.current_location,
+            boarding_point,
+            dropping_point,
+        )
+
+    def fetch_buses_to_user_destination_from_user_origin_concurrently(
+        boarding_point,
+        dropping_point,
+        max_workers=BUS_SEARCH_MAX_WORKERS,
+        timeout_per_bus=BUS_SEARCH_TIMEOUT_PER_BUS,
+    ):
+        """
+        Method to fetch buses through user's origin & destination, reading in parallel.
+
+        The node of each bus passing through the boarding point is read on a bounded
+        thread pool. A bus whose read takes longer than the timeout, or which fails,
+        is left out of the results, so that one slow node can't stall the search.
+        The whole search is bounded too, by the time the reads would take if every
+        worker ran until its timeout, so reads queued behind hung ones are dropped.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] boarding_point: Bus stop from which the passenger boards the bus
+            [str] dropping_point: Bus stop at which the passenger deboards the bus
+            [int] max_workers: Maximum number of bus nodes to be read in parallel
+            [float] timeout_per_bus: Seconds to wait for each read once it starts
+
+        Returns:
+            [dict] bus_snapshots: BusSnapshot records of the buses through both stops,
+            keyed by the Bus Id, in the order listed in the support dictionary
 
-                # Retrieve the current location of the bus
-                current_bus_location = retrieve_current_location(bus_id)
-                # Find the numerical index corresponding to this location
-                int_current_bus_location = (
-                    all_stops_of_bus.index(current_bus_location) + 1
+        NOTE: Reads left behind after a timeout finish in the background and are ignored
+        """
+        # Fetch the list of buses that pass through user's boarding point
+        buses_passing_through_boarding_point = (
+            application_support_dictionary.all_bus_stops[boarding_point]
+        )
+
+        # Time at which the read of each bus node was picked up by a worker thread
+        read_started_at = {}
+
+        def retrieve_bus_snapshot_and_record_start(bus_id):
+            read_started_at[bus_id] = time.monotonic()
+            return retrieve_bus_snapshot(bus_id)
+
+        # Reads queued behind hung ones have no start time, so bound the whole search
+        search_deadline = time.monotonic() + timeout_per_bus * math.ceil(
+            len(buses_passing_through_boarding_point) / max_workers
+        )
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        pending_reads = {
+            executor.submit(retrieve_bus_snapshot_and_record_start, bus_id): bus_id
+            for bus_id in buses_passing_through_boarding_point
+        }
+
+        bus_snapshots = {}  # Initialize an empty dictionary to store the snapshots
+
+        try:
+            while pending_reads:
+                # Collect the completed reads first, so none is dropped as timed out
+                for future in [future for future in pending_reads if future.done()]:
+                    bus_id = pending_reads.pop(future)
+
+                    try:
+                        bus_snapshots[bus_id] = future.result()
+                    except Exception:  # pylint: disable=broad-except
+                        pass  # Leave out the bus if its node could not be read
+
+                current_time = time.monotonic()
+
+                # Give up on the running & queued reads, once the search runs too long
+                if current_time >= search_deadline:
+                    break
+
+                # Give up on the reads which have been running for longer than timeout
+                for future, bus_id in list(pending_reads.items()):
+                    if (
+                        bus_id in read_started_at
+                        and current_time - read_started_at[bus_id] >= timeout_per_bus
+                    ):
+                        del pending_reads[future]
+
+                if not pending_reads:
+                    break
+
+                # Wait for the next read to complete, or the earliest one to time out
+                read_deadlines = [
+                    read_started_at[bus_id] + timeout_per_bus
+                    for bus_id in pending_reads.values()
+                    if bus_id in read_started_at
+                ]
+                wait_timeout = max(
+                    0.0, min(read_deadlines + [search_deadline]) - current_time
                 )
 
-                # Check if the user's dropping point is present in the bus's route map
-                if dropping_point not in all_stops_of_bus[int_current_bus_location:]:
-                    break  # stop computing if it's not present
-
-                # Find the numerical index corresponding to the user's boarding point
-                index_of_user_boarding_point = all_stops_of_bus.index(boarding_point)
-
-                # Check if the bus is currently within three stops from the user's boarding point
-                if index_of_user_boarding_point < 3:
-                    lookup_three_bus_stops = all_stops_of_bus[
-                        : index_of_user_boarding_point + 1
-                    ]
-                else:
-                    lookup_three_bus_stops = all_stops_of_bus[
-                        index_of_user_boarding_point
-                        - 3 : index_of_user_boarding_point
-                        + 1
-                    ]
-
-                # If within three stops, add the bus id of that bus to the list
-                if current_bus_location in lookup_three_bus_stops:
-                    available_buses_to_destination.append(bus_id)
+                wait(pending_reads, timeout=wait_timeout, return_when=FIRST_COMPLETED)
 
-        return available_buses_to_destination  # Return the list of all available buses
+        finally:
+            # Return without waiting for the reads that were given up on
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # Keep the order of the buses as listed, along with the snapshots read
+        return {
+            bus_id: bus_snapshots[bus_id]
+            for bus_id in buses_passing_through_boarding_point
+            if BackendService.is_bus_serving_user_trip(
+                bus_snapshots.get(bus_id), boarding_point, dropping_point
+            )
+        }
 
     def display_bus_on_map(city):
         """
@@ -167,14 +382,11 @@ class BackendService:
         Returns:
             [folium.folium.map] map: Map with the marker indicating current location
 
-        NOTE: City is geocoded to get the latitude & longitude for displaying marker
+        NOTE: City is located using the stop geocoder, which caches the coordinates
 
         """
-        # Use geocoding to get the coordinates of the city
-        geolocator = Nominatim(user_agent="my-app")
-        location = geolocator.geocode(city)
         # Fetch the latitude and longitude of the current location
-        lat, lon = location.latitude, location.longitude
+        lat, lon = stop_geocoder.locate(city)
 
         # Create a map object using the python folium package
         map = folium.Map(location=[lat, lon], zoom_start=17)
@@ -184,39 +396,58 @@ class BackendService:
 
         return map  # Return the folium.folium.map object
 
-    def calculate_time_difference(time1, time2):
+    def fetch_arrival_estimates(bus_snapshots, boarding_point, dropping_point):
         """
-        Function to calculate difference between times and return output as minutes
+        Method to estimate the arrivals of all the listed buses, in a single call.
 
-        Two arguments representing time in HH:MM format, type-casted as strings are
-        passed into the function. Difference is calculated after converting to mins.
+        The estimates are computed together by the ETA engine, from the schedules
+        held as arrays of offsets, and are passed on to the fetch_bus_details.
 
-        .. versionadded:: 1.3.0
+        .. versionadded:: 1.4.0
 
         Parameters:
-            [str] time1: The subtrahend string value of the time var, in HH:MM format
-            [str] time2: The minuend value of time casted as string in HH:MM format
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+            [str] boarding_point: Bus stop from which the passenger boards the bus
+            [str] dropping_point: Bus stop at which the passenger deboards the bus
 
         Returns:
-            [int] difference_minutes: The total difference in time returned as mins
-
-        NOTE: Time difference is returned as mins. Using seconds increases accuracy.
+            [dict] arrival_estimates: ArrivalEstimate records keyed by the Bus Id
+        """
+        return eta_engine.estimate_arrivals(
+            bus_snapshots, boarding_point, dropping_point
+        )
 
+    def fetch_route_guide(bus_snapshot):
         """
-        # Split the subtrahend and minuend into hours and minutes & map as integers
-        hours1, minutes1 = map(int, time1.split(":"))
-        hours2, minutes2 = map(int, time2.split(":"))
+        Method to fetch the timetable of the bus, for all the stops in its route.
 
-        # Convert the time values for both operands into minutes for calculation
-        total_minutes1 = hours1 * 60 + minutes1
-        total_minutes2 = hours2 * 60 + minutes2
+        The timetable is memoized by the ETA engine, against the route, location,
+        arrival time at the last stop and the delay of the bus, so that the page
+        redraws reuse it until the bus reports any of these values again.
 
-        difference_minutes = total_minutes2 - total_minutes1  # Calculate difference
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [BusSnapshot] bus_snapshot: Pre-fetched real-time values of the bus
 
-        # Return the calculated time difference as minutes
-        return difference_minutes
+        Returns:
+            [tuple] route_guide: RouteGuideStop records, None if it isn't scheduled
+        """
+        return eta_engine.route_timetable(
+            bus_snapshot.current_route_id,
+            bus_snapshot.current_location,
+            bus_snapshot.last_stop_arrival_time,
+            bus_snapshot.delay_in_mins,
+        )
 
-    def fetch_bus_details(bus_id, boarding_point, dropping_point):
+    def fetch_bus_details(
+        bus_id,
+        boarding_point,
+        dropping_point,
+        bus_snapshot=None,
+        bus_data=None,
+        arrival_estimate=None,
+    ):
         """
         Method to fetch necessary bus details, to be used in the web app's frontend
 
@@ -225,11 +456,15 @@ class BackendService:
         be used for displaying information on the frontend of the users application.
 
         .. versionadded:: 1.3.0
+        .. versionupdated:: 1.4.0
 
         Parameters:
             [str] bus_id: The id tagged to a particular bus
             [str] boarding_point: Bus stop from which the passenger boards the bus
             [str] deboarding_point: Bus stop at which a passenger deboards the bus
+            [BusSnapshot] bus_snapshot: Pre-fetched real-time values of the bus
+            [tuple] bus_data: Pre-fetched bus operator and bus type from SQL DB
+            [ArrivalEstimate] arrival_estimate: Pre-computed arrival of the bus
 
         Returns:
             [str] bus_name: Name of the bus
@@ -245,13 +480,19 @@ class BackendService:
         NOTE: Time difference is returned as mins. Using seconds increases accuracy.
 
         """
+        # Read all real-time values of the bus at once, unless already fetched
+        if bus_snapshot is None:
+            bus_snapshot = retrieve_bus_snapshot(bus_id)
+
         # Retrieve the route id assigned to the particular bus
-        bus_route_id = retrieve_bus_route_id(bus_id)
+        bus_route_id = bus_snapshot.current_route_id
         # Fetch the last stop in the bus's route
         bus_last_stop = application_support_dictionary.all_routes[bus_route_id][-1]
 
-        # Fetch the operator and type of the bus
-        bus_operator, bus_type = retrieve_bus_data_from_sql_database(bus_id)
+        # Fetch the operator and type of the bus, unless already fetched
+        if bus_data is None:
+            bus_data = retrieve_bus_data_from_sql_database(bus_id)
+        bus_operator, bus_type = bus_data
         # Lexically fix the bus type before showing to the end user
         bus_type_shortened = " ".join(bus_type.split()[:-1])
 
@@ -259,57 +500,28 @@ class BackendService:
         bus_name = bus_last_stop + " " + bus_type_shortened
 
         # Fetch the current location of the bus
-        bus_current_location = retrieve_current_location(bus_id)
-        # Fetch the list of all bus stops in the route
-        stops_in_route = application_support_dictionary.bus_timings.get(bus_route_id)
-
-        # Fetch the time required for the bus to reach bus's current location
-        time_from_origin_to_reach_bus_current_loc = stops_in_route[bus_current_location]
-        # Fetch the time required for the bus to reach the user's destination
-        time_from_origin_to_reach_user_destination = stops_in_route[dropping_point]
-
-        # Calculate the mins required to reach the user's destination from bus's current location
-        minutes_required_to_reach_user_destination_from_bus_current_loc = (
-            time_from_origin_to_reach_user_destination
-            - time_from_origin_to_reach_bus_current_loc
-            + retrieve_bus_total_delay(bus_id)
-        )
+        bus_current_location = bus_snapshot.current_location
 
-        # Determine the current time
-        current_time = datetime.datetime.now().time()
-        # calculate the estimated time of arrival of the bus at user destination
-        eta_user_destination = datetime.datetime.combine(
-            datetime.date.today(), current_time
-        ) + datetime.timedelta(
-            minutes=int(minutes_required_to_reach_user_destination_from_bus_current_loc)
-        )
+        # Estimate the arrival of the bus with the ETA engine, unless already done
+        if arrival_estimate is None:
+            arrival_estimate = eta_engine.estimate_arrivals(
+                {bus_id: bus_snapshot}, boarding_point, dropping_point
+            )[bus_id]
 
-        # Parse the datetime string into HH:MM format
-        estimated_time_of_arrival_at_user_destination = eta_user_destination.strftime(
-            "%H:%M"
+        # Format the estimated time of arrival at the user's destination as HH:MM
+        estimated_time_of_arrival_at_user_destination = service_time.format_clock(
+            arrival_estimate.arrival_time_at_dropping_point
         )
 
-        # Fetch the estimated time required to reach the user's boarding point from the origin
-        time_from_origin_to_reach_user_boarding_point = stops_in_route[boarding_point]
-        # Retrieve the arrival time of the bus at the last stop
-        arrival_time_at_last_stop = retrieve_last_stop_arrival_time(bus_id)
-        # Calculate the time in minutes sibnce the bus left the last stop
-        minutes_since_bus_left_last_stop = BackendService.calculate_time_difference(
-            arrival_time_at_last_stop.strftime("%H:%M"),
-            datetime.datetime.now().strftime("%H:%M"),
-        )
-        # Calculate the time in minurtes required for the bus to reach the user's boarding point
+        # Fetch the mins required for the bus to reach the user's boarding point
         minutes_required_to_reach_user_boarding_point_from_bus_current_loc = (
-            time_from_origin_to_reach_user_boarding_point
-            - time_from_origin_to_reach_bus_current_loc
-            - minutes_since_bus_left_last_stop
-            + retrieve_bus_total_delay(bus_id)
+            arrival_estimate.minutes_to_reach_boarding_point
         )
 
         # Retrieve the total number of seats available in the bus
-        available_seats_in_bus = retrieve_available_seats(bus_id)
+        available_seats_in_bus = bus_snapshot.available_seats
         # Retrieve the total number of passengers aboard the bus
-        total_passengers_in_bus = retrieve_passengers_count(bus_id)
+        total_passengers_in_bus = bus_snapshot.passengers_count
 
         # Calculate the total number of seats in the bus
         total_seats_in_bus = total_passengers_in_bus + available_seats_in_bus
@@ -336,6 +548,7 @@ class BackendService:
         location using the data from openrouteservice api with driving-car profile
 
         .. versionadded:: 1.3.0
+        .. versionupdated:: 1.4.0
 
         Parameters:
             [str] origin: Bus stop from which the passenger boards the bus
@@ -344,46 +557,15 @@ class BackendService:
         Returns:
             [int] traffic_level: Traffic level between the origin, and destination
 
-        NOTE: The output is highly susceptible to changes made to the ORS API data
+        NOTE: Last known traffic level is returned, while the cache is refreshed
 
         """
-        # Fetch the API key for accessing the Open Route Service API
-        api_key = application_credentials.OPENROUTESERVICE_API_KEY
-        client = ors.Client(key=api_key)  # Set up the client
-
-        # Determine co-ordinates fro the origin
-        origin_coords = client.pelias_search(text=origin)["features"][0]["geometry"][
-            "coordinates"
-        ]
-        # Determine co-ordinates fro the destination
-        destination_coords = client.pelias_search(text=destination)["features"][0][
-            "geometry"
-        ]["coordinates"]
-
-        # Fetch the response from the API
-        response = client.directions(
-            coordinates=[origin_coords, destination_coords],
-            profile="driving-car",
-            units="km",
-            instructions=True,
-            options={"avoid_features": ["tollways"]},
-        )
-
-        # Retrieve the duration_no_traffic parameter
-        duration_no_traffic = response["routes"][0]["summary"]["duration"]
-        # Simulate traffic condition by considering historical average
-        historical_traffic_factor = (
-            1.2  # Adjust this factor based on your estimation of traffic conditions
-        )
-
-        # Calculate the duration with traffic
-        duration_with_traffic = duration_no_traffic * historical_traffic_factor
-        # Calculate the traffic level by subtracting duration_no_traffic from duration_with_traffic
-        traffic_level = duration_with_traffic - duration_no_traffic
+        # Served from memory, the ORS API is called by the service in background
+        traffic_level = traffic_level_service.get_traffic_level(origin, destination)
 
         return traffic_level
 
-    def fetch_bus_attributes(bus_id):
+    def fetch_bus_attributes(bus_id, bus_snapshot=None):
         """
         Method to fetch necessary bus attributes, to be used to get bus information
 
@@ -394,6 +576,7 @@ class BackendService:
 
         Parameters:
             [str] bus_id: The id tagged to a particular bus
+            [BusSnapshot] bus_snapshot: Pre-fetched real-time values of the bus
 
         Returns:
             [str] bus_name: Name of the bus
@@ -414,8 +597,12 @@ class BackendService:
         NOTE: Time difference is returned as mins. Using seconds increases accuracy.
 
         """
+        # Read all real-time values of the bus at once, unless already fetched
+        if bus_snapshot is None:
+            bus_snapshot = retrieve_bus_snapshot(bus_id)
+
         # Fetch the route id corresponding to the bus
-        bus_route_id = retrieve_bus_route_id(bus_id)
+        bus_route_id = bus_snapshot.current_route_id
         # Bus terminal location
         bus_last_stop = application_support_dictionary.all_routes[bus_route_id][-1]
 
@@ -435,19 +622,21 @@ class BackendService:
         # Fetch the terminal location of the bus from firebase database
         bus_terminal_location = all_bus_stops_list[-1]
         # Fetch the current location of the bus from firebase database
-        bus_current_location = retrieve_current_location(bus_id)
+        bus_current_location = bus_snapshot.current_location
+        # Fetch the position of the current location from the route index
+        bus_current_position = route_index.stop_position(
+            bus_route_id, bus_current_location
+        )
         # Fetch the upcoming bus stop for the bus
-        bus_next_location = all_bus_stops_list[
-            all_bus_stops_list.index(bus_current_location) + 1
-        ]
+        bus_next_location = all_bus_stops_list[bus_current_position + 1]
 
         # Calculate the total delay in the bus's journey at the time instance
-        total_delay_in_current_journey = retrieve_bus_total_delay(bus_id)
+        total_delay_in_current_journey = bus_snapshot.delay_in_mins
 
         # Retrieve the total number of passengers in the bus
-        total_passengers_in_bus = retrieve_passengers_count(bus_id)
+        total_passengers_in_bus = bus_snapshot.passengers_count
         # Retrieve the count of available seats in the bus
-        available_seats_in_bus = retrieve_available_seats(bus_id)
+        available_seats_in_bus = bus_snapshot.available_seats
         # Calculate the total number of seats available in the bus
         total_seats_in_bus = total_passengers_in_bus + available_seats_in_bus
 
@@ -456,8 +645,7 @@ class BackendService:
 
         # Calculate the percentage of journey already traversed by the bus
         percentage_journey_completed = (
-            (all_bus_stops_list.index(bus_current_location) + 1)
-            / len(all_bus_stops_list)
+            (bus_current_position + 1) / len(all_bus_stops_list)
         ) * 100
 
         return (
@@ -519,12 +707,9 @@ class BusFareCalculator:
         # dynamic_cost_multiplier shows no. of stops after which costs increases
         dynamic_cost_multiplier = 3  # The cost is set to increase after 3 stops
 
-        # List of all stops in the selected route id
-        stops_list = list(application_support_dictionary.all_routes[route_id])
-
         # The index values corresponding to the coarding and deboarding points
-        user_starting_point = stops_list.index(user_starting_point)
-        user_destination = stops_list.index(user_destination)
+        user_starting_point = route_index.stop_position(route_id, user_starting_point)
+        user_destination = route_index.stop_position(route_id, user_destination)
 
         # routeway_stop_count gives no. of stops between origin, and destination
         routeway_stop_count = abs(user_destination - user_starting_point)
@@ -14,6 +14,7 @@
 """
 This module contains methods for performing CRUD operations on firebase database.
 It also contains methods for authenticatinng the users & selective data fetching.
+The bus state is read from the configured store, which is firebase by default.
 NOTE: Firebase authentication uses app mail/password for authenticating the user.
 
 Included Functions:
@@ -25,20 +26,127 @@ Included Functions:
     [6] retrieve_passengers_count
     [7] retrieve_bus_total_delay
     [8] retrieve_last_stop_arrival_time
+    [9] retrieve_bus_snapshot
+    [10] retrieve_bus_snapshots
+    [11] retrieve_bus_data_many
+    [12] retrieve_fleet_staleness
+    [13] retrieve_active_bus_snapshots
+    [14] retrieve_bus_snapshots_with_seats
+    [15] retrieve_bus_ids
+    [16] retrieve_read_stats
+    [17] retrieve_coalescing_stats
+    [18] retrieve_staleness_age
+    [19] retrieve_read_latency_stats
+
+    [20] bus_reads (module-level instance)
+    [21] bus_values (module-level instance)
 
 .. versionadded:: 1.2.0
-.. versionupdate:: 1.3.0
+.. versionupdate:: 1.4.0
 
 Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
 """
 
-import sqlite3
 import datetime
 from datetime import datetime
-from firebase_admin import db
 
-
-def retrieve_current_bus_status(bus_id):
+from database import bus_state_store
+from database import sql_database
+from database.sql_database import retrieve_bus_data_many  # pylint: disable=unused-import
+from database.firebase_database import BusSnapshot  # pylint: disable=unused-import
+from database.firebase_fleet_mirror import fleet_mirror
+from database.firebase_conditional_reader import conditional_reader
+from database.database_cache import (
+    InFlightCallTimeout,
+    SingleFlight,
+    StaleWhileRevalidateCache,
+)
+from database.hedged_reader import ReadDeadlineExceeded, hedged_reader
+
+# Name under which the complete node of a bus is cached, along with its fields
+BUS_SNAPSHOT_FIELD = "bus_snapshot"
+
+# Seconds for which the values of each field are served, before being refreshed
+FIELD_FRESHNESS_BUDGETS = {
+    "current_route_id": 300.0,  # Changes once per trip
+    "current_bus_status": 60.0,  # Changes at the start & the end of the trip
+    "delay_in_mins": 30.0,
+    "last_stop_arrival_time": 30.0,
+    "current_location": 10.0,  # Changes every few minutes
+    "available_seats": 5.0,  # Changes with every ticket printed
+    "passengers_count": 5.0,
+    BUS_SNAPSHOT_FIELD: 5.0,  # Node is as fresh as its fastest changing field
+}
+
+# Identical reads made at the same time by the sessions share one database call
+bus_reads = SingleFlight()
+
+
+def _read_bus_field_from_store(bus_id, field):
+    # Read the store through its module, so that the configured store is used
+    store = bus_state_store.bus_state_store
+
+    if field == BUS_SNAPSHOT_FIELD:
+        return store.retrieve_bus_snapshot(bus_id)
+    return store.retrieve_field(bus_id, field)
+
+
+def _uses_local_store():
+    # Local stores are read without a round trip, so they aren't placed behind caches
+    return not bus_state_store.bus_state_store.is_remote
+
+
+def _load_bus_value(bus_id, field, deadline=None):
+    # Download the node only if it has changed, sharing the read among sessions
+    read_function, read_args = _read_bus_field_from_store, (bus_id, field)
+
+    if deadline is None:
+        deadline = hedged_reader.deadline
+
+    # Concurrent sessions reading the same value wait on the same database call,
+    # which is abandoned after the deadline, and hedged if it's running slow.
+    # Sessions joining a call in flight give up on it at their own deadline
+    try:
+        return bus_reads.do(
+            (bus_id, field),
+            hedged_reader.read,
+            field,
+            read_function,
+            *read_args,
+            wait_timeout=deadline,
+            deadline=deadline,
+        )
+
+    except InFlightCallTimeout as error:
+        raise ReadDeadlineExceeded(
+            field + " read did not complete within " + str(deadline) + "s"
+        ) from error
+
+
+# Values of the bus fields, served right away and refreshed in the background
+bus_values = StaleWhileRevalidateCache(_load_bus_value, FIELD_FRESHNESS_BUDGETS)
+
+
+def _read_bus_field(bus_id, field, deadline=None):
+    if _uses_local_store():
+        return _read_bus_field_from_store(bus_id, field)
+
+    # Serve the value from the fleet mirror, without a round trip, once it's in sync
+    if fleet_mirror.is_synced():
+        return fleet_mirror.retrieve_field(bus_id, field)
+
+    try:
+        return bus_values.get((bus_id, field), deadline)
+
+    except ReadDeadlineExceeded:
+        # Fall back to the value read the last time, however old it may be
+        last_value = bus_values.peek((bus_id, field), ReadDeadlineExceeded)
+        if last_value is ReadDeadlineExceeded:
+            raise
+        return last_value
+
+
+def retrieve_current_bus_status(bus_id, deadline=None):
     """
     Method to retrieve current value of passengers count from Firebase database.
 
@@ -46,26 +154,26 @@ def retrieve_current_bus_status(bus_id):
     the passengers count of the bus. Only the changed values, are to be updated.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
 
     Returns:
         None -> Retrieve passengers count, from the real-time firebase database
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    ref = db.reference(bus_id)  # Create a reference to the key node of the database
-
-    # Create a reference to get the current bus status for the child node
-    db_current_bus_status = ref.child("current_bus_status").get()
+    # Get the current bus status of the bus, from the fleet mirror or database
+    db_current_bus_status = _read_bus_field(bus_id, "current_bus_status", deadline)
 
     return (
         db_current_bus_status  # Return value of the referenced bus_id from the database
     )
 
 
-def retrieve_bus_route_id(bus_id):
+def retrieve_bus_route_id(bus_id, deadline=None):
     """
     Method to retrieve current value of the bus route id from Firebase database.
 
@@ -73,26 +181,26 @@ def retrieve_bus_route_id(bus_id):
     the specific route id of that bus. Only the changed value, is to be updated.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
 
     Returns:
         None -> Retrieve the bus route id, from the real-time firebase database
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    ref = db.reference(bus_id)  # Create a reference to the key node of the database
-
-    # Create a reference to get the route id for the child node
-    db_current_route_id = ref.child("current_route_id").get()
+    # Get the current route id of the bus, from the fleet mirror or database
+    db_current_route_id = _read_bus_field(bus_id, "current_route_id", deadline)
 
     return (
         db_current_route_id  # Return value of the referenced bus_id from the database
     )
 
 
-def retrieve_current_location(bus_id):
+def retrieve_current_location(bus_id, deadline=None):
     """
     Method to retrieve the current value of current loc from Firebase database.
 
@@ -100,19 +208,19 @@ def retrieve_current_location(bus_id):
     the current location of the bus. Only the changed values, are to be updated.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
 
     Returns:
         None -> Retrieve current location, from the real-time firebase database
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    ref = db.reference(bus_id)  # Create a reference to the key node of the database
-
-    # Create a reference to get the current location value for the child node
-    db_current_location = ref.child("current_location").get()
+    # Get the current location of the bus, from the fleet mirror or database
+    db_current_location = _read_bus_field(bus_id, "current_location", deadline)
 
     return (
         db_current_location  # Return value of the referenced bus_id from the database
@@ -127,6 +235,7 @@ def retrieve_bus_data_from_sql_database(bus_id):
     the corresponding data of the bus. Only the changed value, is to be updated.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to uniquely identify the buses in SQL DBMS
@@ -136,23 +245,11 @@ def retrieve_bus_data_from_sql_database(bus_id):
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    conn = sqlite3.connect("croma_playground.db")
-    cursor = conn.cursor()  # Connect to the SQL database
+    # Lookups run on the pooled, read-only connections of the SQL database module
+    return sql_database.retrieve_bus_data_from_sql_database(bus_id)
 
-    # Retrieve specific values from the table
-    select_query = """
-        SELECT BusOperator, BusType
-        FROM Bus
-        WHERE BusId = ?
-    """
-    cursor.execute(select_query, (bus_id,))
-    result = cursor.fetchone()
-
-    # Close the database connection
-    return result
 
-
-def retrieve_available_seats(bus_id):
+def retrieve_available_seats(bus_id, deadline=None):
     """
     Method to retrieve the available seats current value from Firebase database.
 
@@ -160,24 +257,24 @@ def retrieve_available_seats(bus_id):
     the available seats of this bus. Only the changed values, are to be updated.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
 
     Returns:
         None -> Retrieve passengerd count, from the real-time firebase database
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    ref = db.reference(bus_id)  # Create a reference to the key node of the database
-
-    # Create a reference to get the available seats value for the child node
-    db_available_seats = ref.child("available_seats").get()
+    # Get the available seats of the bus, from the fleet mirror or database
+    db_available_seats = _read_bus_field(bus_id, "available_seats", deadline)
 
     return db_available_seats  # Return value of the referenced bus_id from the database
 
 
-def retrieve_passengers_count(bus_id):
+def retrieve_passengers_count(bus_id, deadline=None):
     """
     Method to retrieve current value of passengers count from Firebase database.
 
@@ -185,26 +282,26 @@ def retrieve_passengers_count(bus_id):
     the passengers count of the bus. Only the changed values, are to be updated.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
 
     Returns:
         None -> Retrieve passengers count, from the real-time firebase database
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    ref = db.reference(bus_id)  # Create a reference to the key node of the database
-
-    # Create a reference to get the  passenger count value for the child node
-    db_passengers_count = ref.child("passengers_count").get()
+    # Get the passengers count of the bus, from the fleet mirror or database
+    db_passengers_count = _read_bus_field(bus_id, "passengers_count", deadline)
 
     return (
         db_passengers_count  # Return value of the referenced bus_id from the database
     )
 
 
-def retrieve_bus_total_delay(bus_id):
+def retrieve_bus_total_delay(bus_id, deadline=None):
     """
     Method to retrieve the total delay in current journey from Firebase database.
 
@@ -212,26 +309,26 @@ def retrieve_bus_total_delay(bus_id):
     the total delay in the journey of the bus. Only changed values, are updated.
 
     .. versionadded:: 1.3.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
 
     Returns:
         None -> Retrieve bus's total delay from the real-time firebase database
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    ref = db.reference(bus_id)  # Create a reference to the key node of the database
-
-    # Create a reference to get the delay in minutes for the child node
-    db_passengers_count = ref.child("delay_in_mins").get()
+    # Get the delay in mins of the bus, from the fleet mirror or database
+    db_passengers_count = _read_bus_field(bus_id, "delay_in_mins", deadline)
 
     return (
         db_passengers_count  # Return value of the referenced bus_id from the database
     )
 
 
-def retrieve_last_stop_arrival_time(bus_id):
+def retrieve_last_stop_arrival_time(bus_id, deadline=None):
     """
     Method to retrieve the arrival time at the last stop from Firebase database.
 
@@ -239,19 +336,235 @@ def retrieve_last_stop_arrival_time(bus_id):
     bus's arrival time at last stop. Only the changed values, are to be updated.
 
     .. versionadded:: 1.3.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
 
     Returns:
         None -> Retrieve the last stop arrival time from the real-time database
 
     NOTE: Users needs to be authenticated, for performing this update operation
     """
-    ref = db.reference(bus_id)  # Create a reference to the key node of the database
-
-    # Create a reference to get the last stop arrival time for the child node
-    db_last_stop_arrival_time = ref.child("last_stop_arrival_time").get()
+    # Get the last stop arrival time of the bus, from the fleet mirror or database
+    db_last_stop_arrival_time = _read_bus_field(
+        bus_id, "last_stop_arrival_time", deadline
+    )
 
     # Convert the datetime string into datetime object
     return datetime.strptime(db_last_stop_arrival_time, "%Y-%m-%d %H:%M:%S")
+
+
+def retrieve_bus_snapshot(bus_id, deadline=None):
+    """
+    Method to retrieve all real-time values of a bus in a single database read.
+
+    The values are served from the fleet mirror while it is in sync, otherwise
+    from a cache refreshed in the background, which reads the node by its ETag.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus Id is used to initialize a child node in the database
+        [float] deadline: Seconds to wait for the database, default if not given
+
+    Returns:
+        [BusSnapshot] bus_snapshot: Real-time state of the bus, None if missing
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    if fleet_mirror.is_synced() and not _uses_local_store():
+        return fleet_mirror.retrieve_bus_snapshot(bus_id)
+
+    # Serve the cached node, which is refreshed in the background when stale
+    return _read_bus_field(bus_id, BUS_SNAPSHOT_FIELD, deadline)
+
+
+def retrieve_bus_snapshots(bus_ids):
+    """
+    Method to retrieve the real-time values of multiple buses in one database read.
+
+    The values are served from the fleet mirror while it is in sync, otherwise
+    the root node is read once, and nodes of the requested buses are picked.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids whose nodes are to be read from the database
+
+    Returns:
+        [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    if fleet_mirror.is_synced() and not _uses_local_store():
+        return fleet_mirror.retrieve_bus_snapshots(bus_ids)
+
+    return bus_state_store.bus_state_store.retrieve_bus_snapshots(bus_ids)
+
+
+def retrieve_fleet_staleness():
+    """
+    Method to retrieve the seconds since the fleet mirror last heard from the db.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        [float] staleness: Age of the mirrored values, None if reads use the db
+    """
+    if not fleet_mirror.is_synced() or _uses_local_store():
+        return None  # Values are read from the database, and are always current
+
+    return fleet_mirror.staleness()
+
+
+def retrieve_active_bus_snapshots(bus_ids):
+    """
+    Method to retrieve the real-time values of the listed buses, which are active.
+
+    The values are served from the fleet mirror while it is in sync, otherwise an
+    indexed query is run, so that the inactive buses are filtered by the server.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids whose nodes are to be read from the database
+
+    Returns:
+        [dict] bus_snapshots: BusSnapshot records of active buses, keyed by Bus Id
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    if fleet_mirror.is_synced() and not _uses_local_store():
+        bus_snapshots = fleet_mirror.retrieve_bus_snapshots(bus_ids)
+        return {
+            bus_id: bus_snapshot
+            for bus_id, bus_snapshot in bus_snapshots.items()
+            if bus_snapshot.current_bus_status == "Active"
+        }
+
+    return bus_state_store.bus_state_store.retrieve_active_bus_snapshots(bus_ids)
+
+
+def retrieve_bus_snapshots_with_seats(bus_ids, min_seats=1):
+    """
+    Method to retrieve the real-time values of the listed buses, with seats free.
+
+    The values are served from the fleet mirror while it is in sync, otherwise an
+    indexed query is run, so that the full buses are filtered by the server.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids whose nodes are to be read from the database
+        [int] min_seats: Lowest number of seats available in the bus, inclusive
+
+    Returns:
+        [dict] bus_snapshots: BusSnapshot records of buses with seats, by Bus Id
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    if fleet_mirror.is_synced() and not _uses_local_store():
+        bus_snapshots = fleet_mirror.retrieve_bus_snapshots(bus_ids)
+        return {
+            bus_id: bus_snapshot
+            for bus_id, bus_snapshot in bus_snapshots.items()
+            if (bus_snapshot.available_seats or 0) >= min_seats
+        }
+
+    return bus_state_store.bus_state_store.retrieve_bus_snapshots_with_seats(
+        bus_ids, min_seats=min_seats
+    )
+
+
+def retrieve_bus_ids():
+    """
+    Method to retrieve the Bus Ids of all the buses in the real-time database.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        [list] bus_ids: Sorted list of the Bus Ids, read using a shallow read
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    return bus_state_store.bus_state_store.retrieve_bus_ids()
+
+
+def retrieve_read_stats():
+    """
+    Method to retrieve the counters of conditional reads, & the bytes they saved.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        [dict] stats: Full & not modified read counts, bytes downloaded & saved
+    """
+    return conditional_reader.stats()
+
+
+def retrieve_coalescing_stats():
+    """
+    Method to retrieve the counters of database reads, & the reads that were shared.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        [dict] stats: Reads which called the database, and the reads which waited
+    """
+    return bus_reads.stats()
+
+
+def retrieve_staleness_age(bus_id, field=BUS_SNAPSHOT_FIELD):
+    """
+    Method to retrieve the seconds since the served value of a bus was last read.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus Id is used as the key node of the bus in the database
+        [str] field: Child name of the bus node, the complete node if not given
+
+    Returns:
+        [float] age: Seconds since the value was read, None if it was never read
+    """
+    if _uses_local_store():
+        return None  # Values are read from the local store, and are always current
+
+    if fleet_mirror.is_synced():
+        return fleet_mirror.staleness()
+
+    return bus_values.age((bus_id, field))
+
+
+def retrieve_read_latency_stats():
+    """
+    Method to retrieve the hedging counters, and the p95 latency of each read kind.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        [dict] stats: Reads, hedges sent & won, deadlines exceeded & p95 latencies
+    """
+    stats = hedged_reader.stats()
+    stats["p95_latencies"] = {
+        field: hedged_reader.histogram(field).percentile(0.95)
+        for field in FIELD_FRESHNESS_BUDGETS
+    }
+    return stats
@@ -0,0 +1,326 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the ETA engine used by the backend to time the search results.
+The schedules of all routes are held as a single array of cumulative offsets, so
+that the arrival times of every bus in the search results are computed together.
+
+Included Functions:
+    [1] ArrivalEstimate (class)
+    [2] RouteGuideStop (class)
+    [3] EtaEngine (class)
+        [i] route_offset
+        [ii] estimate_arrivals
+        [iii] route_timetable
+
+    [4] eta_engine (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the usecase of support dictionaries in :ref:`Support Dictionaries`
+"""
+
+import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+from application.application_route_index import route_index as default_route_index
+from database.database_cache import TTLCache
+from hardware import service_time
+
+# Number of route timetables memoized, one for every position reported by a bus
+ROUTE_TIMETABLE_CACHE_SIZE = 1024
+
+
+class ArrivalEstimate(NamedTuple):
+    """
+    Typed record holding the estimated arrival of a bus, for the trip of a user.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Arrival time is in seconds since the start of the service day
+    """
+
+    arrival_time_at_dropping_point: int
+    minutes_to_reach_boarding_point: int
+
+
+class RouteGuideStop(NamedTuple):
+    """
+    Typed record holding the scheduled & the expected arrival of a bus at a stop.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Times are None if the stop has no scheduled time, or has been passed
+    """
+
+    bus_stop: str
+    scheduled_arrival: str
+    expected_arrival: str
+
+
+class EtaEngine:
+    """
+    Class to estimate the arrival times of many buses, in a single vectorized call.
+
+    The scheduled seconds to reach each stop from its route's origin are stored
+    back to back, for all the routes, in one NumPy array. Each bus is reduced to
+    the indices of its current location, and the user's stops, in this array, so
+    the arrival times of all the buses are computed with a few array operations.
+    Times are handled as seconds since the start of the service day, instead of
+    the strings of hours & minutes, so that the estimates hold past midnight.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Routes without timings in the support dictionaries can't be estimated
+    """
+
+    def __init__(self, route_index=default_route_index):
+        """
+        Method to build the array of offsets, from the schedules in the route index.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [RouteIndex] route_index: Index holding the stop positions & the timings
+
+        Returns:
+            None -> Array of offsets, and the start of each route in it are stored
+        """
+        self.route_index = route_index
+
+        # Route Id as key, and the index of its origin in the array of offsets
+        self.route_starts = {}
+        route_offsets = []
+
+        for route_id, offsets in route_index.route_offsets.items():
+            self.route_starts[route_id] = len(route_offsets)
+
+            # Stops without a scheduled time are kept as NaN, so they stay unknown
+            route_offsets.extend(
+                np.nan if offset is None else offset * 60 for offset in offsets
+            )
+
+        # Scheduled seconds to reach each stop from its route's origin, for all routes
+        self.offsets = np.array(route_offsets, dtype=np.float64)
+
+        # Timetables of the routes, keyed by the values of the bus they depend on
+        self.route_timetables = TTLCache(
+            maxsize=ROUTE_TIMETABLE_CACHE_SIZE, ttl=service_time.SECONDS_PER_DAY
+        )
+
+    def _offset_index(self, route_id, bus_stop):
+        route_start = self.route_starts.get(route_id)
+        position = self.route_index.stop_position(route_id, bus_stop)
+
+        if route_start is None or position is None:
+            return None
+        return route_start + position
+
+    def route_offset(self, route_id, bus_stop):
+        """
+        Method to fetch the scheduled seconds to reach a bus stop from route's origin.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] route_id: Unique id assosciated to a route
+            [str] bus_stop: Name of the bus stop to be looked up
+
+        Returns:
+            [float] seconds: Seconds from the origin, None if timings are unavailable
+        """
+        offset_index = self._offset_index(route_id, bus_stop)
+
+        if offset_index is None or np.isnan(self.offsets[offset_index]):
+            return None
+        return float(self.offsets[offset_index])
+
+    def estimate_arrivals(self, bus_snapshots, boarding_point, dropping_point, now=None):
+        """
+        Method to estimate when each bus reaches the user's boarding & dropping point.
+
+        The arrival at the dropping point is measured from the current time, while
+        the minutes to reach the boarding point also subtract the time since the
+        bus left its last stop. The delay of each bus is added to both estimates.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+            [str] boarding_point: Bus stop from which the passenger boards the bus
+            [str] dropping_point: Bus stop at which the passenger deboards the bus
+            [datetime] now: Current date and time, the clock's time if not given
+
+        Returns:
+            [dict] arrival_estimates: ArrivalEstimate records keyed by the Bus Id
+
+        NOTE: Buses whose route or stops have no scheduled times are left out
+        """
+        if now is None:
+            now = datetime.datetime.now()
+
+        # Measure all the times from the start of the ongoing service day
+        service_date = service_time.service_day(now)
+        now_seconds = service_time.to_service_seconds(now, service_date)
+
+        bus_ids = []
+        current_indices, boarding_indices, dropping_indices = [], [], []
+        delays, last_stop_arrival_times = [], []
+
+        # Reduce each bus to the indices of its stops in the array of offsets
+        for bus_id, bus_snapshot in bus_snapshots.items():
+            route_id = bus_snapshot.current_route_id
+
+            current_index = self._offset_index(route_id, bus_snapshot.current_location)
+            boarding_index = self._offset_index(route_id, boarding_point)
+            dropping_index = self._offset_index(route_id, dropping_point)
+
+            if None in (current_index, boarding_index, dropping_index):
+                continue
+
+            bus_ids.append(bus_id)
+            current_indices.append(current_index)
+            boarding_indices.append(boarding_index)
+            dropping_indices.append(dropping_index)
+            delays.append(bus_snapshot.delay_in_mins or 0)
+
+            # Buses that haven't reported an arrival are taken to have just arrived
+            last_stop_arrival_time = bus_snapshot.last_stop_arrival_time
+            last_stop_arrival_times.append(
+                now if last_stop_arrival_time is None else last_stop_arrival_time
+            )
+
+        if not bus_ids:
+            return {}
+
+        current_offsets = self.offsets[current_indices]
+        delays = np.array(delays, dtype=np.float64) * 60
+
+        # Estimate the arrival at the dropping point, from the current time
+        arrival_times = (
+            now_seconds + self.offsets[dropping_indices] - current_offsets + delays
+        )
+
+        # Estimate the seconds left to reach the boarding point, since the last stop
+        seconds_since_last_stop = now_seconds - service_time.to_service_seconds_many(
+            last_stop_arrival_times, service_date
+        )
+        seconds_to_boarding_point = (
+            self.offsets[boarding_indices]
+            - current_offsets
+            - seconds_since_last_stop
+            + delays
+        )
+
+        # Skip the buses passing stops without scheduled times, in their route
+        is_known = ~(np.isnan(arrival_times) | np.isnan(seconds_to_boarding_point))
+        minutes_to_boarding_point = np.floor_divide(seconds_to_boarding_point, 60)
+
+        return {
+            bus_id: ArrivalEstimate(int(arrival_time), int(minutes))
+            for bus_id, arrival_time, minutes, known in zip(
+                bus_ids,
+                arrival_times.tolist(),
+                minutes_to_boarding_point.tolist(),
+                is_known.tolist(),
+            )
+            if known
+        }
+
+    def route_timetable(
+        self, route_id, current_location, last_stop_arrival_time, total_delay
+    ):
+        """
+        Method to fetch the scheduled & the expected arrival of a bus at every stop.
+
+        The timetable is computed for all the stops of the route in a single pass
+        over the offsets, and is memoized, so that it is computed again only when
+        the bus reports a new location, arrival time or delay to the database.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] route_id: Route Id currently assigned to the bus
+            [str] current_location: Stop at which the bus last arrived
+            [datetime] last_stop_arrival_time: Time of arrival at the current stop
+            [int] total_delay: Minutes by which the bus is running behind schedule
+
+        Returns:
+            [tuple] timetable: RouteGuideStop records, in the order of travel
+
+        NOTE: Returns None, if the route or the current location isn't scheduled
+        """
+        key = (route_id, current_location, last_stop_arrival_time, total_delay)
+
+        timetable = self.route_timetables.get(key)
+        if timetable is None:
+            timetable = self._compute_route_timetable(*key)
+            self.route_timetables.set(key, timetable)
+
+        return timetable
+
+    def _compute_route_timetable(
+        self, route_id, current_location, last_stop_arrival_time, total_delay
+    ):
+        current_index = self._offset_index(route_id, current_location)
+        if current_index is None or np.isnan(self.offsets[current_index]):
+            return None
+
+        bus_stops = self.route_index.route_stops[route_id]
+        route_start = self.route_starts[route_id]
+        current_position = current_index - route_start
+
+        # Offsets of all the stops of the route, from the current location of the bus
+        offsets = self.offsets[route_start : route_start + len(bus_stops)]
+        offsets_from_current = offsets - self.offsets[current_index]
+
+        last_stop_arrival = service_time.to_service_seconds(last_stop_arrival_time)
+
+        # The bus left the origin on time, if the delay is taken out of its arrival
+        scheduled_arrivals = (
+            last_stop_arrival - (total_delay or 0) * 60 + offsets_from_current
+        )
+        # The stops ahead are reached in their scheduled time, from the last arrival
+        expected_arrivals = last_stop_arrival + offsets_from_current
+
+        is_scheduled = ~np.isnan(offsets)
+        is_ahead = is_scheduled & (np.arange(len(bus_stops)) >= current_position)
+
+        scheduled_clock_times = service_time.format_clock_many(
+            np.where(is_scheduled, scheduled_arrivals, 0)
+        )
+        expected_clock_times = service_time.format_clock_many(
+            np.where(is_scheduled, expected_arrivals, 0)
+        )
+
+        return tuple(
+            RouteGuideStop(
+                bus_stop,
+                scheduled if scheduled_stop else None,
+                expected if ahead else None,
+            )
+            for bus_stop, scheduled, expected, scheduled_stop, ahead in zip(
+                bus_stops,
+                scheduled_clock_times,
+                expected_clock_times,
+                is_scheduled.tolist(),
+                is_ahead.tolist(),
+            )
+        )
+
+
+# ETA engine over the route index, built once when the module is first imported
+eta_engine = EtaEngine()
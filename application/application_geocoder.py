@@ -0,0 +1,214 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the geocoder used by the backend for locating the bus stops.
+Coordinates are served from memory, backed by a table in the SQL database which is
+seeded from a bundled file. Geocoding API is called only for stops not seen before.
+
+Included Functions:
+    [1] geocode_with_nominatim
+    [2] StopGeocoder (class)
+        [i] locate
+        [ii] located_stops
+
+    [3] stop_geocoder (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read about the working of the app's backend in :ref:`CroMa - Application backend`
+"""
+
+import csv
+import threading
+from geopy.geocoders import Nominatim
+
+from database import sql_database
+
+# Bundled file holding the coordinates of the bus stops served by CroMa
+STOP_COORDINATES_FILE = "hardware/data/stop_coordinates.csv"
+
+# Query to create the table storing the coordinates of the bus stops
+CREATE_STOP_COORDINATES_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS StopCoordinates (
+        StopName TEXT PRIMARY KEY,
+        Latitude REAL,
+        Longitude REAL
+    )
+"""
+
+
+def geocode_with_nominatim(place_name):
+    """
+    Function to geocode the name of a place using the Nominatim geocoding service.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] place_name: Name of the place to be geocoded
+
+    Returns:
+        [tuple] coordinates: Latitude & longitude of the place, None if not found
+
+    NOTE: This makes a network call, and is used only for stops not seen before
+    """
+    geolocator = Nominatim(user_agent="my-app")
+    location = geolocator.geocode(place_name)
+
+    if location is None:
+        return None
+    return (location.latitude, location.longitude)
+
+
+class StopGeocoder:
+    """
+    Class to fetch the coordinates of the bus stops, geocoding each at most once.
+
+    The coordinates are looked up in memory first, then in the StopCoordinates table
+    of the SQL database, which is seeded from the bundled file the first time it is
+    used. The geocoding function is called only for stops missing from both, and its
+    result is stored in the table, so that it is available after the app restarts.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: A local function may be passed as geocode_function, to avoid network calls
+    """
+
+    def __init__(
+        self,
+        geocode_function=geocode_with_nominatim,
+        seed_file=STOP_COORDINATES_FILE,
+        connection_pool=None,
+    ):
+        """
+        Method to configure the geocoder. The SQL database is read on first lookup.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [callable] geocode_function: Function to geocode the unseen bus stops
+            [str] seed_file: CSV file with the Name, Latitude & Longitude of stops
+            [SQLiteConnectionPool] connection_pool: Pool of the SQL db to be used
+
+        Returns:
+            None -> The geocoder is configured, with an empty in-memory layer
+        """
+        self.geocode_function = geocode_function
+        self.seed_file = seed_file
+        self.connection_pool = connection_pool
+
+        # Bus stop as key, and a tuple of latitude & longitude as value
+        self._coordinates = {}
+        self._is_loaded = False
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Fall back to the pool shared by the SQL database module at lookup time
+        return self.connection_pool or sql_database.connection_pool
+
+    def _load_stop_coordinates(self):
+        """
+        Method to seed the table from the bundled file and read it all into memory.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> Coordinates of all the known bus stops are stored in memory
+        """
+        with open(self.seed_file, encoding="utf-8") as file:
+            seed_rows = [
+                (row["Name"], float(row["Latitude"]), float(row["Longitude"]))
+                for row in csv.DictReader(file)
+            ]
+
+        # Stops geocoded earlier are kept, only the missing ones are seeded
+        with self._pool().write_connection() as conn:
+            conn.execute(CREATE_STOP_COORDINATES_TABLE_QUERY)
+            conn.executemany(
+                "INSERT OR IGNORE INTO StopCoordinates VALUES (?, ?, ?)", seed_rows
+            )
+
+        with self._pool().read_connection() as conn:
+            rows = conn.execute(
+                "SELECT StopName, Latitude, Longitude FROM StopCoordinates"
+            ).fetchall()
+
+        for stop_name, latitude, longitude in rows:
+            self._coordinates[stop_name] = (latitude, longitude)
+
+        self._is_loaded = True
+
+    def locate(self, stop_name):
+        """
+        Method to fetch the latitude and the longitude of the bus stop passed as arg.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] stop_name: Name of the bus stop to be located
+
+        Returns:
+            [tuple] coordinates: Latitude & longitude of the stop, None if not found
+        """
+        with self._lock:
+            if not self._is_loaded:
+                self._load_stop_coordinates()
+
+            if stop_name in self._coordinates:
+                return self._coordinates[stop_name]
+
+        # Geocode outside the lock, so that lookups of known stops aren't blocked
+        coordinates = self.geocode_function(stop_name)
+
+        with self._lock:
+            # Remember stops that couldn't be geocoded too, for the current process
+            self._coordinates[stop_name] = coordinates
+
+        if coordinates is not None:
+            with self._pool().write_connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO StopCoordinates VALUES (?, ?, ?)",
+                    (stop_name, coordinates[0], coordinates[1]),
+                )
+
+        return coordinates
+
+    def located_stops(self):
+        """
+        Method to fetch the coordinates of all the bus stops located so far.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] coordinates: Bus stop as key, & tuple of latitude & longitude
+        """
+        with self._lock:
+            if not self._is_loaded:
+                self._load_stop_coordinates()
+
+            # Stops that couldn't be geocoded are left out
+            return {
+                stop_name: coordinates
+                for stop_name, coordinates in self._coordinates.items()
+                if coordinates is not None
+            }
+
+
+# Geocoder shared by all the streamlit sessions of the passenger application
+stop_geocoder = StopGeocoder()
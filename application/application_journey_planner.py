@@ -0,0 +1,399 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the journey planner, which finds the trips needing transfers.
+Journeys are searched with the round based RAPTOR algorithm, where every round of
+the search rides one more bus, over compact arrays of the routes & the live buses.
+
+Included Functions:
+    [1] JourneyLeg (class)
+    [2] Journey (class)
+    [3] JourneyPlanner (class)
+        [i] plan_journeys
+
+    [4] journey_planner (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the usecase of support dictionaries in :ref:`Support Dictionaries`
+"""
+
+import datetime
+from typing import NamedTuple
+
+import numpy as np
+
+from application.application_route_index import route_index as default_route_index
+from hardware import service_time
+
+# Most number of transfers between the buses, considered while planning journeys
+MAX_TRANSFERS = 3
+# Seconds needed to get off a bus and be ready to board another one, at a stop
+MIN_TRANSFER_SECONDS = 120
+
+
+class JourneyLeg(NamedTuple):
+    """
+    Typed record holding a ride on a single bus, as a part of a journey.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Times are in seconds since the start of the service day
+    """
+
+    bus_id: str
+    route_id: str
+    boarding_point: str
+    dropping_point: str
+    departure_time: int
+    arrival_time: int
+
+
+class Journey(NamedTuple):
+    """
+    Typed record holding a journey from the user's origin to the destination.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Arrival time is in seconds since the start of the service day
+    """
+
+    arrival_time: int
+    transfers: int
+    legs: tuple
+
+
+class JourneyPlanner:
+    """
+    Class to plan the journeys with transfers, using the live positions of buses.
+
+    Bus stops are numbered, and every route is held as an array of its stop ids
+    and an array of the scheduled seconds to reach them. For a search, the live
+    buses of each route are turned into a matrix of their expected arrival times
+    at every stop of the route. Every round of RAPTOR then scans the routes that
+    pass the stops improved by the previous round, as whole NumPy arrays, so the
+    k-th round gives the earliest arrivals using k buses. Journeys that arrive
+    earlier than all those with fewer transfers form the Pareto optimal set.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Live buses carry their delays in the arrival at their last stop, so the
+    later stops are expected after the scheduled minutes from that arrival
+    """
+
+    def __init__(self, route_index=default_route_index):
+        """
+        Method to build the arrays of the stops & the schedules of all the routes.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [RouteIndex] route_index: Index holding the stops & the timings of routes
+
+        Returns:
+            None -> Arrays of stop ids and offsets of each route are stored
+        """
+        self.route_index = route_index
+
+        # Bus stop as key, and its number in the arrays of stop ids as value
+        self.stop_ids = {}
+        self.stop_names = []
+
+        # Route Ids, numbered in the order of the arrays of the rides during search
+        self.route_ids = list(route_index.route_offsets)
+        self.route_numbers = {
+            route_id: route_number
+            for route_number, route_id in enumerate(self.route_ids)
+        }
+
+        # Route Id as key, and the arrays of its stop ids and offsets as value
+        self.route_stop_ids = {}
+        self.route_offsets = {}
+        # Stop id as key, and the numbers of the scheduled routes through it as value
+        routes_through_stop = {}
+
+        for route_id, offsets in route_index.route_offsets.items():
+            stop_ids = []
+
+            for bus_stop in route_index.route_stops[route_id]:
+                if bus_stop not in self.stop_ids:
+                    self.stop_ids[bus_stop] = len(self.stop_names)
+                    self.stop_names.append(bus_stop)
+
+                stop_ids.append(self.stop_ids[bus_stop])
+                routes_through_stop.setdefault(stop_ids[-1], set()).add(
+                    self.route_numbers[route_id]
+                )
+
+            self.route_stop_ids[route_id] = np.array(stop_ids, dtype=np.int64)
+
+            # Stops without a scheduled time can't be boarded at or alighted at
+            self.route_offsets[route_id] = np.array(
+                [np.inf if offset is None else offset * 60 for offset in offsets],
+                dtype=np.float64,
+            )
+
+        # Numbers of the routes through each stop, stored back to back for all stops
+        route_counts = [
+            len(routes_through_stop.get(stop_id, ()))
+            for stop_id in range(len(self.stop_names))
+        ]
+        self.stop_route_starts = np.concatenate(([0], np.cumsum(route_counts)))
+        self.stop_route_numbers = np.array(
+            [
+                route_number
+                for stop_id in range(len(self.stop_names))
+                for route_number in sorted(routes_through_stop.get(stop_id, ()))
+            ],
+            dtype=np.int64,
+        )
+
+    def _routes_through(self, stop_ids):
+        stop_ids = np.asarray(stop_ids, dtype=np.int64)
+        starts = self.stop_route_starts[stop_ids]
+        route_counts = self.stop_route_starts[stop_ids + 1] - starts
+
+        # Gather the route numbers of all the stops, without looping over the stops
+        positions = np.repeat(
+            starts - np.cumsum(route_counts) + route_counts, route_counts
+        ) + np.arange(route_counts.sum())
+
+        is_through = np.zeros(len(self.route_ids), dtype=bool)
+        is_through[self.stop_route_numbers[positions]] = True
+        return is_through
+
+    def _build_trips(self, bus_snapshots, service_date):
+        # Route Id as key, and the Bus Ids & current positions of its buses as value
+        route_buses = {}
+        last_stop_arrival_times = []
+
+        for bus_id, bus_snapshot in bus_snapshots.items():
+            route_id = bus_snapshot.current_route_id
+            current_position = self.route_index.stop_position(
+                route_id, bus_snapshot.current_location
+            )
+
+            if current_position is None or route_id not in self.route_offsets:
+                continue
+            if bus_snapshot.last_stop_arrival_time is None:
+                continue
+
+            route_buses.setdefault(route_id, []).append(
+                (bus_id, current_position, len(last_stop_arrival_times))
+            )
+            last_stop_arrival_times.append(bus_snapshot.last_stop_arrival_time)
+
+        # Convert the arrival times of all the buses at once, before grouping them
+        last_stop_arrivals = service_time.to_service_seconds_many(
+            last_stop_arrival_times, service_date
+        )
+
+        # Route Id as key, and the Bus Ids & the matrix of their arrival times as value
+        trips = {}
+        for route_id, buses in route_buses.items():
+            bus_ids, current_positions, bus_indices = zip(*buses)
+            offsets = self.route_offsets[route_id]
+
+            # Expected arrival of each bus at each stop, from its last arrival
+            current_positions = np.array(current_positions)
+            arrival_times = (
+                last_stop_arrivals[list(bus_indices)][:, None]
+                + offsets[None, :]
+                - offsets[current_positions][:, None]
+            )
+
+            # Stops the buses have already passed can't be boarded anymore
+            is_passed = np.arange(len(offsets))[None, :] < current_positions[:, None]
+            arrival_times[is_passed | np.isnan(arrival_times)] = np.inf
+
+            trips[route_id] = (bus_ids, arrival_times)
+
+        return trips
+
+    def _scan_route(self, route_id, trips, ready_times):
+        arrival_times = trips[route_id][1]
+        positions = np.arange(arrival_times.shape[1])
+
+        # A bus can be boarded at the first stop it reaches after the user is ready
+        can_board = (
+            np.isfinite(ready_times)[None, :]
+            & np.isfinite(arrival_times)
+            & (arrival_times >= ready_times[None, :])
+        )
+        is_boarded = can_board.any(axis=1)
+        boarding_positions = can_board.argmax(axis=1)
+
+        # Once boarded, the bus can be left at any of the stops after the boarding
+        can_alight = is_boarded[:, None] & (
+            positions[None, :] > boarding_positions[:, None]
+        )
+        alighting_times = np.where(can_alight, arrival_times, np.inf)
+
+        # Earliest bus to reach each stop of the route, among the boarded buses
+        best_buses = alighting_times.argmin(axis=0)
+        best_times = alighting_times[best_buses, positions]
+
+        return arrival_times, best_buses, best_times, boarding_positions
+
+    def plan_journeys(
+        self,
+        boarding_point,
+        dropping_point,
+        bus_snapshots,
+        now=None,
+        max_transfers=MAX_TRANSFERS,
+    ):
+        """
+        Method to find the earliest journeys to the destination, for each transfer.
+
+        Every round rides one more bus, so a round that reaches the destination
+        earlier than the earlier rounds adds a journey with one more transfer. The
+        journeys returned are Pareto optimal in their arrival time and transfers.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] boarding_point: Bus stop from which the passenger starts the trip
+            [str] dropping_point: Bus stop at which the passenger ends the trip
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+            [datetime] now: Time at which the user is at the boarding point
+            [int] max_transfers: Most number of transfers, allowed in a journey
+
+        Returns:
+            [list] journeys: Journey records, sorted by their number of transfers
+        """
+        origin = self.stop_ids.get(boarding_point)
+        destination = self.stop_ids.get(dropping_point)
+        if origin is None or destination is None or origin == destination:
+            return []
+
+        if now is None:
+            now = datetime.datetime.now()
+
+        # Measure all the times from the start of the ongoing service day
+        service_date = service_time.service_day(now)
+        trips = self._build_trips(bus_snapshots, service_date)
+
+        # Earliest arrival at each stop, in any round, & in the previous round
+        best_arrivals = np.full(len(self.stop_names), np.inf)
+        previous_arrivals = np.full(len(self.stop_names), np.inf)
+        previous_arrivals[origin] = best_arrivals[origin] = (
+            service_time.to_service_seconds(now, service_date)
+        )
+
+        # Routes, which have live buses that can be boarded during the search
+        has_buses = np.zeros(len(self.route_ids), dtype=bool)
+        for route_id in trips:
+            has_buses[self.route_numbers[route_id]] = True
+
+        marked_stops = [origin]
+        # Arrays of the rides, by which each stop was reached, for every round
+        round_rides = []
+        journeys = []
+
+        for ride in range(max_transfers + 1):
+            stop_count = len(self.stop_names)
+            arrivals = np.full(stop_count, np.inf)
+            ride_routes = np.full(stop_count, -1, dtype=np.int64)
+            ride_buses = np.full(stop_count, -1, dtype=np.int64)
+            ride_boarding_stops = np.full(stop_count, -1, dtype=np.int64)
+            ride_departures = np.full(stop_count, np.inf)
+
+            # Scan only the routes through the stops improved by the previous round
+            routes = np.flatnonzero(self._routes_through(marked_stops) & has_buses)
+
+            for route_number in routes.tolist():
+                route_id = self.route_ids[route_number]
+                stop_ids = self.route_stop_ids[route_id]
+
+                # Buses of the next round are boarded after getting off the last one
+                ready_times = previous_arrivals[stop_ids]
+                if ride > 0:
+                    ready_times = ready_times + MIN_TRANSFER_SECONDS
+
+                (
+                    arrival_times,
+                    best_buses,
+                    best_times,
+                    boarding_positions,
+                ) = self._scan_route(route_id, trips, ready_times)
+
+                # Keep only the arrivals better than known, & than the destination's
+                improved_positions = np.flatnonzero(
+                    best_times
+                    < np.minimum(best_arrivals[stop_ids], best_arrivals[destination])
+                )
+                if not improved_positions.size:
+                    continue
+
+                improved_stops = stop_ids[improved_positions]
+                buses = best_buses[improved_positions]
+                boardings = boarding_positions[buses]
+
+                arrivals[improved_stops] = best_times[improved_positions]
+                best_arrivals[improved_stops] = best_times[improved_positions]
+                ride_routes[improved_stops] = route_number
+                ride_buses[improved_stops] = buses
+                ride_boarding_stops[improved_stops] = stop_ids[boardings]
+                ride_departures[improved_stops] = arrival_times[buses, boardings]
+
+            round_rides.append(
+                (
+                    ride_routes,
+                    ride_buses,
+                    ride_boarding_stops,
+                    ride_departures,
+                    arrivals,
+                )
+            )
+
+            if ride_routes[destination] >= 0:
+                journeys.append(self._trace_journey(round_rides, trips, destination))
+
+            marked_stops = np.flatnonzero(ride_routes >= 0)
+            if not marked_stops.size:
+                break
+
+            previous_arrivals = arrivals
+
+        return journeys
+
+    def _trace_journey(self, round_rides, trips, destination):
+        legs = []
+        stop_id = destination
+
+        # Walk back from the destination, one bus per round, to the origin
+        for rides in reversed(round_rides):
+            ride_routes, ride_buses, boarding_stops, departures, arrivals = rides
+
+            route_id = self.route_ids[ride_routes[stop_id]]
+            boarding_stop_id = int(boarding_stops[stop_id])
+            legs.append(
+                JourneyLeg(
+                    trips[route_id][0][ride_buses[stop_id]],
+                    route_id,
+                    self.stop_names[boarding_stop_id],
+                    self.stop_names[stop_id],
+                    int(departures[stop_id]),
+                    int(arrivals[stop_id]),
+                )
+            )
+            stop_id = boarding_stop_id
+
+        legs.reverse()
+        return Journey(legs[-1].arrival_time, len(legs) - 1, tuple(legs))
+
+
+# Journey planner over the route index, built once when the module is first imported
+journey_planner = JourneyPlanner()
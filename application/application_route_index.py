@@ -0,0 +1,224 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the route index used by the backend while searching buses.
+The index is built once from the support dictionaries, so that searches only need
+to look at the live positions of the buses instead of scanning lists of bus stops.
+
+Included Functions:
+    [1] RouteIndex (class)
+        [i] stop_position
+        [ii] time_from_origin
+        [iii] reachable_window
+        [iv] candidate_routes
+        [v] is_bus_serving_trip
+
+    [2] route_index (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the usecase of support dictionaries in :ref:`Support Dictionaries`
+"""
+
+from application import application_support_dictionary
+
+# Number of stops before the boarding point, within which buses are shown to users
+LOOKBACK_STOPS = 3
+
+
+class RouteIndex:
+    """
+    Class to hold the precomputed positions of the bus stops in each of the routes.
+
+    For every route, the position of each stop and the time to reach it from the
+    origin are stored in hashmaps. For every stop, the routes passing through it
+    are stored along with its position, so that the candidate routes for a pair
+    of stops can be found without scanning the full list of stops of each route.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: If a stop appears more than once in a route, its first position is used
+    """
+
+    def __init__(self, all_routes, bus_timings, lookback_stops=LOOKBACK_STOPS):
+        """
+        Method to build the index from the route and the timing support dictionaries.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [dict] all_routes: Route Id as key, and list of its bus stops as value
+            [dict] bus_timings: Route Id as key, and minutes to reach stops as value
+            [int] lookback_stops: Stops before boarding point to look for buses in
+
+        Returns:
+            None -> Hashmaps of the index are stored as attributes of the object
+        """
+        self.lookback_stops = lookback_stops
+
+        # Route Id as key, and tuple of the bus stops in the order of travel as value
+        self.route_stops = {}
+        # Route Id as key, and hashmap of bus stop to its position as value
+        self.stop_positions = {}
+        # Route Id as key, and tuple of minutes to reach each position as value
+        self.route_offsets = {}
+        # Bus stop as key, and hashmap of route id to the stop's position as value
+        self.routes_through_stop = {}
+
+        for route_id, bus_stops in all_routes.items():
+            self.route_stops[route_id] = tuple(bus_stops)
+
+            positions = {}
+            for position, bus_stop in enumerate(bus_stops):
+                positions.setdefault(bus_stop, position)
+            self.stop_positions[route_id] = positions
+
+            for bus_stop, position in positions.items():
+                self.routes_through_stop.setdefault(bus_stop, {})[route_id] = position
+
+            # Store the schedule of the route only if its timings are available
+            stop_timings = bus_timings.get(route_id)
+            if stop_timings is not None:
+                self.route_offsets[route_id] = tuple(
+                    stop_timings.get(bus_stop) for bus_stop in bus_stops
+                )
+
+        # Candidate routes are memoized per pair of stops, the first time they're asked
+        self._routes_between_stops = {}
+
+    def stop_position(self, route_id, bus_stop):
+        """
+        Method to fetch the zero based position of a bus stop in a particular route.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] route_id: Unique id assosciated to a route
+            [str] bus_stop: Name of the bus stop to be looked up
+
+        Returns:
+            [int] position: Position of the stop in route, None if it's not present
+        """
+        return self.stop_positions.get(route_id, {}).get(bus_stop)
+
+    def time_from_origin(self, route_id, bus_stop):
+        """
+        Method to fetch the scheduled minutes to reach a bus stop from route's origin.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] route_id: Unique id assosciated to a route
+            [str] bus_stop: Name of the bus stop to be looked up
+
+        Returns:
+            [int] minutes: Minutes from the origin, None if timings are unavailable
+        """
+        position = self.stop_position(route_id, bus_stop)
+        route_offsets = self.route_offsets.get(route_id)
+
+        if position is None or route_offsets is None:
+            return None
+        return route_offsets[position]
+
+    def reachable_window(self, route_id, bus_stop):
+        """
+        Method to fetch the window of positions from where a bus is shown to the user.
+
+        The window starts a fixed number of stops before the bus stop, and ends at the
+        bus stop itself. Buses positioned within this window are shown to the users.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] route_id: Unique id assosciated to a route
+            [str] bus_stop: The user's boarding point
+
+        Returns:
+            [tuple] window: First & last positions (inclusive), None if not in route
+        """
+        position = self.stop_position(route_id, bus_stop)
+
+        if position is None:
+            return None
+        return (max(position - self.lookback_stops, 0), position)
+
+    def candidate_routes(self, boarding_point, dropping_point):
+        """
+        Method to fetch the routes that pass the boarding point before dropping point.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] boarding_point: Bus stop from which the passenger boards the bus
+            [str] dropping_point: Bus stop at which the passenger deboards the bus
+
+        Returns:
+            [frozenset] route_ids: Route Ids that can take the user to destination
+        """
+        stop_pair = (boarding_point, dropping_point)
+
+        candidate_routes = self._routes_between_stops.get(stop_pair)
+        if candidate_routes is not None:
+            return candidate_routes
+
+        # Only the routes passing through both stops need to be compared
+        routes_through_boarding_point = self.routes_through_stop.get(boarding_point, {})
+        routes_through_dropping_point = self.routes_through_stop.get(dropping_point, {})
+
+        candidate_routes = frozenset(
+            route_id
+            for route_id, boarding_position in routes_through_boarding_point.items()
+            if routes_through_dropping_point.get(route_id, -1) > boarding_position
+        )
+
+        self._routes_between_stops[stop_pair] = candidate_routes
+        return candidate_routes
+
+    def is_bus_serving_trip(
+        self, route_id, current_location, boarding_point, dropping_point
+    ):
+        """
+        Method to check if a bus on a route can be shown to the user for their trip.
+
+        The route must pass through the boarding point before the dropping point, and
+        the current location of the bus must lie in the boarding point's window.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] route_id: Route Id currently assigned to the bus
+            [str] current_location: Current location of the bus
+            [str] boarding_point: Bus stop from which the passenger boards the bus
+            [str] dropping_point: Bus stop at which the passenger deboards the bus
+
+        Returns:
+            [bool] is_serving: True if the bus serves the user's trip, else False
+        """
+        if route_id not in self.candidate_routes(boarding_point, dropping_point):
+            return False
+
+        current_position = self.stop_position(route_id, current_location)
+        if current_position is None:
+            return False
+
+        first_position, last_position = self.reachable_window(route_id, boarding_point)
+        return first_position <= current_position <= last_position
+
+
+# Index over the support dictionaries, built once when the module is first imported
+route_index = RouteIndex(
+    application_support_dictionary.all_routes,
+    application_support_dictionary.bus_timings,
+)
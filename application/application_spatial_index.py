@@ -0,0 +1,296 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the spatial index used by the backend for the nearby searches.
+Points are bucketed into a grid of square cells, so that the nearest bus stops and
+the buses around a user are found by looking at a few cells around the user only.
+
+Included Functions:
+    [1] SpatialIndex (class)
+        [i] insert
+        [ii] load
+        [iii] remove
+        [iv] within_radius
+        [v] nearest
+
+    [2] stop_index (module-level instance)
+    [3] bus_index (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read about the working of the app's backend in :ref:`CroMa - Application backend`
+"""
+
+import math
+import threading
+
+import numpy as np
+
+# Kilometres covered by a degree of latitude, and by a degree of longitude at equator
+KM_PER_DEGREE_LATITUDE = 110.574
+KM_PER_DEGREE_LONGITUDE = 111.320
+
+# Latitude around which the distances are measured, near the centre of Kerala
+REFERENCE_LATITUDE = 9.5
+# Width of the square cells of the grid, in kilometres
+DEFAULT_CELL_SIZE_KM = 1.0
+
+
+class SpatialIndex:
+    """
+    Class to find the points nearest to a location, or within a radius of it.
+
+    Coordinates are projected to kilometres around a reference latitude, and the
+    points are bucketed into square cells of the grid. A radius query looks only
+    at the cells overlapping the circle, & a nearest query looks at rings of cells
+    around the location, stopping once no unseen point can be any nearer. The
+    distances to the points found in the cells are computed together in NumPy.
+    Points may be inserted, moved and removed, so live positions can be tracked.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Distances are equirectangular, which is accurate within a state's extent
+    """
+
+    def __init__(
+        self, cell_size_km=DEFAULT_CELL_SIZE_KM, reference_latitude=REFERENCE_LATITUDE
+    ):
+        """
+        Method to create an empty index, with cells of the given size.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] cell_size_km: Width of the square cells of the grid, in km
+            [float] reference_latitude: Latitude around which distances are measured
+
+        Returns:
+            None -> An empty index is created, with no cells in the grid
+        """
+        self.cell_size_km = cell_size_km
+        self._km_per_degree_longitude = KM_PER_DEGREE_LONGITUDE * math.cos(
+            math.radians(reference_latitude)
+        )
+
+        # Cell as key, and hashmap of the keys of its points to their position
+        self._cells = {}
+        # Key of the point as key, and a tuple of its position and cell as value
+        self._points = {}
+        # Bounds of the occupied cells, as first column, first row, last column & row
+        self._extent = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._points)
+
+    def _project(self, latitude, longitude):
+        return (
+            longitude * self._km_per_degree_longitude,
+            latitude * KM_PER_DEGREE_LATITUDE,
+        )
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size_km), math.floor(y / self.cell_size_km))
+
+    def insert(self, key, latitude, longitude):
+        """
+        Method to add a point to the index, moving it if the key is already present.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [hashable] key: Key of the point, such as the name of a bus stop
+            [float] latitude: Latitude of the point, in degrees
+            [float] longitude: Longitude of the point, in degrees
+
+        Returns:
+            None -> The point is stored in the cell covering its position
+        """
+        position = self._project(latitude, longitude)
+        cell = self._cell(*position)
+
+        with self._lock:
+            previous = self._points.get(key)
+            if previous is not None and previous[1] != cell:
+                self._remove_from_cell(key, previous[1])
+
+            self._cells.setdefault(cell, {})[key] = position
+            self._points[key] = (position, cell)
+
+            # Extent only grows, as a loose bound still stops the nearest queries
+            if self._extent is None:
+                self._extent = (cell[0], cell[1], cell[0], cell[1])
+            else:
+                self._extent = (
+                    min(self._extent[0], cell[0]),
+                    min(self._extent[1], cell[1]),
+                    max(self._extent[2], cell[0]),
+                    max(self._extent[3], cell[1]),
+                )
+
+    def load(self, points):
+        """
+        Method to add many points to the index, such as the coordinates of the stops.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [dict] points: Key of the point as key, & tuple of latitude & longitude
+
+        Returns:
+            None -> The points are stored in the cells covering their positions
+        """
+        for key, (latitude, longitude) in points.items():
+            self.insert(key, latitude, longitude)
+
+    def remove(self, key):
+        """
+        Method to remove a point from the index, if it is present.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [hashable] key: Key of the point to be removed
+
+        Returns:
+            None -> The point is no longer returned by the queries
+        """
+        with self._lock:
+            previous = self._points.pop(key, None)
+            if previous is not None:
+                self._remove_from_cell(key, previous[1])
+
+    def _remove_from_cell(self, key, cell):
+        points = self._cells[cell]
+        del points[key]
+
+        # Drop the empty cells, so the rings of the nearest queries stay short
+        if not points:
+            del self._cells[cell]
+
+    def _measure(self, points, x, y):
+        # Distances from the location to all the points found, in a single pass
+        keys = list(points)
+        positions = np.array(list(points.values()), dtype=np.float64).reshape(-1, 2)
+
+        distances = np.hypot(positions[:, 0] - x, positions[:, 1] - y)
+        return keys, distances
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """
+        Method to fetch the points within a distance from the location, nearest first.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] latitude: Latitude of the location, in degrees
+            [float] longitude: Longitude of the location, in degrees
+            [float] radius_km: Distance from the location, in kilometres
+
+        Returns:
+            [list] points: Tuples of the key & distance in km, sorted by distance
+        """
+        x, y = self._project(latitude, longitude)
+        first_column, first_row = self._cell(x - radius_km, y - radius_km)
+        last_column, last_row = self._cell(x + radius_km, y + radius_km)
+
+        candidates = {}
+        with self._lock:
+            # Visit the cells overlapping the square around the circle
+            for column in range(first_column, last_column + 1):
+                for row in range(first_row, last_row + 1):
+                    candidates.update(self._cells.get((column, row), {}))
+
+        keys, distances = self._measure(candidates, x, y)
+        order = np.argsort(distances, kind="stable")
+
+        return [
+            (keys[index], float(distances[index]))
+            for index in order.tolist()
+            if distances[index] <= radius_km
+        ]
+
+    def nearest(self, latitude, longitude, k=1):
+        """
+        Method to fetch the k points nearest to the location, nearest first.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] latitude: Latitude of the location, in degrees
+            [float] longitude: Longitude of the location, in degrees
+            [int] k: Number of points to be returned
+
+        Returns:
+            [list] points: Tuples of the key & distance in km, sorted by distance
+
+        NOTE: Fewer points are returned, if the index holds less than k points
+        """
+        x, y = self._project(latitude, longitude)
+        column, row = self._cell(x, y)
+
+        candidates = {}
+        with self._lock:
+            if not self._cells:
+                return []
+
+            # Rings beyond the farthest occupied cell can't hold any more points
+            first_column, first_row, last_column, last_row = self._extent
+            max_ring = max(
+                column - first_column,
+                last_column - column,
+                row - first_row,
+                last_row - row,
+            )
+
+            ring = 0
+            while ring <= max_ring:
+                for cell in self._ring_cells(column, row, ring):
+                    candidates.update(self._cells.get(cell, {}))
+
+                # Points outside the rings seen are at least this far from location
+                reach = ring * self.cell_size_km
+
+                if len(candidates) >= k:
+                    _, distances = self._measure(candidates, x, y)
+                    if np.partition(distances, k - 1)[k - 1] <= reach:
+                        break
+
+                ring = ring + 1
+
+        keys, distances = self._measure(candidates, x, y)
+        order = np.argsort(distances, kind="stable")[:k]
+
+        return [(keys[index], float(distances[index])) for index in order.tolist()]
+
+    @staticmethod
+    def _ring_cells(column, row, ring):
+        if ring == 0:
+            return [(column, row)]
+
+        # Cells on the border of the square of side 2 * ring + 1, around the cell
+        cells = []
+        for offset in range(-ring, ring + 1):
+            cells.append((column + offset, row - ring))
+            cells.append((column + offset, row + ring))
+        for offset in range(-ring + 1, ring):
+            cells.append((column - ring, row + offset))
+            cells.append((column + ring, row + offset))
+        return cells
+
+
+# Index over the coordinates of the bus stops, loaded by the backend on first use
+stop_index = SpatialIndex()
+# Index over the live positions of the buses, updated by the backend on each search
+bus_index = SpatialIndex()
@@ -0,0 +1,321 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the traffic level service used by the passenger application.
+Traffic levels are served from memory, and refreshed from the openrouteservice API
+in the background, so that searches do not wait on the response time of ORS API.
+
+Included Functions:
+    [1] CircuitBreaker (class)
+        [i] allow_request
+        [ii] record_success
+        [iii] record_failure
+
+    [2] TrafficLevelService (class)
+        [i] fetch_traffic_level_from_ors
+        [ii] get_traffic_level
+        [iii] refresh
+
+    [3] traffic_level_service (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read about the working of the app's backend in :ref:`CroMa - Application backend`
+"""
+
+import time
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import openrouteservice as ors
+
+from application.application_geocoder import stop_geocoder
+from database.database_cache import TTLCache
+
+# Traffic level shown when no value has ever been fetched for a pair of stops
+DEFAULT_TRAFFIC_LEVEL = 2500
+# Minutes of the day grouped together, while caching the traffic levels
+TRAFFIC_BUCKET_MINUTES = 30
+# Seconds after which a cached traffic level is refreshed in the background
+TRAFFIC_LEVEL_TTL = 900.0
+# Consecutive failures of ORS API after which calls to it are paused
+CIRCUIT_FAILURE_THRESHOLD = 3
+# Seconds for which calls to ORS API are paused, once the circuit is open
+CIRCUIT_RESET_TIMEOUT = 300.0
+
+
+class CircuitBreaker:
+    """
+    Class to pause calls to an external service, after it fails repeatedly.
+
+    The circuit opens once the number of consecutive failures reaches threshold,
+    and no calls are allowed while it is open. After the reset timeout, a single
+    trial call is allowed. The circuit closes again if this call succeeds.
+
+    .. versionadded:: 1.4.0
+    """
+
+    def __init__(
+        self,
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=CIRCUIT_RESET_TIMEOUT,
+        timer=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timer = timer
+
+        self.consecutive_failures = 0
+        self.opened_at = None  # Time at which circuit opened, None when closed
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """
+        Method to check if a call can be made to the external service at the moment.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [bool] is_allowed: True if circuit is closed, or a trial call is due
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+
+            if self.timer() - self.opened_at >= self.reset_timeout:
+                # Allow one trial call, and wait another timeout before the next one
+                self.opened_at = self.timer()
+                return True
+
+            return False
+
+    def record_success(self):
+        """
+        Method to close the circuit, once a call to the external service succeeds.
+
+        .. versionadded:: 1.4.0
+        """
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """
+        Method to count a failed call, opening the circuit once threshold is reached.
+
+        .. versionadded:: 1.4.0
+        """
+        with self._lock:
+            self.consecutive_failures = self.consecutive_failures + 1
+
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = self.timer()
+
+
+class TrafficLevelService:
+    """
+    Class to serve the traffic levels between bus stops from an in-memory cache.
+
+    Traffic levels are memoized per origin, destination and time-of-day bucket, &
+    expire after a fixed duration. Lookups never wait on the ORS API. A missing or
+    expired value is refreshed in the background, while the last known value for
+    that pair of stops is returned. The calls to the ORS API go through a circuit
+    breaker, so that an unavailable API isn't called again on every search.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: A local function may be passed as fetch_function, to avoid network calls
+    """
+
+    def __init__(
+        self,
+        fetch_function=None,
+        ttl=TRAFFIC_LEVEL_TTL,
+        bucket_minutes=TRAFFIC_BUCKET_MINUTES,
+        circuit_breaker=None,
+        clock=datetime.datetime.now,
+    ):
+        """
+        Method to configure the service. ORS client is created on the first refresh.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [callable] fetch_function: Function fetching traffic level for 2 stops
+            [float] ttl: Seconds after which the cached traffic level is refreshed
+            [int] bucket_minutes: Minutes of the day grouped into a single bucket
+            [CircuitBreaker] circuit_breaker: Breaker guarding calls to the API
+            [callable] clock: Function returning the current datetime
+
+        Returns:
+            None -> The service is configured, with an empty cache
+        """
+        self.fetch_function = fetch_function or self.fetch_traffic_level_from_ors
+        self.bucket_minutes = bucket_minutes
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.clock = clock
+
+        # Traffic levels keyed by the origin, destination and time-of-day bucket
+        self._traffic_levels = TTLCache(maxsize=4096, ttl=ttl)
+        # Latest traffic level of each pair of stops, served when the cache misses
+        self._last_known_traffic_levels = {}
+        # Cache keys being refreshed, so that each is fetched only once at a time
+        self._refreshing_keys = set()
+        self._lock = threading.Lock()
+
+        self._client = None  # The ORS client is reused across all the refreshes
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="croma-traffic"
+        )
+
+    def fetch_traffic_level_from_ors(self, origin, destination):
+        """
+        Method to fetch the traffic level between two locations using ORS API data
+
+        The method takes two locations and fetches the traffic level between these
+        location using the data from openrouteservice api with driving-car profile
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] origin: Bus stop from which the passenger boards the bus
+            [str] destination: Bus stop at which a passenger deboards the bus
+
+        Returns:
+            [int] traffic_level: Traffic level between the origin, and destination
+
+        NOTE: The output is highly susceptible to changes made to the ORS API data
+        """
+        if self._client is None:
+            # Credentials read the streamlit secrets, so they're loaded only when used
+            from application import (  # pylint: disable=import-outside-toplevel
+                application_credentials,
+            )
+
+            # Fetch the API key for accessing the Open Route Service API
+            api_key = application_credentials.OPENROUTESERVICE_API_KEY
+            self._client = ors.Client(key=api_key)  # Set up the client
+
+        # Determine co-ordinates for the origin & destination, as longitude, latitude
+        origin_coords = list(reversed(stop_geocoder.locate(origin)))
+        destination_coords = list(reversed(stop_geocoder.locate(destination)))
+
+        # Fetch the response from the API
+        response = self._client.directions(
+            coordinates=[origin_coords, destination_coords],
+            profile="driving-car",
+            units="km",
+            instructions=True,
+            options={"avoid_features": ["tollways"]},
+        )
+
+        # Retrieve the duration_no_traffic parameter
+        duration_no_traffic = response["routes"][0]["summary"]["duration"]
+        # Simulate traffic condition by considering historical average
+        historical_traffic_factor = (
+            1.2  # Adjust this factor based on your estimation of traffic conditions
+        )
+
+        # Calculate the duration with traffic
+        duration_with_traffic = duration_no_traffic * historical_traffic_factor
+        # Calculate the traffic level by subtracting duration_no_traffic from duration_with_traffic
+        traffic_level = duration_with_traffic - duration_no_traffic
+
+        return traffic_level
+
+    def _cache_key(self, origin, destination):
+        # Group the minutes of the day into buckets of fixed size
+        current_time = self.clock()
+        minute_of_day = current_time.hour * 60 + current_time.minute
+
+        return (origin, destination, minute_of_day // self.bucket_minutes)
+
+    def get_traffic_level(self, origin, destination):
+        """
+        Method to fetch the traffic level between two stops, without calling ORS API.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] origin: Bus stop from which the passenger boards the bus
+            [str] destination: Bus stop at which a passenger deboards the bus
+
+        Returns:
+            [int] traffic_level: Cached, or last known traffic level between stops
+
+        NOTE: Default traffic level is returned until the first refresh completes
+        """
+        cache_key = self._cache_key(origin, destination)
+
+        traffic_level = self._traffic_levels.get(cache_key)
+        if traffic_level is not None:
+            return traffic_level
+
+        # Refresh the expired value in the background, and serve last known value
+        with self._lock:
+            if (
+                cache_key not in self._refreshing_keys
+                and self.circuit_breaker.allow_request()
+            ):
+                self._refreshing_keys.add(cache_key)
+                self._executor.submit(self._refresh_cache_key, cache_key)
+
+            return self._last_known_traffic_levels.get(
+                (origin, destination), DEFAULT_TRAFFIC_LEVEL
+            )
+
+    def _refresh_cache_key(self, cache_key):
+        origin, destination, _ = cache_key
+
+        try:
+            traffic_level = self.fetch_function(origin, destination)
+        except Exception:  # pylint: disable=broad-except
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+            self._traffic_levels.set(cache_key, traffic_level)
+            with self._lock:
+                self._last_known_traffic_levels[(origin, destination)] = traffic_level
+        finally:
+            with self._lock:
+                self._refreshing_keys.discard(cache_key)
+
+    def refresh(self, origin, destination):
+        """
+        Method to fetch the traffic level between two stops, and cache it right away.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] origin: Bus stop from which the passenger boards the bus
+            [str] destination: Bus stop at which a passenger deboards the bus
+
+        Returns:
+            [int] traffic_level: Latest traffic level, or the last known on failure
+        """
+        self._refresh_cache_key(self._cache_key(origin, destination))
+
+        with self._lock:
+            return self._last_known_traffic_levels.get(
+                (origin, destination), DEFAULT_TRAFFIC_LEVEL
+            )
+
+
+# Traffic level service shared by all the streamlit sessions of passenger app
+traffic_level_service = TrafficLevelService()
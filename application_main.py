@@ -17,12 +17,11 @@ It contains methods for printing tickets, managing passenger's data and includes
 several options for performing conductor book-keeping & data-tracking operations.
 
 Included Functions:
-    [1] add_minutes_to_time
-    [2] apply_style_to_sidebar_button
-    [3] is_valid_email
-    [4] croma_application_playground
-    [5] view_bus_details
-    [6] send_bug_report
+    [1] apply_style_to_sidebar_button
+    [2] is_valid_email
+    [3] croma_application_playground
+    [4] view_bus_details
+    [5] send_bug_report
 
 .. versionupdated:: 1.3.0
 
@@ -37,7 +36,7 @@ from PIL import Image
 
 import time
 import datetime
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import folium
 from streamlit_folium import folium_static
@@ -47,11 +46,14 @@ from geopy.geocoders import Nominatim
 from application import application_support_dictionary
 from application.application_backend import BackendService, BusFareCalculator
 from application.application_database import (
-    retrieve_bus_route_id,
-    retrieve_available_seats,
-    retrieve_last_stop_arrival_time,
-    retrieve_current_location,
+    retrieve_bus_data_many,
+    retrieve_bus_ids,
+    retrieve_bus_snapshot,
+    retrieve_staleness_age,
 )
+from database import bus_state_store
+from database.firebase_fleet_mirror import fleet_mirror
+from hardware import service_time
 from hardware import terminal
 
 import firebase_admin
@@ -65,7 +67,11 @@ st.set_page_config(
 )
 
 try:
-    if terminal.initialize_firebase_sdk_ticketing_machine < 1:
+    # Local stores of the bus state don't need the firebase app to be set up
+    if (
+        terminal.initialize_firebase_sdk_ticketing_machine < 1
+        and bus_state_store.bus_state_store.is_remote
+    ):
         # Increment the counter to avoid reinitializing of the firebase database
         terminal.initialize_firebase_sdk_ticketing_machine = (
             terminal.initialize_firebase_sdk_ticketing_machine + 1
@@ -79,6 +85,10 @@ try:
 except:
     pass  # If the initialization process throws exception, take no action
 
+# Subscribe to the bus nodes once per process, so that reads are served from memory
+if bus_state_store.bus_state_store.is_remote:
+    fleet_mirror.start()
+
 # Remove the extra padding from the top margin of the web app
 st.markdown(
     """
@@ -192,35 +202,6 @@ st.markdown(
 )
 
 
-def add_minutes_to_time(time_str, minutes):
-    """
-    Function to add minutes to the time argument, and return the output as time
-
-    The minutes argument is casted using timedelta, and added with the datetime
-    argument. The new time is returned as a datetime object in the HH:MM format.
-
-    .. versionadded:: 1.3.0
-
-    Parameters:
-        [str] time_str: The time is passed as a string in HH:MM format
-        [int] minutes: Minutes to be added to the time argument
-
-    Returns:
-        [str] new_time_str: Time after adding the minutes is returned as string
-
-    NOTE: Addition is performed after converting string values to a time object.
-
-    """
-    # Converts the date string parsed in HH:MM format to a datetime object
-    time_obj = datetime.strptime(time_str, "%H:%M")
-    delta = timedelta(minutes=minutes)  # Converts the integer argument as minutes
-
-    new_time_obj = time_obj + delta  # Adds the minutes to the datetime object
-    new_time_str = new_time_obj.strftime("%H:%M")  # Converts datetime obj to string
-
-    return new_time_str
-
-
 def apply_style_to_sidebar_button(file_name):
     """
     Function to apply CSS style specified in the parameter to the sidebar button.
@@ -330,12 +311,12 @@ def croma_application_playground():
             unsafe_allow_html=True,
         )
 
-        # Fetch th list of available buses using the function from the app backend
-        list_of_available_buses = (
-            BackendService.fetch_buses_to_user_destination_from_user_origin(
-                input_starting_location, input_user_destination
-            )
+        # Fetch the available buses & their real-time values, read in parallel
+        search_buses = (
+            BackendService.fetch_buses_to_user_destination_from_user_origin_concurrently
         )
+        bus_snapshots = search_buses(input_starting_location, input_user_destination)
+        list_of_available_buses = list(bus_snapshots)
         search_results_count = len(
             list_of_available_buses
         )  # Calculate the count of results
@@ -350,23 +331,12 @@ def croma_application_playground():
 
         # If the checkbox is checked, show only buses with seats available
         if show_bus_with_seats_status == True:
-            buses_with_seats_available = (
-                []
-            )  # Initialize list of bus with seats available
-
-            # Iterate through the list of results
-            for i in range(search_results_count):
-                current_bus_id = list_of_available_buses[i]  # Fetch current Bus Id
-                # Retrieve the count of available seats
-                available_seats_in_bus = retrieve_available_seats(current_bus_id)
-
-                # Check the available seat count in the bus
-                if available_seats_in_bus > 0:
-                    # If seats available, append bus id into
-                    buses_with_seats_available.append(current_bus_id)
-
-            # Only include the list of bus id's with seats available to be shown to user
-            list_of_available_buses = buses_with_seats_available
+            # Filter the snapshots read by the search, without another round trip
+            list_of_available_buses = [
+                bus_id
+                for bus_id in list_of_available_buses
+                if (bus_snapshots[bus_id].available_seats or 0) >= 1
+            ]
             # Calculate the number of search results
             search_results_count = len(list_of_available_buses)
 
@@ -410,6 +380,19 @@ def croma_application_playground():
             else:
                 st.markdown("<H5>No buses found near you</H5>", unsafe_allow_html=True)
 
+        # Fetch the operator and type of all the listed buses in a single SQL query
+        bus_data = retrieve_bus_data_many(list_of_available_buses)
+        # Estimate the arrivals of all the listed buses together, in a single call
+        arrival_estimates = BackendService.fetch_arrival_estimates(
+            {
+                bus_id: bus_snapshots[bus_id]
+                for bus_id in list_of_available_buses
+                if bus_id in bus_snapshots
+            },
+            input_starting_location,
+            input_user_destination,
+        )
+
         # Iterate through all the bus id's in the list of available buses
         for i in range(search_results_count):
             st.markdown(
@@ -437,7 +420,12 @@ def croma_application_playground():
                 bus_type,
                 bus_current_location,
             ) = BackendService.fetch_bus_details(
-                current_bus_id, input_starting_location, input_user_destination
+                current_bus_id,
+                input_starting_location,
+                input_user_destination,
+                bus_snapshots[current_bus_id],
+                bus_data.get(current_bus_id),
+                arrival_estimates.get(current_bus_id),
             )
 
             # Display a custom horizontal rule with reducecd margins
@@ -566,7 +554,7 @@ def croma_application_playground():
 
             with bus_fare_column:
                 # Fetch the route id assignjed to the bus
-                selected_bus_route_id = retrieve_bus_route_id(bus_id)
+                selected_bus_route_id = bus_snapshots[bus_id].current_route_id
 
                 # Calculate the fare from the user's boarding point to dropping point
                 bus_fare = BusFareCalculator.bus_fare_calculator(
@@ -592,7 +580,7 @@ def croma_application_playground():
 
             if display_map_button:
                 # Retrieve the current location of the bus
-                bus_current_location = retrieve_current_location(bus_id)
+                bus_current_location = bus_snapshots[bus_id].current_location
                 # Display the map using folium on the web application's frontend
                 map = BackendService.display_bus_on_map(bus_current_location)
                 folium_static(map)
@@ -638,14 +626,25 @@ def view_bus_details():
     # Display a horizontal rule on the sidebar to seprate different sections
     st.sidebar.markdown("---")
 
+    try:
+        # List the buses present in the database, downloading only their Bus Ids
+        list_of_bus_ids = retrieve_bus_ids()
+    except Exception:  # pylint: disable=broad-except
+        list_of_bus_ids = []
+
     # Enter the bus id of which the details will be displayed
-    user_input_bus_id = st.sidebar.selectbox("Enter Bus Id", application_support_dictionary.all_bus_id)
+    user_input_bus_id = st.sidebar.selectbox(
+        "Enter Bus Id", list_of_bus_ids or application_support_dictionary.all_bus_id
+    )
 
     # Display button to show bus details
     show_bus_details_button = st.sidebar.button("Show Bus Details")
 
     # Display details only when input bus id is provided by the user
     if user_input_bus_id or show_bus_details_button:
+        # Read all the real-time values of the bus in a single round trip
+        bus_snapshot = retrieve_bus_snapshot(user_input_bus_id)
+
         # Fetch the necessary attributes assosciated with the input bus id
         (
             bus_name,
@@ -662,10 +661,15 @@ def view_bus_details():
             total_passengers_in_bus,
             load_factor,
             percentage_journey_completed,
-        ) = BackendService.fetch_bus_attributes(user_input_bus_id)
+        ) = BackendService.fetch_bus_attributes(user_input_bus_id, bus_snapshot)
         # Display the name of the bus
         st.markdown("<H2>" + bus_name + "</H2>", unsafe_allow_html=True)
 
+        # Display the age of the real-time values, which may be served from memory
+        staleness_age = retrieve_staleness_age(user_input_bus_id)
+        if staleness_age is not None:
+            st.caption("Updated " + str(int(staleness_age)) + "s ago")
+
         # Segment the first section to three columns with different width size
         col1, col2, col3 = st.columns([1.3, 1.48, 1.9])
 
@@ -779,13 +783,13 @@ def view_bus_details():
         )
         current_time = datetime.now().time()  # determine the current time
 
-        # Fetch the time of arrival of the bus at the previous stop
-        time_of_arrival_at_last_stop = retrieve_last_stop_arrival_time(
-            user_input_bus_id
+        # Fetch the time of arrival of the bus at the previous stop, as service seconds
+        time_of_arrival_at_last_stop = service_time.to_service_seconds(
+            bus_snapshot.last_stop_arrival_time
         )
-        # Parse the datetime object in string frormat
-        time_of_arrival_at_last_stop_str = time_of_arrival_at_last_stop.strftime(
-            "%H:%M"
+        # Format the time of arrival at the previous stop as HH:MM
+        time_of_arrival_at_last_stop_str = service_time.format_clock(
+            time_of_arrival_at_last_stop
         )
 
         # Calculate the time in mins to reach the next stop, strating from current location of the bus
@@ -794,9 +798,10 @@ def view_bus_details():
             - stops_in_route[bus_current_location]
         )
         # Determine the estimated time of arrival at the next stop
-        time_of_arrival_at_next_stop_str = add_minutes_to_time(
-            time_of_arrival_at_last_stop_str,
-            time_in_mins_to_reach_next_stop_from_current_stop,
+        time_of_arrival_at_next_stop_str = service_time.format_clock(
+            time_of_arrival_at_last_stop
+            + time_in_mins_to_reach_next_stop_from_current_stop
+            * service_time.SECONDS_PER_MINUTE
         )
 
         # Display the details corresponding to the current location and the estimated time
@@ -950,32 +955,34 @@ def view_bus_details():
         # Display the section heading for More Information
         st.markdown("<H5>More Information</H5>", unsafe_allow_html=True)
 
-        # initialize the route guide as an empty string
-        route_guide_string = ""
+        # Fetch the timetable of the bus, memoized until the bus reports a new stop
+        route_guide = BackendService.fetch_route_guide(bus_snapshot)
 
         # Create an expander to hold the bus route guide
         with st.expander("Bus Route Guide"):
-            # Iterate through all the bus stops in the bus stops list
-            for i in range(len(all_bus_stops_list)):
-                # Display names of each stop followed by arrow indicating direction of travel
-                if (
-                    all_bus_stops_list.index(all_bus_stops_list[i])
-                    == len(all_bus_stops_list) - 1
-                ):
-                    route_guide_string = route_guide_string + all_bus_stops_list[i]
-                else:
-                    route_guide_string = (
-                        route_guide_string + all_bus_stops_list[i] + " -> "
+            # Display names of each stop followed by arrow indicating direction of travel
+            st.write(" -> ".join(all_bus_stops_list))
+
+            if route_guide is not None:
+                # Display the scheduled and the expected arrival at each of the stops
+                st.table(
+                    pd.DataFrame(
+                        [
+                            (
+                                route_guide_stop.bus_stop,
+                                route_guide_stop.scheduled_arrival or "-",
+                                route_guide_stop.expected_arrival or "Departed",
+                            )
+                            for route_guide_stop in route_guide
+                        ],
+                        columns=["Bus Stop", "Scheduled", "Expected"],
                     )
-
-            st.write(
-                route_guide_string
-            )  # Display the route guide string in the expander
+                )
 
         # Display an expaner to show the current location of the bus
         with st.expander("Track Live Location"):
             # Retrieve the current location of the bus
-            bus_current_location = retrieve_current_location(user_input_bus_id)
+            bus_current_location = bus_snapshot.current_location
 
             # Display the bus's current location on folium map
             map = BackendService.display_bus_on_map(bus_current_location)
@@ -18,6 +18,536 @@
 
 # pylint: skip-file
 
+import datetime
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from application import application_database
+from application import application_support_dictionary
+from application.application_eta_engine import eta_engine
+from application.application_journey_planner import JourneyPlanner
+from application.application_route_index import RouteIndex
+from application.application_spatial_index import SpatialIndex
+
+from database import bus_state_store
+from database import firebase_database
+from database.firebase_conditional_reader import ConditionalReader
+from database.firebase_database import BusSnapshot
+from database.firebase_write_buffer import FirebaseWriteBuffer
+from database.inmemory_database import InMemoryDatabase
+from hardware import service_time
+
+# Round trip to the firebase database, as measured from the ticketing machine
+SIMULATED_LATENCY = 0.002
+SIMULATED_JITTER = 0.001
+# Connections in the HTTP connection pool used by the firebase admin SDK
+SIMULATED_CONNECTIONS = 10
+
+FLEET = ["KL13N", "KL08B", "KL17Q", "KL24P", "KL64L"]
+
+
+def use_inmemory_database(
+    latency=SIMULATED_LATENCY, jitter=SIMULATED_JITTER, max_connections=None
+):
+    """
+    Replace the firebase database with a seeded in-memory stand-in of the fleet.
+    """
+    database = InMemoryDatabase(latency=0.0, seed=42, max_connections=max_connections)
+    firebase_database.set_database_backend(database)
+
+    for bus_id in FLEET:
+        firebase_database.initialize_database(bus_id, "Route01")
+
+    # Network costs are added only after the fleet has been initialized
+    database.latency = latency
+    database.jitter = jitter
+    return database
+
+
+class TicketingWriteSuite:
+    """
+    Benchmarks the database writes made for each ticket printed on a terminal.
+    """
+    def setup(self):
+        self.database = use_inmemory_database()
+        self.write_buffer = FirebaseWriteBuffer(flush_interval=None)
+
+    def time_read_modify_write(self):
+        firebase_database.update_passengers_count("KL13N", 4)
+        available_seats = firebase_database.retrieve_available_seats("KL13N")
+        firebase_database.update_available_seats("KL13N", available_seats - 1)
+
+    def time_write_buffer(self):
+        self.write_buffer.stage(
+            "KL13N", {"passengers_count": 4, "available_seats": 28}
+        )
+        self.write_buffer.flush()
+
+
+class CounterContentionSuite:
+    """
+    Benchmarks the seat counters of one bus, updated by many terminals at once.
+    """
+    params = [1, 8, 32]
+    param_names = ["writers"]
+
+    TICKETS_PER_WRITER = 5
+
+    def setup(self, writers):
+        self.database = use_inmemory_database()
+
+    def _run_writers(self, writers, print_ticket):
+        firebase_database.initialize_database("KL13N", "Route01")
+        threads = [threading.Thread(target=print_ticket) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _read_modify_write(self):
+        for _ in range(self.TICKETS_PER_WRITER):
+            passengers_count = firebase_database.retrieve_passengers_count("KL13N")
+            firebase_database.update_passengers_count("KL13N", passengers_count + 1)
+
+    def _server_increment(self):
+        for _ in range(self.TICKETS_PER_WRITER):
+            firebase_database.increment_bus_counters(
+                "KL13N", {"passengers_count": 1, "available_seats": -1}
+            )
+
+    def _write_buffer_increment(self):
+        write_buffer = FirebaseWriteBuffer(flush_interval=None)
+        for _ in range(self.TICKETS_PER_WRITER):
+            write_buffer.increment("KL13N", "passengers_count", 1)
+            write_buffer.increment("KL13N", "available_seats", -1)
+        write_buffer.flush()
+
+    def _lost_updates(self, writers):
+        expected_count = writers * self.TICKETS_PER_WRITER
+        return expected_count - firebase_database.retrieve_passengers_count("KL13N")
+
+    def time_read_modify_write(self, writers):
+        self._run_writers(writers, self._read_modify_write)
+
+    def time_server_increment(self, writers):
+        self._run_writers(writers, self._server_increment)
+
+    def time_write_buffer_increment(self, writers):
+        self._run_writers(writers, self._write_buffer_increment)
+
+    def track_lost_updates_read_modify_write(self, writers):
+        self._run_writers(writers, self._read_modify_write)
+        return self._lost_updates(writers)
+
+    def track_lost_updates_server_increment(self, writers):
+        self._run_writers(writers, self._server_increment)
+        return self._lost_updates(writers)
+
+
+class BusSearchReadSuite:
+    """
+    Benchmarks the database reads made while searching the buses of the fleet.
+    """
+    def setup(self):
+        self.database = use_inmemory_database()
+
+    def time_per_field_reads(self):
+        for bus_id in FLEET:
+            firebase_database.retrieve_current_bus_status(bus_id)
+            firebase_database.retrieve_bus_route_id(bus_id)
+            firebase_database.retrieve_current_location(bus_id)
+
+    def time_snapshot_read(self):
+        firebase_database.retrieve_bus_snapshots(FLEET)
+
+
+class BusDetailsRerunSuite:
+    """
+    Benchmarks the reads of an unchanged bus node, made on each streamlit rerun.
+    """
+    RERUNS = 20
+
+    def setup(self):
+        self.database = use_inmemory_database()
+        self.conditional_reader = ConditionalReader()
+
+    def time_full_reads(self):
+        for _ in range(self.RERUNS):
+            firebase_database.retrieve_bus_snapshot("KL13N")
+
+    def time_conditional_reads(self):
+        for _ in range(self.RERUNS):
+            self.conditional_reader.retrieve_bus_snapshot("KL13N")
+
+    def track_bytes_saved_by_conditional_reads(self):
+        for _ in range(self.RERUNS):
+            self.conditional_reader.retrieve_bus_snapshot("KL13N")
+        return self.conditional_reader.stats()["bytes_saved"]
+
+
+def percentile(latencies, fraction):
+    """
+    Return the latency below which the given fraction of the latencies fall.
+    """
+    ordered_latencies = sorted(latencies)
+    index = min(len(ordered_latencies) - 1, int(fraction * len(ordered_latencies)))
+    return ordered_latencies[index]
+
+
+class PopularBusSessionSuite:
+    """
+    Benchmarks many streamlit sessions reading the same bus at the same moment.
+    """
+    params = [8, 32, 64]
+    param_names = ["sessions"]
+
+    def setup(self, sessions):
+        self.database = use_inmemory_database(max_connections=SIMULATED_CONNECTIONS)
+        application_database.fleet_mirror.close()  # Every read goes to the database
+
+    def _run_sessions(self, sessions, retrieve_current_location, retrieve_delay):
+        barrier = threading.Barrier(sessions)
+        latencies = []
+
+        def view_bus_details():
+            barrier.wait()  # All the sessions rerun at the same moment
+            started_at = time.perf_counter()
+            retrieve_current_location("KL13N")
+            retrieve_delay("KL13N")
+            latencies.append(time.perf_counter() - started_at)
+
+        round_trips = self.database.round_trip_count()
+        threads = [threading.Thread(target=view_bus_details) for _ in range(sessions)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return self.database.round_trip_count() - round_trips, latencies
+
+    def _run_uncoalesced(self, sessions):
+        return self._run_sessions(
+            sessions,
+            firebase_database.retrieve_current_location,
+            firebase_database.retrieve_bus_total_delay,
+        )
+
+    def _run_coalesced(self, sessions):
+        application_database.bus_values.invalidate()  # Measure the cold reads
+        return self._run_sessions(
+            sessions,
+            application_database.retrieve_current_location,
+            application_database.retrieve_bus_total_delay,
+        )
+
+    def time_uncoalesced_reads(self, sessions):
+        self._run_uncoalesced(sessions)
+
+    def time_coalesced_reads(self, sessions):
+        self._run_coalesced(sessions)
+
+    def track_backend_calls_uncoalesced(self, sessions):
+        return self._run_uncoalesced(sessions)[0]
+
+    def track_backend_calls_coalesced(self, sessions):
+        return self._run_coalesced(sessions)[0]
+
+    def track_p99_latency_ms_uncoalesced(self, sessions):
+        return 1000 * percentile(self._run_uncoalesced(sessions)[1], 0.99)
+
+    def track_p99_latency_ms_coalesced(self, sessions):
+        return 1000 * percentile(self._run_coalesced(sessions)[1], 0.99)
+
+
+class BusStateStoreSuite:
+    """
+    Benchmarks the same ticketing & search workloads, on every store of bus state.
+    """
+    params = ["firebase", "sqlite", "memory"]
+    param_names = ["store"]
+
+    WRITERS = 8
+    TICKETS_PER_WRITER = 5
+
+    def setup(self, store):
+        self.directory = None
+
+        if store == "firebase":
+            self.database = use_inmemory_database()
+            self.store = bus_state_store.FirebaseBusStateStore()
+        elif store == "sqlite":
+            self.directory = tempfile.mkdtemp()
+            self.store = bus_state_store.SQLiteBusStateStore(
+                os.path.join(self.directory, "croma_bus_state.db")
+            )
+        else:
+            self.store = bus_state_store.InMemoryBusStateStore()
+
+        for bus_id in FLEET:
+            self.store.start_trip(bus_id, "Route01", reset_counters=True)
+
+    def teardown(self, store):
+        if store == "sqlite":
+            self.store.connection_pool.close()
+            for file_name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, file_name))
+            os.rmdir(self.directory)
+
+    def _print_tickets(self):
+        for _ in range(self.TICKETS_PER_WRITER):
+            self.store.increment_counters(
+                "KL13N", {"passengers_count": 1, "available_seats": -1}
+            )
+
+    def time_ticket_increments(self, store):
+        threads = [
+            threading.Thread(target=self._print_tickets) for _ in range(self.WRITERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def time_write_buffer_flush(self, store):
+        write_buffer = FirebaseWriteBuffer(flush_interval=None, store=self.store)
+        for bus_id in FLEET:
+            write_buffer.increment(bus_id, "passengers_count", 1)
+            write_buffer.stage(bus_id, {"current_location": "Kochi"})
+        write_buffer.flush()
+
+    def time_ticketing_rerun(self, store):
+        self.store.start_trip("KL13N", "Route01")
+        self.store.retrieve_field("KL13N", "last_stop_arrival_time")
+
+    def time_bus_search(self, store):
+        self.store.retrieve_active_bus_snapshots(FLEET)
+        self.store.retrieve_bus_snapshots_with_seats(FLEET)
+
+
+class EtaSuite:
+    """
+    Benchmarks the arrival estimates of all the buses listed at a busy bus stop.
+    """
+    params = [10, 100, 1000]
+    param_names = ["buses"]
+
+    def setup(self, buses):
+        bus_stops = application_support_dictionary.all_routes["Route01"]
+        self.boarding_point, self.dropping_point = bus_stops[2], bus_stops[-1]
+
+        last_stop_arrival_time = datetime.datetime.now()
+        self.bus_snapshots = {
+            "KL" + str(bus): BusSnapshot(
+                bus_id="KL" + str(bus),
+                available_seats=30,
+                current_location=bus_stops[bus % 3],
+                passengers_count=2,
+                current_bus_status="Active",
+                current_route_id="Route01",
+                delay_in_mins=bus % 7,
+                last_stop_arrival_time=last_stop_arrival_time,
+            )
+            for bus in range(buses)
+        }
+
+    def time_estimate_per_bus(self, buses):
+        for bus_id, bus_snapshot in self.bus_snapshots.items():
+            eta_engine.estimate_arrivals(
+                {bus_id: bus_snapshot}, self.boarding_point, self.dropping_point
+            )
+
+    def time_estimate_fleet(self, buses):
+        eta_engine.estimate_arrivals(
+            self.bus_snapshots, self.boarding_point, self.dropping_point
+        )
+
+
+def string_minutes_between(start, end):
+    """
+    The HH:MM string path, used for the delays and the ETAs before service time.
+    """
+    hours1, minutes1 = map(int, start.strftime("%H:%M").split(":"))
+    hours2, minutes2 = map(int, end.strftime("%H:%M").split(":"))
+    return (hours2 * 60 + minutes2) - (hours1 * 60 + minutes1)
+
+
+def string_add_minutes(moment, minutes):
+    time_obj = datetime.datetime.strptime(moment.strftime("%H:%M"), "%H:%M")
+    return (time_obj + datetime.timedelta(minutes=minutes)).strftime("%H:%M")
+
+
+class ServiceTimeSuite:
+    """
+    Benchmarks the delay & ETA arithmetic, on HH:MM strings and on service seconds.
+    """
+    MOMENTS = 1000
+
+    def setup(self):
+        start = datetime.datetime(2024, 1, 15, 21, 0, 0)
+        self.moments = [
+            start + datetime.timedelta(seconds=17 * moment)
+            for moment in range(self.MOMENTS)
+        ]
+        self.stored_moments = [
+            moment.strftime("%Y-%m-%d %H:%M:%S") for moment in self.moments
+        ]
+        self.now = self.moments[-1]
+        self.service_date = service_time.service_day(self.moments[0])
+
+    def time_minutes_between_strings(self):
+        for moment in self.moments:
+            string_minutes_between(moment, self.now)
+
+    def time_minutes_between_service_seconds(self):
+        for moment in self.moments:
+            service_time.minutes_between(moment, self.now)
+
+    def time_add_minutes_strings(self):
+        for moment in self.moments:
+            string_add_minutes(moment, 7)
+
+    def time_add_minutes_service_seconds(self):
+        for moment in self.moments:
+            service_time.format_clock(service_time.to_service_seconds(moment) + 7 * 60)
+
+    def time_parse_and_subtract_strings(self):
+        for stored_moment in self.stored_moments:
+            string_minutes_between(
+                datetime.datetime.strptime(stored_moment, "%Y-%m-%d %H:%M:%S"),
+                self.now,
+            )
+
+    def time_parse_and_subtract_bulk(self):
+        seconds = service_time.to_service_seconds_many(
+            self.stored_moments, self.service_date
+        )
+        (service_time.to_service_seconds(self.now, self.service_date) - seconds) // 60
+
+
+class RouteGuideSuite:
+    """
+    Benchmarks the route guide timetable, drawn on every rerun of the details page.
+    """
+    def setup(self):
+        self.route_id = "Route01"
+        self.bus_stops = application_support_dictionary.all_routes[self.route_id]
+        self.stop_timings = application_support_dictionary.bus_timings[self.route_id]
+        self.current_location = self.bus_stops[2]
+        self.last_stop_arrival_time = datetime.datetime(2024, 1, 15, 23, 50)
+
+    def time_timetable_per_stop_strings(self):
+        current_offset = self.stop_timings[self.current_location]
+        for bus_stop in self.bus_stops:
+            string_add_minutes(
+                self.last_stop_arrival_time,
+                self.stop_timings[bus_stop] - current_offset,
+            )
+
+    def time_timetable_vectorized(self):
+        eta_engine._compute_route_timetable(
+            self.route_id, self.current_location, self.last_stop_arrival_time, 7
+        )
+
+    def time_timetable_memoized(self):
+        eta_engine.route_timetable(
+            self.route_id, self.current_location, self.last_stop_arrival_time, 7
+        )
+
+
+class JourneyPlannerSuite:
+    """
+    Benchmarks the journey planner, on a grid of routes along streets & avenues.
+    """
+    params = [20, 50, 100]
+    param_names = ["grid_size"]
+
+    BUSES_PER_ROUTE = 6
+
+    def setup(self, grid_size):
+        all_routes, bus_timings = {}, {}
+        for line in range(grid_size):
+            for direction, stops in (
+                ("Street", ["S%d-%d" % (line, stop) for stop in range(grid_size)]),
+                ("Avenue", ["S%d-%d" % (stop, line) for stop in range(grid_size)]),
+            ):
+                route_id = direction + str(line)
+                all_routes[route_id] = stops
+                bus_timings[route_id] = {
+                    bus_stop: position for position, bus_stop in enumerate(stops)
+                }
+
+        self.journey_planner = JourneyPlanner(RouteIndex(all_routes, bus_timings))
+        self.now = datetime.datetime(2024, 1, 15, 10, 0)
+
+        # Buses leave the origin of every route, at intervals of half the route
+        self.bus_snapshots = {}
+        for route_id, stops in all_routes.items():
+            for bus in range(self.BUSES_PER_ROUTE):
+                bus_id = route_id + "-" + str(bus)
+                self.bus_snapshots[bus_id] = BusSnapshot(
+                    bus_id=bus_id,
+                    available_seats=30,
+                    current_location=stops[0],
+                    passengers_count=0,
+                    current_bus_status="Active",
+                    current_route_id=route_id,
+                    delay_in_mins=0,
+                    last_stop_arrival_time=self.now
+                    + datetime.timedelta(minutes=grid_size // 2 * bus),
+                )
+
+        self.origin = "S0-1"
+        self.destination = "S%d-%d" % (grid_size - 1, grid_size - 1)
+
+    def time_plan_journeys(self, grid_size):
+        self.journey_planner.plan_journeys(
+            self.origin, self.destination, self.bus_snapshots, now=self.now
+        )
+
+    def track_pareto_journeys(self, grid_size):
+        return len(
+            self.journey_planner.plan_journeys(
+                self.origin, self.destination, self.bus_snapshots, now=self.now
+            )
+        )
+
+
+class SpatialIndexSuite:
+    """
+    Benchmarks the nearby searches, on points scattered over a city.
+    """
+    params = [1000, 10000, 50000]
+    param_names = ["point_count"]
+
+    def setup(self, point_count):
+        generator = np.random.default_rng(7)
+        latitudes = generator.uniform(8.3, 8.7, point_count)
+        longitudes = generator.uniform(76.8, 77.1, point_count)
+
+        self.points = {
+            "P" + str(point): (latitude, longitude)
+            for point, (latitude, longitude) in enumerate(zip(latitudes, longitudes))
+        }
+        self.spatial_index = SpatialIndex()
+        self.spatial_index.load(self.points)
+
+    def time_nearest(self, point_count):
+        self.spatial_index.nearest(8.5, 76.95, 5)
+
+    def time_within_radius(self, point_count):
+        self.spatial_index.within_radius(8.5, 76.95, 0.5)
+
+    def time_move_point(self, point_count):
+        self.spatial_index.insert("P0", 8.5, 76.95)
+
+    def time_load(self, point_count):
+        SpatialIndex().load(self.points)
+
+
 class TimeSuite:
     """
     An example benchmark that times the performance of various kinds
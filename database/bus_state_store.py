@@ -0,0 +1,725 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the stores holding the real-time state of the buses in CroMa.
+Both the ticketing machine and the passenger application read and write the state
+of the buses through the store selected by the configuration, so the firebase db
+can be replaced by a local SQLite database, or memory, for depot-local deployments.
+
+Included Functions:
+    [1] BusStateStore (class)
+        [i] retrieve_bus_node
+        [ii] retrieve_bus_nodes
+        [iii] retrieve_field
+        [iv] retrieve_bus_snapshot
+        [v] retrieve_bus_snapshots
+        [vi] retrieve_bus_ids
+        [vii] retrieve_active_bus_snapshots
+        [viii] retrieve_bus_snapshots_with_seats
+        [ix] write_changes
+        [x] update_fields
+        [xi] increment_counters
+        [xii] start_trip
+        [xiii] end_trip
+        [xiv] end_trips
+
+    [2] FirebaseBusStateStore (class)
+    [3] InMemoryBusStateStore (class)
+    [4] SQLiteBusStateStore (class)
+    [5] create_bus_state_store
+    [6] set_bus_state_store
+    [7] bus_state_store (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
+"""
+
+import copy
+import os
+import threading
+
+from database import firebase_database
+from database.firebase_conditional_reader import conditional_reader
+from database.sql_database import SQLiteConnectionPool, chunk_bus_ids
+
+# Environment variable naming the store used: firebase, sqlite or memory
+BUS_STATE_STORE_ENV = "CROMA_BUS_STATE_STORE"
+# Environment variable holding the path of the database used by the SQLite store
+BUS_STATE_SQLITE_PATH_ENV = "CROMA_BUS_STATE_SQLITE_PATH"
+# Path of the SQLite database, used when the environment variable is not set
+BUS_STATE_SQLITE_PATH = "croma_bus_state.db"
+
+# Children of a bus node, and the type of the column each is stored in by SQLite
+BUS_FIELDS = {
+    "available_seats": "INTEGER",
+    "current_location": "TEXT",
+    "passengers_count": "INTEGER",
+    "current_bus_status": "TEXT",
+    "current_route_id": "TEXT",
+    "delay_in_mins": "INTEGER",
+    "last_stop_arrival_time": "TEXT",
+}
+
+
+class BusStateStore:
+    """
+    Class defining the operations, which every store of the bus state provides.
+
+    The stores hold one node per bus, keyed by the Bus Id, with the children named
+    in BUS_FIELDS. Subclasses implement the reads of the nodes, the atomic writes,
+    and the start of a trip. The remaining operations are built on top of these,
+    and may be overridden by the stores which can run them more efficiently.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Stores which are remote are placed behind caches by the application
+    """
+
+    name = None  # Name of the store, as used in the configuration
+    is_remote = False  # True if the reads of the store go over the network
+
+    def retrieve_bus_node(self, bus_id):
+        """
+        Method to retrieve the value of the node of a bus, as a dictionary.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the store
+
+        Returns:
+            [dict] bus_node: Children of the node as key, None if bus is missing
+        """
+        raise NotImplementedError
+
+    def retrieve_bus_nodes(self, bus_ids=None):
+        """
+        Method to retrieve the values of the nodes of several buses, in one read.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] bus_ids: Bus Ids whose nodes are to be read, all buses if None
+
+        Returns:
+            [dict] bus_nodes: Bus Id as key, and the value of its node as value
+        """
+        raise NotImplementedError
+
+    def write_changes(self, field_changes, counter_deltas=None):
+        """
+        Method to atomically write the new field values & counter deltas of buses.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [dict] field_changes: Bus Id as key, and hashmap of the new field values
+            [dict] counter_deltas: Bus Id as key, and hashmap of the counter deltas
+
+        Returns:
+            None -> All the changes are applied together, or none of them are
+        """
+        raise NotImplementedError
+
+    def start_trip(self, bus_id, route_id, reset_counters=False):
+        """
+        Method to mark a bus as active on a route, and fetch its node atomically.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the store
+            [str] route_id: Unique Route Id assigned to the bus for this trip
+            [bool] reset_counters: True to start the trip with default values
+
+        Returns:
+            [BusSnapshot] bus_snapshot: Real-time state of the bus, after the update
+        """
+        raise NotImplementedError
+
+    def retrieve_field(self, bus_id, field):
+        """
+        Method to retrieve the value of a single child of the node of a bus.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the store
+            [str] field: Child name of the bus node, to be retrieved
+
+        Returns:
+            [any] value: Value of the child, None if the bus or child is missing
+        """
+        bus_node = self.retrieve_bus_node(bus_id)
+        return bus_node.get(field) if isinstance(bus_node, dict) else None
+
+    def retrieve_bus_snapshot(self, bus_id):
+        """
+        Method to retrieve all real-time values of a bus, as a BusSnapshot record.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the store
+
+        Returns:
+            [BusSnapshot] bus_snapshot: Real-time state of the bus, None if missing
+        """
+        bus_node = self.retrieve_bus_node(bus_id)
+        return firebase_database.parse_bus_snapshot(bus_id, bus_node)
+
+    def retrieve_bus_snapshots(self, bus_ids):
+        """
+        Method to retrieve the real-time values of several buses, in one read.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] bus_ids: Bus Ids whose nodes are to be read from the store
+
+        Returns:
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+        """
+        return self._parse_bus_snapshots(self.retrieve_bus_nodes(bus_ids))
+
+    def retrieve_bus_ids(self):
+        """
+        Method to retrieve the Bus Ids of all the buses present in the store.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [list] bus_ids: Sorted list of the Bus Ids of the buses in the store
+        """
+        return sorted(self.retrieve_bus_nodes())
+
+    def retrieve_active_bus_snapshots(self, bus_ids=None):
+        """
+        Method to retrieve the real-time values of only the buses that are active.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] bus_ids: Bus Ids to be kept from the result, all buses if None
+
+        Returns:
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+        """
+        return {
+            bus_id: bus_snapshot
+            for bus_id, bus_snapshot in self._parse_bus_snapshots(
+                self.retrieve_bus_nodes(bus_ids)
+            ).items()
+            if bus_snapshot.current_bus_status == "Active"
+        }
+
+    def retrieve_bus_snapshots_with_seats(
+        self, bus_ids=None, min_seats=1, max_seats=None
+    ):
+        """
+        Method to retrieve the real-time values of the buses with seats in a range.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] bus_ids: Bus Ids to be kept from the result, all buses if None
+            [int] min_seats: Lowest number of seats available in the bus, inclusive
+            [int] max_seats: Highest number of seats available, inclusive if given
+
+        Returns:
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+        """
+        bus_snapshots = self._parse_bus_snapshots(self.retrieve_bus_nodes(bus_ids))
+
+        return {
+            bus_id: bus_snapshot
+            for bus_id, bus_snapshot in bus_snapshots.items()
+            if bus_snapshot.available_seats is not None
+            and bus_snapshot.available_seats >= min_seats
+            and (max_seats is None or bus_snapshot.available_seats <= max_seats)
+        }
+
+    def update_fields(self, bus_id, fields):
+        """
+        Method to write the new values of some of the fields of a bus.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the store
+            [dict] fields: Child names of the bus node as key, & the new values
+
+        Returns:
+            None -> The fields are updated, while the other children are kept
+        """
+        self.write_changes({bus_id: fields})
+
+    def increment_counters(self, bus_id, counter_deltas):
+        """
+        Method to atomically increment the counters of a bus, without reading them.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the store
+            [dict] counter_deltas: Child names as key, & amounts to be added as value
+
+        Returns:
+            None -> The counters are incremented, even by concurrent writers
+        """
+        self.write_changes({}, {bus_id: counter_deltas})
+
+    def end_trip(self, bus_id):
+        """
+        Method to mark a bus as inactive, and reset its node to the default values.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the store
+
+        Returns:
+            [BusSnapshot] bus_snapshot: Real-time state of the bus, after the reset
+        """
+        return self.end_trips([bus_id])[bus_id]
+
+    def end_trips(self, bus_ids):
+        """
+        Method to end the trips of several buses, such as a depot's fleet at day end.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] bus_ids: Bus Ids of the buses whose trips are to be ended
+
+        Returns:
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+        """
+        bus_nodes = {
+            bus_id: firebase_database.default_bus_node() for bus_id in bus_ids
+        }
+
+        # Reset the nodes of all the buses in one atomic write
+        if bus_nodes:
+            self.write_changes(bus_nodes)
+
+        return self._parse_bus_snapshots(bus_nodes)
+
+    @staticmethod
+    def _parse_bus_snapshots(bus_nodes):
+        bus_snapshots = {}  # Initialize an empty dictionary to store the snapshots
+
+        for bus_id, bus_node in bus_nodes.items():
+            bus_snapshot = firebase_database.parse_bus_snapshot(bus_id, bus_node)
+
+            if bus_snapshot is not None:
+                bus_snapshots[bus_id] = bus_snapshot
+
+        return bus_snapshots
+
+
+class FirebaseBusStateStore(BusStateStore):
+    """
+    Class to hold the state of the buses in the firebase real-time database.
+
+    All the operations are delegated to the firebase database module, so that the
+    backend set on it is used, and the indexed queries and conditional reads are
+    run on the firebase servers.
+
+    .. versionadded:: 1.4.0
+    """
+
+    name = "firebase"
+    is_remote = True
+
+    def retrieve_bus_node(self, bus_id):
+        return firebase_database.db.reference(bus_id).get()
+
+    def retrieve_bus_nodes(self, bus_ids=None):
+        database_nodes = firebase_database.db.reference("/").get() or {}
+
+        if bus_ids is None:
+            bus_ids = [
+                key
+                for key in database_nodes
+                if key not in firebase_database.NON_BUS_NODES
+            ]
+
+        return {
+            bus_id: database_nodes[bus_id]
+            for bus_id in bus_ids
+            if isinstance(database_nodes.get(bus_id), dict)
+        }
+
+    def retrieve_field(self, bus_id, field):
+        return firebase_database.db.reference(bus_id).child(field).get()
+
+    def retrieve_bus_snapshot(self, bus_id):
+        # Download the node only if it has changed, since the last read of the bus
+        return conditional_reader.retrieve_bus_snapshot(bus_id)
+
+    def retrieve_bus_snapshots(self, bus_ids):
+        return firebase_database.retrieve_bus_snapshots(bus_ids)
+
+    def retrieve_bus_ids(self):
+        return firebase_database.retrieve_bus_ids()
+
+    def retrieve_active_bus_snapshots(self, bus_ids=None):
+        return firebase_database.retrieve_active_bus_snapshots(bus_ids)
+
+    def retrieve_bus_snapshots_with_seats(
+        self, bus_ids=None, min_seats=1, max_seats=None
+    ):
+        return firebase_database.retrieve_bus_snapshots_with_seats(
+            bus_ids, min_seats=min_seats, max_seats=max_seats
+        )
+
+    def write_changes(self, field_changes, counter_deltas=None):
+        firebase_database.write_bus_changes(field_changes, counter_deltas)
+
+    def start_trip(self, bus_id, route_id, reset_counters=False):
+        return firebase_database.start_trip(bus_id, route_id, reset_counters)
+
+    def end_trips(self, bus_ids):
+        return firebase_database.end_trips(bus_ids)
+
+
+class InMemoryBusStateStore(BusStateStore):
+    """
+    Class to hold the state of the buses in a dictionary, within the same process.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: State is lost when the process exits, and isn't shared with other ones
+    """
+
+    name = "memory"
+
+    def __init__(self, bus_nodes=None):
+        """
+        Method to create the store, holding a copy of the given bus nodes.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [dict] bus_nodes: Bus Id as key, and the value of its node as value
+
+        Returns:
+            None -> The store is created, empty if no bus nodes are passed
+        """
+        self._bus_nodes = copy.deepcopy(bus_nodes) if bus_nodes else {}
+        self._lock = threading.Lock()
+
+    def retrieve_bus_node(self, bus_id):
+        with self._lock:
+            return copy.copy(self._bus_nodes.get(bus_id))
+
+    def retrieve_bus_nodes(self, bus_ids=None):
+        with self._lock:
+            if bus_ids is None:
+                bus_ids = list(self._bus_nodes)
+
+            return {
+                bus_id: copy.copy(self._bus_nodes[bus_id])
+                for bus_id in bus_ids
+                if bus_id in self._bus_nodes
+            }
+
+    def write_changes(self, field_changes, counter_deltas=None):
+        with self._lock:
+            for bus_id, fields in field_changes.items():
+                self._bus_nodes.setdefault(bus_id, {}).update(fields)
+
+            for bus_id, deltas in (counter_deltas or {}).items():
+                bus_node = self._bus_nodes.setdefault(bus_id, {})
+
+                for counter, delta in deltas.items():
+                    bus_node[counter] = (bus_node.get(counter) or 0) + delta
+
+    def start_trip(self, bus_id, route_id, reset_counters=False):
+        with self._lock:
+            if reset_counters:
+                bus_node = firebase_database.default_bus_node("Active", route_id)
+            else:
+                bus_node = firebase_database.resume_bus_node(
+                    self._bus_nodes.get(bus_id), route_id
+                )
+
+            self._bus_nodes[bus_id] = bus_node
+            return firebase_database.parse_bus_snapshot(bus_id, dict(bus_node))
+
+
+class SQLiteBusStateStore(BusStateStore):
+    """
+    Class to hold the state of the buses in a local SQLite database, in WAL mode.
+
+    Each bus is a row of the BusState table, and each field is a column of it. The
+    reads run in parallel on the pooled read-only connections, while the writes
+    are serialized on the single writable connection, each in its own transaction.
+    The status and the available seats are indexed, like the firebase rules do.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: The table is created in the database file, the first time it is written
+    """
+
+    name = "sqlite"
+
+    def __init__(self, database_path=BUS_STATE_SQLITE_PATH):
+        """
+        Method to configure the store. The database is opened when first required.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] database_path: Path of the SQLite database file of the store
+
+        Returns:
+            None -> The store is configured, with no connections opened yet
+        """
+        self.connection_pool = SQLiteConnectionPool(database_path)
+        self._table_created = False
+
+    def _write_connection(self):
+        if not self._table_created:
+            columns = ", ".join(
+                field + " " + column_type for field, column_type in BUS_FIELDS.items()
+            )
+
+            with self.connection_pool.write_connection() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS BusState "
+                    "(BusId TEXT PRIMARY KEY, " + columns + ")"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS BusStateStatus "
+                    "ON BusState (current_bus_status)"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS BusStateSeats "
+                    "ON BusState (available_seats)"
+                )
+            self._table_created = True
+
+        return self.connection_pool.write_connection()
+
+    def _read_connection(self):
+        if not self._table_created:
+            with self._write_connection():
+                pass  # Create the table, so that the lookups don't fail
+
+        return self.connection_pool.read_connection()
+
+    @staticmethod
+    def _row_to_bus_node(row):
+        # Columns holding NULL are missing children, like in the firebase database
+        return {
+            field: value
+            for field, value in zip(BUS_FIELDS, row[1:])
+            if value is not None
+        }
+
+    def _select_bus_nodes(self, condition="", parameters=(), bus_ids=None):
+        query = "SELECT BusId, " + ", ".join(BUS_FIELDS) + " FROM BusState"
+
+        if bus_ids is None:
+            with self._read_connection() as connection:
+                rows = connection.execute(query + condition, parameters).fetchall()
+
+            return {row[0]: self._row_to_bus_node(row) for row in rows}
+
+        # Filter the requested buses in SQL, binding their ids in chunks
+        query = query + (condition + " AND" if condition else " WHERE") + " BusId IN "
+
+        bus_nodes = {}
+        with self._read_connection() as connection:
+            for placeholders, chunk in chunk_bus_ids(bus_ids):
+                rows = connection.execute(
+                    query + placeholders, tuple(parameters) + tuple(chunk)
+                )
+                for row in rows:
+                    bus_nodes[row[0]] = self._row_to_bus_node(row)
+
+        return bus_nodes
+
+    def retrieve_bus_node(self, bus_id):
+        return self._select_bus_nodes(" WHERE BusId = ?", (bus_id,)).get(bus_id)
+
+    def retrieve_bus_nodes(self, bus_ids=None):
+        return self._select_bus_nodes(bus_ids=bus_ids)
+
+    def retrieve_field(self, bus_id, field):
+        if field not in BUS_FIELDS:
+            return None
+
+        with self._read_connection() as connection:
+            row = connection.execute(
+                "SELECT " + field + " FROM BusState WHERE BusId = ?", (bus_id,)
+            ).fetchone()
+
+        return row[0] if row is not None else None
+
+    def retrieve_bus_ids(self):
+        with self._read_connection() as connection:
+            rows = connection.execute("SELECT BusId FROM BusState ORDER BY BusId")
+            return [row[0] for row in rows]
+
+    def retrieve_active_bus_snapshots(self, bus_ids=None):
+        # Filter the buses using the index on the status of the buses
+        bus_nodes = self._select_bus_nodes(
+            " WHERE current_bus_status = ?", ("Active",), bus_ids
+        )
+
+        return self._parse_bus_snapshots(bus_nodes)
+
+    def retrieve_bus_snapshots_with_seats(
+        self, bus_ids=None, min_seats=1, max_seats=None
+    ):
+        condition, parameters = " WHERE available_seats >= ?", (min_seats,)
+        if max_seats is not None:
+            condition, parameters = condition + " AND available_seats <= ?", (
+                min_seats,
+                max_seats,
+            )
+
+        # Filter the buses using the index on the available seats of the buses
+        bus_nodes = self._select_bus_nodes(condition, parameters, bus_ids)
+
+        return self._parse_bus_snapshots(bus_nodes)
+
+    @staticmethod
+    def _check_fields(fields):
+        # Column names can't be bound as parameters, so only known ones are allowed
+        for field in fields:
+            if field not in BUS_FIELDS:
+                raise ValueError("Unknown field of the bus node: " + str(field))
+
+    def write_changes(self, field_changes, counter_deltas=None):
+        counter_deltas = counter_deltas or {}
+
+        with self._write_connection() as connection:
+            for bus_id in set(field_changes) | set(counter_deltas):
+                connection.execute(
+                    "INSERT OR IGNORE INTO BusState (BusId) VALUES (?)", (bus_id,)
+                )
+
+            for bus_id, fields in field_changes.items():
+                if not fields:
+                    continue
+
+                self._check_fields(fields)
+                assignments = ", ".join(field + " = ?" for field in fields)
+                connection.execute(
+                    "UPDATE BusState SET " + assignments + " WHERE BusId = ?",
+                    tuple(fields.values()) + (bus_id,),
+                )
+
+            for bus_id, deltas in counter_deltas.items():
+                if not deltas:
+                    continue
+
+                # Counters are added to in the statement, so no update is lost
+                self._check_fields(deltas)
+                assignments = ", ".join(
+                    counter + " = COALESCE(" + counter + ", 0) + ?"
+                    for counter in deltas
+                )
+                connection.execute(
+                    "UPDATE BusState SET " + assignments + " WHERE BusId = ?",
+                    tuple(deltas.values()) + (bus_id,),
+                )
+
+    def start_trip(self, bus_id, route_id, reset_counters=False):
+        # Writes are serialized on the writable connection, so the read is current
+        with self._write_connection() as connection:
+            row = connection.execute(
+                "SELECT BusId, " + ", ".join(BUS_FIELDS) + " FROM BusState "
+                "WHERE BusId = ?",
+                (bus_id,),
+            ).fetchone()
+
+            if reset_counters:
+                bus_node = firebase_database.default_bus_node("Active", route_id)
+            else:
+                bus_node = firebase_database.resume_bus_node(
+                    self._row_to_bus_node(row) if row is not None else None,
+                    route_id,
+                )
+
+            connection.execute(
+                "INSERT OR REPLACE INTO BusState (BusId, "
+                + ", ".join(BUS_FIELDS)
+                + ") VALUES (?"
+                + ", ?" * len(BUS_FIELDS)
+                + ")",
+                (bus_id,) + tuple(bus_node.get(field) for field in BUS_FIELDS),
+            )
+
+        return firebase_database.parse_bus_snapshot(bus_id, bus_node)
+
+
+def create_bus_state_store(store_name=None):
+    """
+    Function to create the store of the bus state, named by the configuration.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] store_name: firebase, sqlite or memory, read from env if not given
+
+    Returns:
+        [BusStateStore] bus_state_store: Store of the real-time state of buses
+    """
+    if store_name is None:
+        store_name = os.environ.get(BUS_STATE_STORE_ENV, "firebase")
+
+    if store_name == "firebase":
+        return FirebaseBusStateStore()
+
+    if store_name == "sqlite":
+        return SQLiteBusStateStore(
+            os.environ.get(BUS_STATE_SQLITE_PATH_ENV, BUS_STATE_SQLITE_PATH)
+        )
+
+    if store_name == "memory":
+        return InMemoryBusStateStore()
+
+    raise ValueError("Unknown bus state store: " + store_name)
+
+
+def set_bus_state_store(store):
+    """
+    Function to replace the store of the bus state used by the apps & the backend.
+
+    The ticketing machine, the write buffer and the application read the store
+    from this module at call time, so a single call switches all of them.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [BusStateStore] store: Store of the real-time state of the buses
+
+    Returns:
+        None -> All later reads and writes of the bus state use the given store
+    """
+    global bus_state_store  # pylint: disable=global-statement,invalid-name
+    bus_state_store = store
+
+
+# Store of the bus state, shared by the ticketing machine & passenger application
+bus_state_store = create_bus_state_store()
@@ -0,0 +1,529 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the in-process caches placed in front of the CroMa databases.
+Values which rarely change are served from memory, and are evicted either when they
+expire, when the cache runs out of space, or when the database is explicitly changed.
+
+Included Functions:
+    [1] TTLCache (class)
+        [i] get
+        [ii] set
+        [iii] invalidate
+        [iv] clear
+        [v] stats
+
+    [2] InFlightCallTimeout (class)
+    [3] SingleFlight (class)
+        [i] do
+        [ii] stats
+
+    [4] StaleWhileRevalidateCache (class)
+        [i] get
+        [ii] peek
+        [iii] age
+        [iv] set_freshness_budget
+        [v] invalidate
+        [vi] stats
+
+.. versionadded:: 1.4.0
+
+Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds for which a value is served without refreshing it, unless configured
+DEFAULT_FRESHNESS_BUDGET = 5.0
+# Seconds after which a stale value is no longer served while it's being refreshed
+MAX_STALE_AGE = 600.0
+
+
+class TTLCache:
+    """
+    Class to cache a bounded number of values in memory, each for a fixed duration.
+
+    Values are evicted in the least recently used order once the cache is full, and
+    are treated as missing once they are older than the time-to-live of the cache.
+    Hits and misses are counted, so the effectiveness of the cache can be inspected.
+    Every clear starts a new generation, so values read from the database before
+    a clear can be kept from being cached after it, by passing the generation.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: The cache is thread-safe and can be shared across the streamlit sessions
+    """
+
+    def __init__(self, maxsize=1024, ttl=3600.0, timer=time.monotonic):
+        """
+        Method to create an empty cache with the given size and time-to-live values.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] maxsize: Maximum number of values held in the cache at a time
+            [float] ttl: Seconds for which a value is served after it is cached
+            [callable] timer: Function returning the current time in seconds
+
+        Returns:
+            None -> An empty cache is created, with hit/miss counters set to 0
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+
+        # Cached key as key, and tuple of its expiry time and value as the value
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0  # Number of lookups which were served from the cache
+        self.misses = 0  # Number of lookups which were not found, or had expired
+        self.generation = 0  # Number of times the cache has been cleared
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """
+        Method to fetch a value from the cache, if it is present and is not expired.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [hashable] key: Key against which the value was cached
+            [any] default: Value returned if key is missing or has expired
+
+        Returns:
+            [any] value: The cached value, otherwise the default value passed
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= self.timer():
+                # Drop the expired entry, so that it doesn't occupy space
+                if entry is not None:
+                    del self._entries[key]
+
+                self.misses = self.misses + 1
+                return default
+
+            self._entries.move_to_end(key)  # Mark as the most recently used value
+            self.hits = self.hits + 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None, generation=None):
+        """
+        Method to store a value in the cache, evicting the least recently used one.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [hashable] key: Key against which the value is to be cached
+            [any] value: The value to be cached
+            [float] ttl: Seconds for which the value is served, the cache's if None
+            [int] generation: Generation the value was read in, skipped if cleared
+
+        Returns:
+            None -> Value is stored in the cache until it expires, or is evicted
+
+        NOTE: Values read before the last clear are not stored, as they may be stale
+        """
+        if ttl is None:
+            ttl = self.ttl
+
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+
+            self._entries[key] = (self.timer() + ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Method to remove the value cached against a single key from the cache.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [hashable] key: Key whose value is to be removed from the cache
+
+        Returns:
+            None -> The value is removed, if it is present in the cache
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Method to remove all values from the cache. The counters are left unchanged.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> All the values cached so far are removed, & a generation begins
+        """
+        with self._lock:
+            self._entries.clear()
+            self.generation = self.generation + 1
+
+    def stats(self):
+        """
+        Method to fetch the hit and miss counters along with the size of the cache.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] stats: Hits, misses and the number of values currently cached
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class InFlightCallTimeout(TimeoutError):
+    """
+    Exception raised when a call in flight doesn't complete within a caller's wait.
+
+    .. versionadded:: 1.4.0
+    """
+
+
+class _InFlightCall:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Class to share one in-flight call among all the concurrent callers of the key.
+
+    The first caller of a key runs the function, and the callers arriving while it
+    is running wait for it, and receive the same result, or the same exception. The
+    key is forgotten once the call completes, so later callers run a fresh call.
+    Each waiting caller may give up on the call after its own timeout, while the
+    call continues to run for the rest of the callers.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Results are shared, and hence should not be modified by the callers
+    """
+
+    def __init__(self):
+        """
+        Method to create the coordinator, with no calls in flight.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> The coordinator is created, with the call counters set to 0
+        """
+        # Key of the call as key, and the call currently in flight as the value
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        self.calls = 0  # Number of calls which ran the function
+        self.shared_calls = 0  # Number of calls which waited on a call in flight
+
+    def do(self, key, function, *args, wait_timeout=None, **kwargs):
+        """
+        Method to run a function, unless a call with the same key is already running.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [hashable] key: Key identifying identical calls, such as the read path
+            [callable] function: Function to be run, if no call is in flight
+            [any] args: Arguments passed to the function
+            [float] wait_timeout: Seconds to wait on a call in flight, no limit if None
+            [any] kwargs: Keyword arguments passed to the function
+
+        Returns:
+            [any] result: Value returned by the function, run by this or other caller
+
+        NOTE: InFlightCallTimeout is raised, if the call in flight outlasts the wait
+        """
+        with self._lock:
+            call = self._calls.get(key)
+
+            if call is None:
+                call = self._calls[key] = _InFlightCall()
+                is_leader = True
+                self.calls = self.calls + 1
+            else:
+                is_leader = False
+                self.shared_calls = self.shared_calls + 1
+
+        if not is_leader:
+            if not call.done.wait(wait_timeout):
+                raise InFlightCallTimeout(
+                    "Call in flight did not complete within " + str(wait_timeout) + "s"
+                )
+
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+
+        except BaseException as error:
+            call.error = error
+            raise
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """
+        Method to fetch the number of calls which ran, & the ones that were shared.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] stats: Calls which ran the function, and the calls which waited
+        """
+        with self._lock:
+            return {"calls": self.calls, "shared_calls": self.shared_calls}
+
+
+class StaleWhileRevalidateCache:
+    """
+    Class to serve values from memory, and refresh them in the background once stale.
+
+    Each key is a tuple whose last element names the field being cached, so that
+    fields changing at different rates are given different freshness budgets. A
+    value older than its budget is still served right away, while a single refresh
+    of it runs in the background. Only the first load of a key waits on the loader,
+    or a value so old that it has exceeded the maximum stale age.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: The loader is called with the elements of the key, as its arguments
+    """
+
+    def __init__(
+        self,
+        loader,
+        freshness_budgets=None,
+        default_budget=DEFAULT_FRESHNESS_BUDGET,
+        max_stale_age=MAX_STALE_AGE,
+        max_workers=4,
+        timer=time.monotonic,
+    ):
+        """
+        Method to create an empty cache, loading the values using the given function.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [callable] loader: Function loading the value of a key from the database
+            [dict] freshness_budgets: Field name as key, and seconds fresh as value
+            [float] default_budget: Seconds fresh, for the fields without a budget
+            [float] max_stale_age: Seconds after which stale values are not served
+            [int] max_workers: Maximum number of refreshes run at the same time
+            [callable] timer: Function returning the current time in seconds
+
+        Returns:
+            None -> An empty cache is created, with its refresh threads stopped
+        """
+        self.loader = loader
+        self.freshness_budgets = dict(freshness_budgets or {})
+        self.default_budget = default_budget
+        self.max_stale_age = max_stale_age
+        self.timer = timer
+
+        # Cached key as key, and tuple of its value and the time it was loaded at
+        self._entries = {}
+        # Keys being refreshed, so that each one is refreshed only once at a time
+        self._refreshing_keys = set()
+        self._lock = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="croma-revalidate"
+        )
+
+        self.fresh_hits = 0  # Lookups served with a value within its budget
+        self.stale_hits = 0  # Lookups served with a stale value, while refreshing
+        self.misses = 0  # Lookups which waited on the loader
+        self.last_error = None  # Exception raised by the last failed refresh
+
+    def _load(self, key, *loader_args):
+        value = self.loader(*key, *loader_args)
+
+        with self._lock:
+            self._entries[key] = (value, self.timer())
+        return value
+
+    def _refresh(self, key):
+        try:
+            self._load(key)
+            self.last_error = None
+        except Exception as error:  # pylint: disable=broad-except
+            self.last_error = error  # Stale value is served until the next attempt
+        finally:
+            with self._lock:
+                self._refreshing_keys.discard(key)
+
+    def get(self, key, *loader_args):
+        """
+        Method to fetch the value of a key, refreshing it in the background if stale.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [tuple] key: Arguments of the loader, ending with the name of the field
+            [any] loader_args: Further arguments of the loader, when it's waited on
+
+        Returns:
+            [any] value: Cached value, or the value loaded if none could be served
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                age = self.timer() - entry[1]
+
+                if age <= self.freshness_budgets.get(key[-1], self.default_budget):
+                    self.fresh_hits = self.fresh_hits + 1
+                    return entry[0]
+
+                if age <= self.max_stale_age:
+                    # Serve the stale value, and refresh it once in the background
+                    if key not in self._refreshing_keys:
+                        self._refreshing_keys.add(key)
+                        self._executor.submit(self._refresh, key)
+
+                    self.stale_hits = self.stale_hits + 1
+                    return entry[0]
+
+            self.misses = self.misses + 1
+
+        return self._load(key, *loader_args)
+
+    def peek(self, key, default=None):
+        """
+        Method to fetch the last value loaded for a key, irrespective of its age.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [tuple] key: Arguments of the loader, ending with the name of the field
+            [any] default: Value returned, if the key has never been loaded
+
+        Returns:
+            [any] value: The last loaded value, otherwise the default value passed
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return default
+            return entry[0]
+
+    def age(self, key):
+        """
+        Method to fetch the seconds passed, since the value of a key was loaded.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [tuple] key: Arguments of the loader, ending with the name of the field
+
+        Returns:
+            [float] age: Seconds since the value was loaded, None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+            return self.timer() - entry[1]
+
+    def set_freshness_budget(self, field, budget):
+        """
+        Method to change the seconds for which the values of a field are fresh.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] field: Name of the field, as the last element of the keys
+            [float] budget: Seconds for which the values are served as fresh
+
+        Returns:
+            None -> The budget applies to the later lookups of the field
+        """
+        with self._lock:
+            self.freshness_budgets[field] = budget
+
+    def invalidate(self, key=None):
+        """
+        Method to remove the value of a key, or of all keys, from the cache.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [tuple] key: Key whose value is to be removed, all keys if not given
+
+        Returns:
+            None -> The next lookup of the key waits for the loader
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Method to fetch the fresh hit, stale hit, and miss counters of the cache.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] stats: Fresh hits, stale hits, misses & number of cached values
+        """
+        with self._lock:
+            return {
+                "fresh_hits": self.fresh_hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+            }
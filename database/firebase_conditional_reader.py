@@ -0,0 +1,170 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the conditional reader used by the passenger app to read buses.
+The ETag of each bus node is kept along with its value, and the node is downloaded
+again only if the database reports a different ETag, so reruns cost no payload.
+
+Included Functions:
+    [1] ConditionalReader (class)
+        [i] read_node
+        [ii] retrieve_bus_snapshot
+        [iii] invalidate
+        [iv] stats
+
+    [2] conditional_reader (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
+"""
+
+import copy
+import json
+import threading
+
+from database import firebase_database
+
+
+def _payload_size(value):
+    # Size of the value, as sent by the database in the body of the response
+    return len(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+class ConditionalReader:
+    """
+    Class to read the bus nodes conditionally, using the ETag of their last value.
+
+    The first read of a node fetches its value along with its ETag. Later reads
+    send the ETag back, and the database returns the value only if it changed.
+    Bytes of the payloads which were not downloaded again are counted as saved.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: ETags are per node, so a change to any child downloads the full node
+    """
+
+    def __init__(self):
+        """
+        Method to create a reader, with no ETags known for any of the bus nodes.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> The reader is created, and the byte counters are set to zero
+        """
+        # Path of the node as key, & a tuple of its ETag, value and size as value
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        self.full_reads = 0  # Reads which downloaded the value of the node
+        self.not_modified_reads = 0  # Reads which found the cached value unchanged
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+
+    def read_node(self, path):
+        """
+        Method to read the value of a node, downloading it only if it has changed.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] path: Path of the node to be read, such as the Bus Id of a bus
+
+        Returns:
+            [any] value: Value of the node, None if the node doesn't exist
+        """
+        ref = firebase_database.db.reference(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+
+        if entry is None:
+            value, etag = ref.get(etag=True)
+            is_changed = True
+        else:
+            is_changed, value, etag = ref.get_if_changed(entry[0])
+
+        with self._lock:
+            if not is_changed:
+                # Database confirmed that the cached value is current, skip payload
+                self.not_modified_reads = self.not_modified_reads + 1
+                self.bytes_saved = self.bytes_saved + entry[2]
+                return copy.deepcopy(entry[1])
+
+            size = _payload_size(value)
+            self._entries[path] = (etag, copy.deepcopy(value), size)
+
+            self.full_reads = self.full_reads + 1
+            self.bytes_downloaded = self.bytes_downloaded + size
+            return value
+
+    def retrieve_bus_snapshot(self, bus_id):
+        """
+        Method to retrieve all real-time values of a bus, using a conditional read.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the database
+
+        Returns:
+            [BusSnapshot] bus_snapshot: Real-time state of the bus, None if missing
+        """
+        return firebase_database.parse_bus_snapshot(bus_id, self.read_node(bus_id))
+
+    def invalidate(self, path=None):
+        """
+        Method to forget the ETag of a node, or all of them, forcing a full read.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] path: Path of the node to be forgotten, all nodes if not given
+
+        Returns:
+            None -> The next read of the node(s) downloads the value again
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
+
+    def stats(self):
+        """
+        Method to fetch the counters of the reads made, & the bytes they transferred.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] stats: Full & not modified read counts, bytes downloaded & saved
+        """
+        with self._lock:
+            return {
+                "full_reads": self.full_reads,
+                "not_modified_reads": self.not_modified_reads,
+                "bytes_downloaded": self.bytes_downloaded,
+                "bytes_saved": self.bytes_saved,
+            }
+
+
+# Conditional reader shared by all the streamlit sessions of passenger application
+conditional_reader = ConditionalReader()
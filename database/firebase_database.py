@@ -33,17 +33,37 @@ Included Functions:
     [14] retrieve_current_bus_status
     [15] retrieve_bus_route_id
     [16] update_bus_total_delay
+    [17] BusSnapshot (class)
+    [18] parse_bus_snapshot
+    [19] retrieve_bus_snapshot
+    [20] retrieve_bus_snapshots
+    [21] set_database_backend
+    [22] server_increment
+    [23] increment_bus_counters
+    [24] default_bus_node
+    [25] start_trip
+    [26] end_trip
+    [27] end_trips
+    [28] retrieve_active_bus_snapshots
+    [29] retrieve_bus_snapshots_with_seats
+    [30] retrieve_bus_ids
+    [31] resume_bus_node
+    [32] write_bus_changes
 
 .. versionadded:: 1.2.0
-.. versionupdated:: 1.3.0
+.. versionupdated:: 1.4.0
 
 Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
 """
 
+from typing import NamedTuple
 from firebase_admin import db
 import datetime
 from datetime import datetime
 
+# Nodes at the root of the database, which don't hold the real-time values of a bus
+NON_BUS_NODES = ("admins", "users")
+
 
 def initialize_database(bus_id="KL13N", input_route_id="Route00"):
     """
@@ -54,6 +74,7 @@ def initialize_database(bus_id="KL13N", input_route_id="Route00"):
     pertaining to that bus in real time. Default values are initially reflected.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
@@ -70,19 +91,7 @@ def initialize_database(bus_id="KL13N", input_route_id="Route00"):
     ref = db.reference("/")  # Create a reference to the root node of the database
 
     # Set the initial values for the real time-db, keeping bus_id as the key node
-    ref.update(
-        {
-            bus_id: {
-                "available_seats": 32,
-                "current_location": "Thampanoor",
-                "passengers_count": 0,
-                "current_bus_status": "Active",
-                "current_route_id": input_route_id,
-                "delay_in_mins": 0,
-                "last_stop_arrival_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            }
-        }
-    )
+    ref.update({bus_id: default_bus_node("Active", input_route_id)})
 
 
 def refresh_database(bus_id):
@@ -94,6 +103,7 @@ def refresh_database(bus_id):
     pertaining to that bus in real-time. Only changed values, will be refreshed.
 
     .. versionadded:: 1.2.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to initialize a child node in the database
@@ -106,17 +116,7 @@ def refresh_database(bus_id):
     ref = db.reference(bus_id)  # Create a reference to the key node of the database
 
     # Refresh the values of the referenced bus_id in the firebase database
-    ref.update(
-        {
-            "available_seats": 32,
-            "current_location": "Thampanoor",
-            "passengers_count": 0,
-            "current_bus_status": "Inactive",
-            "current_route_id": "Route00",
-            "delay_in_mins": 0,
-            "last_stop_arrival_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-    )
+    ref.update(default_bus_node())
 
 
 def update_available_seats(bus_id, available_seat_count):
@@ -470,3 +470,474 @@ def update_bus_total_delay(bus_id, delay_in_mins):
 
     # Refresh the values of the referenced bus_id in the firebase database
     ref.update({"delay_in_mins": delay_in_mins})
+
+
+class BusSnapshot(NamedTuple):
+    """
+    Typed record holding the complete real-time state of a bus in the Firebase db.
+
+    A snapshot is built from a single read of the bus's node, so that every field
+    reflects the same instant. Backend methods should prefer reading one snapshot
+    over calling the individual retrieve methods, each costing its own round trip.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: last_stop_arrival_time is parsed into a datetime object while building it
+    """
+
+    bus_id: str
+    available_seats: int
+    current_location: str
+    passengers_count: int
+    current_bus_status: str
+    current_route_id: str
+    delay_in_mins: int
+    last_stop_arrival_time: datetime
+
+
+def parse_bus_snapshot(bus_id, bus_node):
+    """
+    Method to convert the raw value of a bus node into a typed BusSnapshot record.
+
+    The value read from the Firebase database is a dictionary keyed by the child
+    names. Missing children are returned as None, and the arrival time is parsed.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus Id is used as the key node of the bus in the database
+        [dict] bus_node: Raw value of the bus node, as read from the database
+
+    Returns:
+        [BusSnapshot] bus_snapshot: Typed record, or None if the node is missing
+    """
+    # Return None if the bus node is not present in the database
+    if not isinstance(bus_node, dict):
+        return None
+
+    # Convert the datetime string into datetime object, if it has been set
+    last_stop_arrival_time = bus_node.get("last_stop_arrival_time")
+    if last_stop_arrival_time is not None:
+        last_stop_arrival_time = datetime.strptime(
+            last_stop_arrival_time, "%Y-%m-%d %H:%M:%S"
+        )
+
+    return BusSnapshot(
+        bus_id=bus_id,
+        available_seats=bus_node.get("available_seats"),
+        current_location=bus_node.get("current_location"),
+        passengers_count=bus_node.get("passengers_count"),
+        current_bus_status=bus_node.get("current_bus_status"),
+        current_route_id=bus_node.get("current_route_id"),
+        delay_in_mins=bus_node.get("delay_in_mins"),
+        last_stop_arrival_time=last_stop_arrival_time,
+    )
+
+
+def retrieve_bus_snapshot(bus_id):
+    """
+    Method to retrieve all real-time values of a bus in a single database read.
+
+    The Bus Id is used as the database nodes key value (child name) to retrieve
+    the whole node at once, instead of making a separate round trip per field.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus Id is used to initialize a child node in the database
+
+    Returns:
+        [BusSnapshot] bus_snapshot: Real-time state of the bus, None if missing
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    ref = db.reference(bus_id)  # Create a reference to the key node of the database
+
+    # Read the complete node of the referenced bus_id in a single round trip
+    return parse_bus_snapshot(bus_id, ref.get())
+
+
+def retrieve_bus_snapshots(bus_ids):
+    """
+    Method to retrieve the real-time values of multiple buses in one database read.
+
+    The root node of the database is read once, and the nodes corresponding to
+    each of the requested Bus Ids are picked from it. Missing buses are skipped.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids whose nodes are to be read from the database
+
+    Returns:
+        [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    ref = db.reference("/")  # Create a reference to the root node of the database
+
+    # Read all the nodes of the database in a single round trip
+    database_nodes = ref.get() or {}
+
+    bus_snapshots = {}  # Initialize an empty dictionary to store the snapshots
+
+    # Pick the nodes of the requested buses, skipping the ones not in database
+    for bus_id in bus_ids:
+        bus_snapshot = parse_bus_snapshot(bus_id, database_nodes.get(bus_id))
+
+        if bus_snapshot is not None:
+            bus_snapshots[bus_id] = bus_snapshot
+
+    return bus_snapshots
+
+
+def set_database_backend(database_backend):
+    """
+    Method to replace the firebase database used by all the CRUD operations.
+
+    Any object providing a reference method, like the firebase_admin.db module or
+    an InMemoryDatabase, can be used. The ticketing machine and the application
+    read the backend from this module, so a single call switches both of them.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [object] database_backend: Object used to create the database references
+
+    Returns:
+        None -> All later database operations are performed on the given backend
+
+    NOTE: Use the InMemoryDatabase to benchmark the apps without the live database
+    """
+    global db  # pylint: disable=global-statement,invalid-name
+    db = database_backend
+
+
+def server_increment(delta):
+    """
+    Method to create the server value, which increments a child by given delta.
+
+    The value is resolved by the firebase database while writing, so concurrent
+    increments made by several terminals are all applied, and none of them lost.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [int] delta: Amount to be added to the child, negative to decrement it
+
+    Returns:
+        [dict] server_value: Server value to be written in place of the child
+    """
+    return {".sv": {"increment": delta}}
+
+
+def increment_bus_counters(bus_id, counter_deltas):
+    """
+    Method to atomically increment the counters of a bus, in a single round trip.
+
+    The Bus Id is used as the database node's key value (child name) to update
+    the counters, such as the available seats, without reading them beforehand.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus Id is used to initialize a child node in the database
+        [dict] counter_deltas: Child names as key, & amounts to be added as value
+
+    Returns:
+        None -> Counters are incremented in the real-time firebase database
+
+    NOTE: Users needs to be authenticated, for performing this update operation
+    """
+    increments = {
+        counter: server_increment(delta)
+        for counter, delta in counter_deltas.items()
+        if delta != 0
+    }
+
+    # Skip the round trip, if none of the counters have changed
+    if not increments:
+        return
+
+    ref = db.reference(bus_id)  # Create a reference to the key node of the database
+
+    # Increment all the counters of the referenced bus_id in the firebase database
+    ref.update(increments)
+
+
+def default_bus_node(bus_status="Inactive", route_id="Route00"):
+    """
+    Method to create the value of a bus node, holding the default real-time values.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_status: Status of the bus, Active while the bus is on a trip
+        [str] route_id: Unique Route Id assigned to the bus for the trip
+
+    Returns:
+        [dict] bus_node: Child names of the bus node as key, & their default values
+    """
+    return {
+        "available_seats": 32,
+        "current_location": "Thampanoor",
+        "passengers_count": 0,
+        "current_bus_status": bus_status,
+        "current_route_id": route_id,
+        "delay_in_mins": 0,
+        "last_stop_arrival_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def start_trip(bus_id, route_id, reset_counters=False):
+    """
+    Method to mark a bus as active on a route, and fetch its node in one operation.
+
+    The counters of the bus are reset to their defaults, when requested or when the
+    bus changes its route. Otherwise the counters of the ongoing trip are retained,
+    so that a terminal which restarts mid-trip, resumes the trip where it stopped.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus Id is used as the key node of the bus in the database
+        [str] route_id: Unique Route Id assigned to the bus for this trip
+        [bool] reset_counters: True to start the trip with default values
+
+    Returns:
+        [BusSnapshot] bus_snapshot: Real-time state of the bus, after the update
+
+    NOTE: Users needs to be authenticated, for performing this update operation
+    """
+    if reset_counters:
+        bus_node = default_bus_node("Active", route_id)
+        ref = db.reference("/")  # Create a reference to the root node of database
+
+        # Write all the children of the bus in a single multi-path update
+        ref.update({bus_id + "/" + child: value for child, value in bus_node.items()})
+        return parse_bus_snapshot(bus_id, bus_node)
+
+    ref = db.reference(bus_id)  # Create a reference to the key node of the database
+
+    # Update the status and route atomically, and receive the resulting bus node
+    bus_node = ref.transaction(lambda bus_node: resume_bus_node(bus_node, route_id))
+    return parse_bus_snapshot(bus_id, bus_node)
+
+
+def end_trip(bus_id):
+    """
+    Method to mark a bus as inactive, and reset its node to the default values.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus Id is used as the key node of the bus in the database
+
+    Returns:
+        [BusSnapshot] bus_snapshot: Real-time state of the bus, after the reset
+
+    NOTE: Users needs to be authenticated, for performing this update operation
+    """
+    return end_trips([bus_id])[bus_id]
+
+
+def end_trips(bus_ids):
+    """
+    Method to end the trips of multiple buses, such as a depot's fleet at day end.
+
+    The nodes of all the buses are reset in one multi-path update on the root node
+    which firebase applies atomically, so a shift change costs a single round trip.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids of the buses whose trips are to be ended
+
+    Returns:
+        [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+
+    NOTE: Users needs to be authenticated, for performing this update operation
+    """
+    bus_nodes = {bus_id: default_bus_node() for bus_id in bus_ids}
+
+    # Skip the round trip, if there are no buses to be reset
+    if not bus_nodes:
+        return {}
+
+    ref = db.reference("/")  # Create a reference to the root node of the database
+
+    # Reset the children of all the buses in a single multi-path update
+    ref.update(
+        {
+            bus_id + "/" + child: value
+            for bus_id, bus_node in bus_nodes.items()
+            for child, value in bus_node.items()
+        }
+    )
+
+    return {
+        bus_id: parse_bus_snapshot(bus_id, bus_node)
+        for bus_id, bus_node in bus_nodes.items()
+    }
+
+
+def _pick_bus_snapshots(database_nodes, bus_ids=None):
+    bus_snapshots = {}  # Initialize an empty dictionary to store the snapshots
+
+    # Keep the nodes of the requested buses, or all the returned nodes if not given
+    for bus_id, bus_node in (database_nodes or {}).items():
+        if bus_ids is not None and bus_id not in bus_ids:
+            continue
+
+        bus_snapshot = parse_bus_snapshot(bus_id, bus_node)
+        if bus_snapshot is not None:
+            bus_snapshots[bus_id] = bus_snapshot
+
+    return bus_snapshots
+
+
+def retrieve_active_bus_snapshots(bus_ids=None):
+    """
+    Method to retrieve the real-time values of only the buses that are now active.
+
+    The buses are filtered by the firebase servers using the index on the status
+    of the buses, so the nodes of inactive buses are never downloaded by the app.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids to be kept from the result, all buses if not given
+
+    Returns:
+        [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+
+    NOTE: Requires the .indexOn rule on current_bus_status (see firebase_rules.md)
+    """
+    ref = db.reference("/")  # Create a reference to the root node of the database
+
+    # Query the nodes of active buses, in a single round trip
+    database_nodes = ref.order_by_child("current_bus_status").equal_to("Active").get()
+
+    # Keep only the requested buses, from among the active buses in the database
+    bus_ids = None if bus_ids is None else set(bus_ids)
+    return _pick_bus_snapshots(database_nodes, bus_ids)
+
+
+def retrieve_bus_snapshots_with_seats(bus_ids=None, min_seats=1, max_seats=None):
+    """
+    Method to retrieve the real-time values of the buses with enough seats available.
+
+    The buses are filtered by the firebase servers using the index on available
+    seats, so that only the buses with seats in the requested range are returned.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids to be kept from the result, all buses if not given
+        [int] min_seats: Lowest number of seats available in the bus, inclusive
+        [int] max_seats: Highest number of seats available, inclusive if given
+
+    Returns:
+        [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+
+    NOTE: Requires the .indexOn rule on available_seats (see firebase_rules.md)
+    """
+    ref = db.reference("/")  # Create a reference to the root node of the database
+
+    # Query the nodes of buses with available seats in range, in one round trip
+    query = ref.order_by_child("available_seats").start_at(min_seats)
+    if max_seats is not None:
+        query = query.end_at(max_seats)
+
+    # Keep only the requested buses, from among the buses having enough seats
+    bus_ids = None if bus_ids is None else set(bus_ids)
+    return _pick_bus_snapshots(query.get(), bus_ids)
+
+
+def retrieve_bus_ids():
+    """
+    Method to retrieve the Bus Ids of all the buses present in the Firebase db.
+
+    A shallow read is used, so that only the keys of the nodes at the root of the
+    database are downloaded, and not the real-time values held within each node.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        [list] bus_ids: Sorted list of the Bus Ids of the buses in the database
+
+    NOTE: Users needs to be authenticated, for performing this retrieve operation
+    """
+    ref = db.reference("/")  # Create a reference to the root node of the database
+
+    # Read only the keys of the nodes, with True in place of each of their values
+    root_keys = ref.get(shallow=True) or {}
+
+    return sorted(key for key in root_keys if key not in NON_BUS_NODES)
+
+
+def resume_bus_node(bus_node, route_id):
+    """
+    Method to create the value of a bus node, for the bus resuming a trip on a route.
+
+    The counters of the ongoing trip are kept, if the bus is on the same route, or
+    else the default values are used, so that a new route always starts afresh.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [dict] bus_node: Current value of the bus node, None if it doesn't exist
+        [str] route_id: Unique Route Id assigned to the bus for this trip
+
+    Returns:
+        [dict] bus_node: Value of the bus node, marked active on the given route
+    """
+    # Start afresh if the bus is missing, or was running on a different route
+    if not isinstance(bus_node, dict):
+        return default_bus_node("Active", route_id)
+    if bus_node.get("current_route_id") != route_id:
+        return default_bus_node("Active", route_id)
+
+    return dict(bus_node, current_bus_status="Active", current_route_id=route_id)
+
+
+def write_bus_changes(field_changes, counter_deltas=None):
+    """
+    Method to write the changes to the fields & counters of several buses at once.
+
+    The changes are written as a single multi-path update on the root node, which
+    firebase applies atomically. Counters are written as server-side increments.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [dict] field_changes: Bus Id as key, and hashmap of the new field values
+        [dict] counter_deltas: Bus Id as key, and hashmap of the counter deltas
+
+    Returns:
+        None -> All the changes are written to the database in one round trip
+
+    NOTE: Users needs to be authenticated, for performing this update operation
+    """
+    updates = {
+        bus_id + "/" + field: value
+        for bus_id, fields in field_changes.items()
+        for field, value in fields.items()
+    }
+
+    for bus_id, deltas in (counter_deltas or {}).items():
+        for counter, delta in deltas.items():
+            if delta != 0:
+                updates[bus_id + "/" + counter] = server_increment(delta)
+
+    # Skip the round trip, if none of the values have changed
+    if not updates:
+        return
+
+    ref = db.reference("/")  # Create a reference to the root node of the database
+
+    # Write the changes of all the buses in a single round trip
+    ref.update(updates)
@@ -0,0 +1,362 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the fleet mirror used by the passenger app to read bus nodes.
+The mirror subscribes to the firebase database once per process, and applies each
+change pushed by the database to an in-memory table, which serves all bus lookups.
+
+Included Functions:
+    [1] FleetMirror (class)
+        [i] start
+        [ii] resync
+        [iii] close
+        [iv] is_synced
+        [v] staleness
+        [vi] retrieve_field
+        [vii] retrieve_bus_snapshot
+        [viii] retrieve_bus_snapshots
+
+    [2] fleet_mirror (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
+"""
+
+import copy
+import time
+import threading
+
+from database import firebase_database
+
+# Seconds between the resubscriptions, while the connection to the database is lost
+MIRROR_RESYNC_INTERVAL = 30.0
+# Seconds for which start waits for the database to send the complete fleet
+MIRROR_SYNC_TIMEOUT = 5.0
+
+
+def _set_path(node, segments, value):
+    # Walk down to the parent of the changed child, creating the missing nodes
+    for segment in segments[:-1]:
+        child = node.get(segment)
+
+        if not isinstance(child, dict):
+            if value is None:
+                return  # Nothing to delete, as the parent doesn't exist
+            child = node[segment] = {}
+
+        node = child
+
+    # A null value pushed by the database denotes that the child was deleted
+    if value is None:
+        node.pop(segments[-1], None)
+    else:
+        node[segments[-1]] = value
+
+
+def _is_listening(registration):
+    # SDK streams the events on a thread, which ends if the stream fails for good
+    listener_thread = getattr(registration, "_thread", None)
+    return registration is not None and (
+        listener_thread is None or listener_thread.is_alive()
+    )
+
+
+class FleetMirror:
+    """
+    Class to keep an in-memory copy of the bus nodes, updated by database events.
+
+    The database first sends the complete fleet as a put event on the root, and
+    then sends every change as a put or a patch event on the changed path. These
+    are applied to the table as they arrive, so that the reads cost no round trip.
+    A quiet fleet sends no events, so the mirror tracks whether the stream itself
+    is connected. Once the database cancels the stream, or the stream fails, the
+    mirror is out of sync and reads use the database, while it resubscribes.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Reads should fall back to the database, until is_synced() returns True
+    """
+
+    def __init__(
+        self,
+        reference_path="/",
+        resync_interval=MIRROR_RESYNC_INTERVAL,
+        sync_timeout=MIRROR_SYNC_TIMEOUT,
+        timer=time.monotonic,
+    ):
+        """
+        Method to create an empty mirror. Database is subscribed to, when started.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] reference_path: Path of the node holding all the bus nodes
+            [float] resync_interval: Seconds between resubscriptions, if disconnected
+            [float] sync_timeout: Seconds for which start waits for the full fleet
+            [callable] timer: Function returning the current time in seconds
+
+        Returns:
+            None -> An empty mirror is created, which is not subscribed to the db
+        """
+        self.reference_path = reference_path
+        self.resync_interval = resync_interval
+        self.sync_timeout = sync_timeout
+        self.timer = timer
+
+        # Bus Id as key, and the value of the bus node as value
+        self._nodes = {}
+        self._lock = threading.Lock()
+
+        self._registration = None  # Registration of the listener on the database
+        self._synced = threading.Event()  # Set once the full fleet has been received
+        self._connected = False  # True from the full fleet, till the stream is lost
+        self._started = False
+        self._resync_attempted_at = None  # Resubscriptions are attempted once a while
+
+        self.last_event_at = None  # Time at which the last event was applied
+        self.last_error = None  # Exception raised while subscribing to the database
+
+    def _on_event(self, event):
+        segments = [segment for segment in event.path.split("/") if segment]
+
+        with self._lock:
+            if event.event_type == "put" and not segments:
+                # Complete fleet is sent on subscribing, and each time SDK reconnects
+                data = event.data
+                self._nodes = copy.deepcopy(data) if isinstance(data, dict) else {}
+                self._connected = True
+                self._synced.set()
+
+            elif event.event_type in ("cancel", "auth_revoked"):
+                # Database has closed the stream, so no more changes will be sent
+                self._connected = False
+
+            elif event.event_type == "put":
+                _set_path(self._nodes, segments, copy.deepcopy(event.data))
+
+            elif event.event_type == "patch":
+                # Keys of a patch may themselves be paths, for multi-path updates
+                for key, value in (event.data or {}).items():
+                    child_segments = segments + [
+                        segment for segment in key.split("/") if segment
+                    ]
+                    _set_path(self._nodes, child_segments, copy.deepcopy(value))
+
+            self.last_event_at = self.timer()
+
+    def start(self):
+        """
+        Method to subscribe to the database, and wait for the full fleet to arrive.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [bool] is_synced: True if the full fleet was received within the timeout
+
+        NOTE: Calling start on a mirror that is already started doesn't wait again
+        """
+        with self._lock:
+            is_started, self._started = self._started, True
+
+        if is_started:
+            return self._synced.is_set()
+
+        self.resync()
+        return self._synced.wait(self.sync_timeout)
+
+    def resync(self):
+        """
+        Method to resubscribe to the database, so that the full fleet is sent again.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> The earlier subscription is closed and a new one is started
+
+        NOTE: The table is replaced, once the database sends the full fleet again
+        """
+        with self._lock:
+            registration, self._registration = self._registration, None
+            self._resync_attempted_at = self.timer()
+            self._connected = False  # Until the database sends the full fleet again
+
+        if registration is not None:
+            registration.close()
+
+        try:
+            ref = firebase_database.db.reference(self.reference_path)
+            registration = ref.listen(self._on_event)
+            self.last_error = None
+
+        except Exception as error:  # pylint: disable=broad-except
+            self.last_error = error  # Next stale read will try to subscribe again
+            registration = None
+
+        with self._lock:
+            self._registration = registration
+
+    def close(self):
+        """
+        Method to unsubscribe from the database, and clear the in-memory table.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> Subscription is closed, and reads fall back to the database
+        """
+        with self._lock:
+            registration, self._registration = self._registration, None
+            self._synced.clear()
+            self._connected = False
+            self._started = False
+            self._nodes = {}
+            self.last_event_at = None
+            self._resync_attempted_at = None
+
+        if registration is not None:
+            registration.close()
+
+    def staleness(self):
+        """
+        Method to fetch the seconds passed since the mirror last heard from database.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [float] staleness: Seconds since the last event, None if never started
+        """
+        with self._lock:
+            if self.last_event_at is None:
+                return None
+            return self.timer() - self.last_event_at
+
+    def is_synced(self):
+        """
+        Method to check if the reads can be served by the mirror, without the db.
+
+        The mirror is in sync while its stream to the database is connected, however
+        long the fleet stays quiet. Once the stream is lost, a background resubscription
+        is started, at most once within each resync interval.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [bool] is_synced: True if the stream is connected & the table is current
+        """
+        with self._lock:
+            if not self._started:
+                return False
+
+            if self._connected and _is_listening(self._registration):
+                return True
+
+            # Attempt at most one resubscription, within each resync interval
+            should_resync = (
+                self._resync_attempted_at is None
+                or self.timer() - self._resync_attempted_at > self.resync_interval
+            )
+            if should_resync:
+                self._resync_attempted_at = self.timer()
+
+        if should_resync:
+            threading.Thread(
+                target=self.resync, name="croma-fleet-mirror", daemon=True
+            ).start()
+
+        return False
+
+    def retrieve_field(self, bus_id, field):
+        """
+        Method to retrieve the value of a child of a bus node from the in-memory table.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the database
+            [str] field: Child name of the bus node, to be retrieved
+
+        Returns:
+            [any] value: Value of the child, None if the bus or child is missing
+        """
+        with self._lock:
+            bus_node = self._nodes.get(bus_id)
+
+            if not isinstance(bus_node, dict):
+                return None
+            return bus_node.get(field)
+
+    def retrieve_bus_snapshot(self, bus_id):
+        """
+        Method to retrieve all real-time values of a bus from the in-memory table.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the database
+
+        Returns:
+            [BusSnapshot] bus_snapshot: Real-time state of the bus, None if missing
+        """
+        with self._lock:
+            bus_node = copy.copy(self._nodes.get(bus_id))
+
+        return firebase_database.parse_bus_snapshot(bus_id, bus_node)
+
+    def retrieve_bus_snapshots(self, bus_ids):
+        """
+        Method to retrieve the real-time values of multiple buses from the table.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] bus_ids: Bus Ids whose nodes are to be read from the table
+
+        Returns:
+            [dict] bus_snapshots: BusSnapshot records keyed by the Bus Id of the bus
+        """
+        with self._lock:
+            bus_nodes = {
+                bus_id: copy.copy(self._nodes.get(bus_id)) for bus_id in bus_ids
+            }
+
+        bus_snapshots = {}  # Initialize an empty dictionary to store the snapshots
+
+        # Pick the nodes of the requested buses, skipping the ones not in the table
+        for bus_id, bus_node in bus_nodes.items():
+            bus_snapshot = firebase_database.parse_bus_snapshot(bus_id, bus_node)
+
+            if bus_snapshot is not None:
+                bus_snapshots[bus_id] = bus_snapshot
+
+        return bus_snapshots
+
+
+# Fleet mirror shared by all the streamlit sessions of the passenger application
+fleet_mirror = FleetMirror()
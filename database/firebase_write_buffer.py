@@ -0,0 +1,278 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the write-behind buffer used for updating the firebase database.
+Field changes are collected in memory, and changes to all the buses are written in a
+single multi-path update at fixed intervals, so that printing tickets doesn't block.
+
+Included Functions:
+    [1] FirebaseWriteBuffer (class)
+        [i] stage
+        [ii] increment
+        [iii] flush
+        [iv] pending_updates
+        [v] close
+
+    [2] write_buffer (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
+"""
+
+import atexit
+import threading
+
+from database import bus_state_store
+from database import firebase_database
+
+# Seconds for which changes are collected, before they are written to the database
+WRITE_BUFFER_FLUSH_INTERVAL = 0.2
+
+
+class FirebaseWriteBuffer:
+    """
+    Class to collect the field changes of buses, and write them in a single update.
+
+    Changes staged for the same field of a bus replace each other, so only their
+    latest value is written. Increments of the same field are added up, & written
+    as one server-side increment, so that counters are never read before updates.
+    All pending changes are written to the store of the bus state in one atomic
+    write, which for firebase is a single update on the root node, keyed by the
+    "bus_id/field" paths. A background thread flushes the buffer at fixed
+    intervals, once it is started.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Changes that fail to be written are kept, and retried on the next flush
+    """
+
+    def __init__(self, flush_interval=WRITE_BUFFER_FLUSH_INTERVAL, store=None):
+        """
+        Method to create an empty buffer. Flusher thread starts on the first change.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] flush_interval: Seconds between background flushes, None if off
+            [BusStateStore] store: Store the changes are written to, configured if None
+
+        Returns:
+            None -> An empty buffer is created, with the flusher thread stopped
+        """
+        self.flush_interval = flush_interval
+        self.store = store
+
+        # Bus Id as key, and hashmap of the changed fields to their values as value
+        self._pending = {}
+        # Bus Id as key, and hashmap of the counters to their total delta as value
+        self._pending_increments = {}
+        self._lock = threading.Lock()
+        # Flushes are serialized, so that changes are written in the staged order
+        self._flush_lock = threading.Lock()
+
+        self._stopped = threading.Event()
+        self._flusher = None
+
+        self.flush_count = 0  # Number of updates written to the database
+        self.last_error = None  # Exception raised by the last failed background flush
+
+    def stage(self, bus_id, fields):
+        """
+        Method to stage the changes to the fields of a bus, to be written on flush.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the database
+            [dict] fields: Child names of the bus node as key, & the new values
+
+        Returns:
+            None -> Changes are merged with the pending changes of the same bus
+        """
+        with self._lock:
+            self._pending.setdefault(bus_id, {}).update(fields)
+
+            # Values staged later replace the increments staged before them
+            increments = self._pending_increments.get(bus_id, {})
+            for field in fields:
+                increments.pop(field, None)
+
+            self._start_flusher()
+
+    def increment(self, bus_id, field, delta):
+        """
+        Method to stage an increment of a counter of a bus, to be written on flush.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus Id is used as the key node of the bus in the database
+            [str] field: Child name of the counter in the bus node
+            [int] delta: Amount to be added to the counter, negative to decrement
+
+        Returns:
+            None -> Delta is added to the pending increment of the same counter
+        """
+        with self._lock:
+            fields = self._pending.get(bus_id, {})
+
+            if field in fields:
+                # Counter is already being set to a value, so add the delta to it
+                fields[field] = fields[field] + delta
+            else:
+                increments = self._pending_increments.setdefault(bus_id, {})
+                increments[field] = increments.get(field, 0) + delta
+
+            self._start_flusher()
+
+    def _start_flusher(self):
+        if self._flusher is None and self.flush_interval is not None:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically,
+                name="croma-firebase-write-buffer",
+                daemon=True,
+            )
+            self._flusher.start()
+
+    @staticmethod
+    def _multi_path_update(pending, pending_increments):
+        updates = {
+            bus_id + "/" + field: value
+            for bus_id, fields in pending.items()
+            for field, value in fields.items()
+        }
+
+        for bus_id, increments in pending_increments.items():
+            for field, delta in increments.items():
+                if delta != 0:
+                    updates[bus_id + "/" + field] = firebase_database.server_increment(
+                        delta
+                    )
+
+        return updates
+
+    def pending_updates(self):
+        """
+        Method to fetch the multi-path update that would be written on next flush.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] updates: "bus_id/field" paths as key, & the new values as value
+        """
+        with self._lock:
+            return self._multi_path_update(self._pending, self._pending_increments)
+
+    def flush(self):
+        """
+        Method to write all the pending changes to the database in a single update.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> Pending changes are written, and removed from the buffer
+
+        NOTE: On failure, changes are returned to the buffer and the error is raised
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                pending_increments, self._pending_increments = (
+                    self._pending_increments,
+                    {},
+                )
+
+            updates = self._multi_path_update(pending, pending_increments)
+            if not updates:
+                return
+
+            store = self.store
+            if store is None:
+                store = bus_state_store.bus_state_store
+
+            try:
+                # Write changes of all the buses in one atomic round trip
+                store.write_changes(pending, pending_increments)
+
+            except Exception:
+                with self._lock:
+                    self._requeue(pending, pending_increments)
+                raise
+
+            self.flush_count = self.flush_count + 1
+
+    def _requeue(self, pending, pending_increments):
+        # Values staged since the failed flush began are newer, so they are kept
+        for bus_id, fields in pending.items():
+            fields.update(self._pending.get(bus_id, {}))
+
+            # Increments staged since are added to the values, like increment does
+            increments = self._pending_increments.get(bus_id, {})
+            for field in fields:
+                if field in increments:
+                    fields[field] = fields[field] + increments.pop(field)
+
+            self._pending[bus_id] = fields
+
+        # Increments are added to the ones staged since, unless a value replaced them
+        for bus_id, increments in pending_increments.items():
+            fields = self._pending.get(bus_id, {})
+
+            for field, delta in increments.items():
+                if field in fields:
+                    continue
+
+                bus_increments = self._pending_increments.setdefault(bus_id, {})
+                bus_increments[field] = bus_increments.get(field, 0) + delta
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.last_error = None
+            except Exception as error:  # pylint: disable=broad-except
+                self.last_error = error  # Changes are retried on the next interval
+
+    def close(self):
+        """
+        Method to stop the flusher thread, and write the changes still pending.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> Flusher thread is stopped, and the buffer is flushed one last time
+        """
+        self._stopped.set()
+
+        if self._flusher is not None:
+            self._flusher.join()
+
+        self.flush()
+
+
+# Write buffer shared by all the streamlit sessions of the ticketing machine
+write_buffer = FirebaseWriteBuffer()
+
+# Write the changes still pending, when the ticketing machine shuts down
+atexit.register(write_buffer.close)
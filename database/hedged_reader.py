@@ -0,0 +1,353 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the hedged reader used to bound the latency of database reads.
+Each read is given a deadline, and a second identical request is sent, if the first
+one takes longer than most reads of the same kind, whichever returns first is used.
+
+Included Functions:
+    [1] ReadDeadlineExceeded (class)
+    [2] LatencyHistogram (class)
+        [i] record
+        [ii] percentile
+        [iii] snapshot
+
+    [3] HedgedReader (class)
+        [i] read
+        [ii] hedge_delay
+        [iii] histogram
+        [iv] stats
+
+    [4] hedged_reader (module-level instance)
+
+.. versionadded:: 1.4.0
+
+Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
+"""
+
+import bisect
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Seconds after which a read is abandoned, and the last cached value is used
+READ_DEADLINE = 2.0
+# Fraction of the reads that are expected to complete before a hedge is sent
+HEDGE_QUANTILE = 0.95
+# Reads of a kind to be recorded, before the hedge delay is derived from them
+HEDGE_MIN_SAMPLES = 20
+# Upper bounds in seconds of the histogram buckets, the last one is unbounded
+LATENCY_BUCKET_BOUNDS = (
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+)
+
+
+class ReadDeadlineExceeded(TimeoutError):
+    """
+    Exception raised when neither the read, nor its hedge completes within deadline.
+
+    .. versionadded:: 1.4.0
+    """
+
+
+class LatencyHistogram:
+    """
+    Class to count the latencies of a kind of read, in buckets of fixed bounds.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Percentiles are estimated as the upper bound of the bucket they fall in
+    """
+
+    def __init__(self, bucket_bounds=LATENCY_BUCKET_BOUNDS):
+        self.bucket_bounds = tuple(bucket_bounds)
+
+        # Count of the latencies in each bucket, the last one holds the slowest
+        self._counts = [0] * (len(self.bucket_bounds) + 1)
+        self._lock = threading.Lock()
+
+        self.count = 0
+        self.total = 0.0  # Sum of all the recorded latencies, in seconds
+
+    def record(self, latency):
+        """
+        Method to add a latency to the bucket, whose upper bound is nearest above it.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] latency: Seconds taken by the read to complete
+
+        Returns:
+            None -> Count of the bucket, and the totals are incremented
+        """
+        with self._lock:
+            self._counts[bisect.bisect_left(self.bucket_bounds, latency)] += 1
+            self.count = self.count + 1
+            self.total = self.total + latency
+
+    def percentile(self, fraction):
+        """
+        Method to estimate the latency, below which the given fraction of reads fall.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] fraction: Fraction of the reads, such as 0.95 for the p95
+
+        Returns:
+            [float] latency: Upper bound of the bucket, None if nothing is recorded
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+
+            # Walk up the buckets, till the required number of reads are covered
+            required_count = fraction * self.count
+            covered_count = 0
+
+            for index, bucket_count in enumerate(self._counts):
+                covered_count = covered_count + bucket_count
+
+                if covered_count >= required_count:
+                    break
+
+            if index < len(self.bucket_bounds):
+                return self.bucket_bounds[index]
+            return float("inf")
+
+    def snapshot(self):
+        """
+        Method to fetch the counts of the buckets, keyed by their upper bounds.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] buckets: Upper bound of the bucket as key, & its count as value
+        """
+        with self._lock:
+            bounds = self.bucket_bounds + (float("inf"),)
+            return dict(zip(bounds, self._counts))
+
+
+class HedgedReader:
+    """
+    Class to run the database reads with a deadline, hedging the slow ones.
+
+    Every read runs on a thread pool, and its latency is added to the histogram of
+    its kind. If the read hasn't returned by the p95 latency of its kind, a second
+    identical read is sent, and the result of whichever completes first is used.
+    If neither completes within the deadline, ReadDeadlineExceeded is raised, so
+    that the caller can fall back to the value it read the last time.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Reads left running after a deadline complete in the background
+    """
+
+    def __init__(
+        self,
+        deadline=READ_DEADLINE,
+        hedge=True,
+        hedge_quantile=HEDGE_QUANTILE,
+        hedge_min_samples=HEDGE_MIN_SAMPLES,
+        max_workers=16,
+    ):
+        """
+        Method to create the reader, with an empty histogram for every kind of read.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [float] deadline: Seconds for which a read is waited on, by default
+            [bool] hedge: True to send a second request for the slow reads
+            [float] hedge_quantile: Fraction of reads completing before a hedge
+            [int] hedge_min_samples: Reads recorded, before hedges are sent
+            [int] max_workers: Maximum number of requests run at the same time
+
+        Returns:
+            None -> The reader is created, and no requests have been sent yet
+        """
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+
+        # Kind of the read as key, and histogram of the latencies as the value
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="croma-hedged-read"
+        )
+
+        self.reads = 0
+        self.hedges_sent = 0  # Reads for which a second request was sent
+        self.hedges_won = 0  # Hedges which returned before the first request
+        self.deadlines_exceeded = 0
+
+    def histogram(self, operation):
+        """
+        Method to fetch the latency histogram of a kind of read, creating it if new.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] operation: Kind of the read, such as the field being read
+
+        Returns:
+            [LatencyHistogram] histogram: Latencies of the completed reads
+        """
+        with self._lock:
+            histogram = self._histograms.get(operation)
+
+            if histogram is None:
+                histogram = self._histograms[operation] = LatencyHistogram()
+            return histogram
+
+    def hedge_delay(self, operation):
+        """
+        Method to fetch the seconds after which a read of the given kind is hedged.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] operation: Kind of the read, such as the field being read
+
+        Returns:
+            [float] hedge_delay: p95 latency of the kind, None if not hedged yet
+        """
+        histogram = self.histogram(operation)
+
+        if not self.hedge or histogram.count < self.hedge_min_samples:
+            return None
+        return histogram.percentile(self.hedge_quantile)
+
+    def _timed_call(self, operation, function, args):
+        started_at = time.monotonic()
+        result = function(*args)
+
+        # Latencies of the requests abandoned after the deadline are recorded too
+        self.histogram(operation).record(time.monotonic() - started_at)
+        return result
+
+    def read(self, operation, function, *args, deadline=None):
+        """
+        Method to run a read within a deadline, sending a hedge if it's running slow.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] operation: Kind of the read, whose latencies are recorded together
+            [callable] function: Function reading the database
+            [any] args: Arguments passed to the function
+            [float] deadline: Seconds to wait for the read, default deadline if None
+
+        Returns:
+            [any] result: Value returned by the first request which succeeded
+        """
+        deadline = self.deadline if deadline is None else deadline
+        deadline_at = time.monotonic() + deadline
+        hedge_delay = self.hedge_delay(operation)
+
+        with self._lock:
+            self.reads = self.reads + 1
+
+        primary = self._executor.submit(self._timed_call, operation, function, args)
+        requests = [primary]
+
+        if hedge_delay is not None and hedge_delay < deadline:
+            # Send the hedge only if the first request is slower than usual
+            wait(requests, timeout=hedge_delay)
+
+            if not primary.done():
+                requests.append(
+                    self._executor.submit(self._timed_call, operation, function, args)
+                )
+                with self._lock:
+                    self.hedges_sent = self.hedges_sent + 1
+
+        pending_requests = set(requests)
+        error = None
+
+        while pending_requests:
+            completed_requests, pending_requests = wait(
+                pending_requests,
+                timeout=max(0.0, deadline_at - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+
+            if not completed_requests:
+                break  # Deadline passed, before any of the requests completed
+
+            for request in completed_requests:
+                try:
+                    result = request.result()
+                except Exception as request_error:  # pylint: disable=broad-except
+                    error = request_error
+                    continue
+
+                if request is not primary:
+                    with self._lock:
+                        self.hedges_won = self.hedges_won + 1
+
+                return result
+
+        if error is not None and not pending_requests:
+            raise error  # All the requests failed, before the deadline
+
+        with self._lock:
+            self.deadlines_exceeded = self.deadlines_exceeded + 1
+
+        raise ReadDeadlineExceeded(
+            operation + " read did not complete within " + str(deadline) + "s"
+        )
+
+    def stats(self):
+        """
+        Method to fetch the counters of reads, hedges, and the deadlines exceeded.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [dict] stats: Reads, hedges sent & won, and deadlines exceeded
+        """
+        with self._lock:
+            return {
+                "reads": self.reads,
+                "hedges_sent": self.hedges_sent,
+                "hedges_won": self.hedges_won,
+                "deadlines_exceeded": self.deadlines_exceeded,
+            }
+
+
+# Hedged reader shared by all the streamlit sessions of the passenger application
+hedged_reader = HedgedReader()
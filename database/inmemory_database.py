@@ -0,0 +1,739 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains an in-memory stand-in for the firebase real-time database.
+It mimics the reference, child, get, set, update and listen methods of firebase db,
+and can add latency, jitter & errors to each call, to mimic a real network offline.
+
+Included Functions:
+    [1] InMemoryDatabase (class)
+        [i] reference
+        [ii] round_trip_count
+        [iii] simulate_round_trip
+        [iv] read
+        [v] write
+        [vi] transact
+        [vii] add_listener
+
+    [2] InMemoryReference (class)
+        [i] child
+        [ii] get
+        [iii] set
+        [iv] update
+        [v] delete
+        [vi] transaction
+        [vii] listen
+        [viii] order_by_child
+        [ix] get_if_changed
+
+    [3] InMemoryEvent (class)
+    [4] InMemoryListenerRegistration (class)
+        [i] push
+        [ii] close
+
+    [5] InMemoryQuery (class)
+        [i] equal_to
+        [ii] start_at
+        [iii] end_at
+        [iv] limit_to_first
+        [v] get
+
+.. versionadded:: 1.4.0
+
+Read more about the database used in CroMa in the :ref:`CroMa Hardware Databases`
+"""
+
+import copy
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, NamedTuple
+
+from firebase_admin import exceptions
+
+
+def _split_path(path):
+    # Split a database path into its keys, ignoring the leading & trailing slashes
+    return [segment for segment in (path or "").split("/") if segment]
+
+
+def _join_path(segments):
+    return "/" + "/".join(segments)
+
+
+def _etag(value):
+    # ETag is derived from the content, so it changes only when the value changes
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _order_key(value):
+    # Children are ordered as nulls, booleans, numbers, strings and then objects
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, 0)
+
+
+class InMemoryEvent(NamedTuple):
+    """
+    Typed record mimicking the events sent by the firebase database to listeners.
+
+    .. versionadded:: 1.4.0
+    """
+
+    event_type: str
+    path: str
+    data: Any
+
+
+class InMemoryListenerRegistration:
+    """
+    Class to deliver the events of a listener from a background thread, like the SDK.
+
+    .. versionadded:: 1.4.0
+    """
+
+    def __init__(self, database, segments, callback):
+        self.database = database
+        self.segments = segments
+        self.callback = callback
+
+        self._events = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._deliver_events, name="croma-inmemory-listener", daemon=True
+        )
+        self._thread.start()
+
+    def _deliver_events(self):
+        while True:
+            event = self._events.get()
+            if event is None:
+                return
+
+            self.database.simulate_network_delay()
+            self.callback(event)
+
+    def push(self, event):
+        """Method to queue an event, to be delivered after the simulated delay."""
+        self._events.put(event)
+
+    def close(self):
+        """
+        Method to stop the listener, and wait for the delivery thread to finish.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> Listener is removed, and no more events are delivered
+        """
+        self.database.remove_listener(self)
+        self._events.put(None)
+
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class InMemoryDatabase:
+    """
+    Class to hold a firebase style JSON tree in memory, and serve references to it.
+
+    Every call made through a reference is counted as a round trip, and is delayed
+    by the configured latency plus a random jitter. Calls beyond the number of
+    connections wait for a free connection, like the SDK's HTTP connection pool.
+    A fraction of the calls can be failed with the same UnavailableError the SDK
+    raises when the db is unreachable. All listeners receive the events of the
+    changes made through any reference.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Seed the stand-in, so that jitter and errors repeat across benchmark runs
+    """
+
+    def __init__(
+        self,
+        data=None,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        seed=None,
+        max_connections=None,
+    ):
+        """
+        Method to create the stand-in with the given data and network characteristics.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [dict] data: Initial JSON tree of the database, empty if not passed
+            [float] latency: Seconds added to every call, & every delivered event
+            [float] jitter: Maximum random seconds added on top of the latency
+            [float] error_rate: Fraction of calls failing with an UnavailableError
+            [int] seed: Seed of the random generator, used for jitter and errors
+            [int] max_connections: Calls delayed at the same time, None if unlimited
+
+        Returns:
+            None -> The stand-in is created, with no listeners registered
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+
+        self._data = copy.deepcopy(data) if data is not None else {}
+        self._listeners = []
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._connections = (
+            threading.BoundedSemaphore(max_connections)
+            if max_connections is not None
+            else None
+        )
+
+        # Operation name as key, and number of calls made to it as the value
+        self.round_trips = Counter()
+
+    def reference(self, path="/"):
+        """
+        Method to create a reference to the node at the given path of the database.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] path: Path of the node, relative to the root of the database
+
+        Returns:
+            [InMemoryReference] ref: Reference to the node, which may not exist
+        """
+        return InMemoryReference(self, _split_path(path))
+
+    def round_trip_count(self):
+        """
+        Method to fetch the total number of calls made to the database so far.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [int] round_trips: Number of calls made through any of the references
+        """
+        with self._lock:
+            return sum(self.round_trips.values())
+
+    def simulate_network_delay(self):
+        """Method to sleep for the latency, and a random jitter on top of it."""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def simulate_round_trip(self, operation):
+        """
+        Method to count a call to the database, delaying it, or failing it at random.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] operation: Name of the method of the reference being called
+
+        Returns:
+            None -> Returns after the delay, or raises the injected UnavailableError
+        """
+        with self._lock:
+            self.round_trips[operation] += 1
+            should_fail = self._random.random() < self.error_rate
+
+        if self._connections is None:
+            self.simulate_network_delay()
+        else:
+            with self._connections:
+                self.simulate_network_delay()
+
+        if should_fail:
+            raise exceptions.UnavailableError(
+                "Injected error while calling " + operation + " on the database"
+            )
+
+    def read(self, segments):
+        """
+        Method to fetch a copy of the value at a path, without simulating the network.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] segments: Keys of the path, starting from the root of the tree
+
+        Returns:
+            [any] value: Copy of the value at the path, None if it doesn't exist
+        """
+        with self._lock:
+            node = self._data
+            for segment in segments:
+                if not isinstance(node, dict) or segment not in node:
+                    return None
+                node = node[segment]
+
+            return copy.deepcopy(node)
+
+    def write(self, changes):
+        """
+        Method to apply changes to the tree, and notify the listeners of each change.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] changes: Tuples of the keys of a changed path, and its new value
+
+        Returns:
+            None -> Changes are applied atomically, and events are sent to listeners
+
+        NOTE: Server values, such as {".sv": {"increment": 1}} are resolved on write
+        """
+        with self._lock:
+            resolved_changes = []
+            for segments, value in changes:
+                value = self._resolve_server_value(segments, value)
+                self._write_path(segments, copy.deepcopy(value))
+                resolved_changes.append((segments, value))
+
+            for registration in self._listeners:
+                for event in self._events_for(registration.segments, resolved_changes):
+                    registration.push(event)
+
+    def transact(self, segments, transaction_update):
+        """
+        Method to replace the value at a path, with a value computed from its own.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] segments: Keys of the path, starting from the root of the tree
+            [callable] transaction_update: Function returning the new value
+
+        Returns:
+            [any] value: New value of the path, after the transaction is applied
+        """
+        with self._lock:
+            value = transaction_update(self.read(segments))
+            self.write([(segments, value)])
+            return value
+
+    def _resolve_server_value(self, segments, value):
+        if not (isinstance(value, dict) and ".sv" in value):
+            return value
+
+        # Only the increment server value is used by CroMa, and hence supported
+        increment = value[".sv"]["increment"]
+        current_value = self.read(segments)
+
+        if isinstance(current_value, (int, float)):
+            return current_value + increment
+        return increment  # Firebase treats missing, and non numeric values as zero
+
+    def _write_path(self, segments, value):
+        if not segments:
+            self._data = value if isinstance(value, dict) else {}
+            return
+
+        node = self._data
+        for segment in segments[:-1]:
+            child = node.get(segment)
+
+            if not isinstance(child, dict):
+                if value is None:
+                    return  # Nothing to delete, as the parent doesn't exist
+                child = node[segment] = {}
+
+            node = child
+
+        # Writing null to a path deletes it, as it does in the firebase database
+        if value is None:
+            node.pop(segments[-1], None)
+        else:
+            node[segments[-1]] = value
+
+    def _events_for(self, listener_segments, changes):
+        depth = len(listener_segments)
+        patch = {}
+        events = []
+
+        for segments, value in changes:
+            if segments[:depth] == listener_segments:
+                # Changes below the listened node are sent with their relative path
+                patch["/".join(segments[depth:])] = copy.deepcopy(value)
+
+            elif listener_segments[: len(segments)] == segments:
+                # Changes above the listened node replace it, so it's sent in full
+                events.append(InMemoryEvent("put", "/", self.read(listener_segments)))
+
+        if len(patch) == 1 and "" in patch:
+            events.append(InMemoryEvent("put", "/", patch[""]))
+        elif len(patch) == 1:
+            path, value = next(iter(patch.items()))
+            events.append(InMemoryEvent("put", "/" + path, value))
+        elif patch:
+            events.append(InMemoryEvent("patch", "/", patch))
+
+        return events
+
+    def add_listener(self, segments, callback):
+        """
+        Method to register a listener, which first receives the full value of node.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] segments: Keys of the listened path, starting from the root
+            [callable] callback: Function called with an InMemoryEvent per change
+
+        Returns:
+            [InMemoryListenerRegistration] registration: Used to stop the listener
+        """
+        with self._lock:
+            registration = InMemoryListenerRegistration(self, segments, callback)
+            self._listeners.append(registration)
+
+            # Listeners first receive the complete value of the node, like the SDK
+            registration.push(InMemoryEvent("put", "/", self.read(segments)))
+
+        return registration
+
+    def remove_listener(self, registration):
+        """Method to stop delivering the events to a listener that has been closed."""
+        with self._lock:
+            if registration in self._listeners:
+                self._listeners.remove(registration)
+
+
+class InMemoryReference:
+    """
+    Class to mimic a firebase db.Reference, over the tree of an InMemoryDatabase.
+
+    .. versionadded:: 1.4.0
+    """
+
+    def __init__(self, database, segments):
+        self.database = database
+        self.segments = segments
+
+    @property
+    def key(self):
+        """Last key of the referenced path, None for the root of the database."""
+        return self.segments[-1] if self.segments else None
+
+    @property
+    def path(self):
+        """Path of the referenced node, relative to the root of the database."""
+        return _join_path(self.segments)
+
+    def child(self, path):
+        """
+        Method to create a reference to a node at a path relative to this reference.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] path: Path of the child, relative to the referenced node
+
+        Returns:
+            [InMemoryReference] ref: Reference to the child node
+        """
+        return InMemoryReference(self.database, self.segments + _split_path(path))
+
+    def get(self, etag=False, shallow=False):
+        """
+        Method to read the value of the referenced node from the database.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [bool] etag: Return the ETag of the node along with value, if True
+            [bool] shallow: Return only the keys of the children, if set to True
+
+        Returns:
+            [any] value: Value of the node, None if the node doesn't exist
+            [str] etag: ETag of the node, returned only if etag is set to True
+        """
+        if etag and shallow:
+            raise ValueError("etag and shallow cannot both be set to True.")
+
+        self.database.simulate_round_trip("get")
+        value = self.database.read(self.segments)
+
+        if etag:
+            return value, _etag(value)
+        if shallow and isinstance(value, dict):
+            return {key: True for key in value}
+        return value
+
+    def get_if_changed(self, etag):
+        """
+        Method to read the value of the node, only if its ETag differs from given.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] etag: ETag of the value of the node, which the caller holds
+
+        Returns:
+            [tuple] result: True, value & new ETag if changed, else False, None, None
+        """
+        self.database.simulate_round_trip("get_if_changed")
+        value = self.database.read(self.segments)
+
+        current_etag = _etag(value)
+        if current_etag == etag:
+            return False, None, None
+        return True, value, current_etag
+
+    def set(self, value):
+        """
+        Method to replace the value of the referenced node in the database.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [any] value: New value of the node, None to delete the node
+
+        Returns:
+            None -> Node is replaced, and the listeners are notified
+        """
+        self.database.simulate_round_trip("set")
+        self.database.write([(self.segments, value)])
+
+    def update(self, value):
+        """
+        Method to update the children of the referenced node, in a single write.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [dict] value: Relative paths of the children as key, & the new values
+
+        Returns:
+            None -> All the children are updated atomically, & listeners notified
+        """
+        if not value or not isinstance(value, dict):
+            raise ValueError("Value argument must be a non-empty dictionary.")
+
+        self.database.simulate_round_trip("update")
+        self.database.write(
+            [
+                (self.segments + _split_path(path), child_value)
+                for path, child_value in value.items()
+            ]
+        )
+
+    def delete(self):
+        """
+        Method to delete the referenced node from the database.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> Node is deleted, and the listeners are notified
+        """
+        self.database.simulate_round_trip("delete")
+        self.database.write([(self.segments, None)])
+
+    def transaction(self, transaction_update):
+        """
+        Method to atomically update the referenced node, using its current value.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [callable] transaction_update: Function returning the new value
+
+        Returns:
+            [any] value: New value of the node, after the transaction is applied
+        """
+        self.database.simulate_round_trip("transaction")
+        return self.database.transact(self.segments, transaction_update)
+
+    def listen(self, callback):
+        """
+        Method to register a callback, receiving the changes made below this node.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [callable] callback: Function called with an InMemoryEvent per change
+
+        Returns:
+            [InMemoryListenerRegistration] registration: Used to stop the listener
+        """
+        self.database.simulate_round_trip("listen")
+        return self.database.add_listener(self.segments, callback)
+
+    def order_by_child(self, path):
+        """
+        Method to create a query ordering the children of this node by a grandchild.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] path: Path of the grandchild, relative to each child of the node
+
+        Returns:
+            [InMemoryQuery] query: Query, which can be filtered before it's run
+        """
+        return InMemoryQuery(self, _split_path(path))
+
+
+class InMemoryQuery:
+    """
+    Class to mimic a firebase db.Query, filtering the children of a node in memory.
+
+    Filters are applied before the result is returned, and only the matching
+    children are counted towards the read, as they are on the firebase servers
+    when the ordered child is indexed by the database rules.
+
+    .. versionadded:: 1.4.0
+    """
+
+    def __init__(self, reference, order_by_segments):
+        self.reference = reference
+        self.order_by_segments = order_by_segments
+
+        self._start_at = None
+        self._end_at = None
+        self._limit_to_first = None
+
+    def equal_to(self, value):
+        """
+        Method to keep only the children, whose ordered value is equal to the given.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [any] value: Value, which the ordered grandchild must be equal to
+
+        Returns:
+            [InMemoryQuery] query: Same query, with the filter added to it
+        """
+        return self.start_at(value).end_at(value)
+
+    def start_at(self, value):
+        """
+        Method to keep only the children, whose ordered value is at least the given.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [any] value: Lowest value of the ordered grandchild, inclusive
+
+        Returns:
+            [InMemoryQuery] query: Same query, with the filter added to it
+        """
+        self._start_at = value
+        return self
+
+    def end_at(self, value):
+        """
+        Method to keep only the children, whose ordered value is at most the given.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [any] value: Highest value of the ordered grandchild, inclusive
+
+        Returns:
+            [InMemoryQuery] query: Same query, with the filter added to it
+        """
+        self._end_at = value
+        return self
+
+    def limit_to_first(self, limit):
+        """
+        Method to keep only the given number of children, from start of the order.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] limit: Maximum number of children to be returned
+
+        Returns:
+            [InMemoryQuery] query: Same query, with the limit added to it
+        """
+        self._limit_to_first = limit
+        return self
+
+    def _ordered_value(self, child_value):
+        for segment in self.order_by_segments:
+            if not isinstance(child_value, dict):
+                return None
+            child_value = child_value.get(segment)
+        return child_value
+
+    def get(self):
+        """
+        Method to run the query, and read the matching children of the node.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [OrderedDict] children: Matching children, in the order of their value
+        """
+        self.reference.database.simulate_round_trip("query")
+        node = self.reference.database.read(self.reference.segments)
+
+        if not isinstance(node, dict):
+            return OrderedDict()
+
+        children = sorted(
+            node.items(),
+            key=lambda item: (_order_key(self._ordered_value(item[1])), item[0]),
+        )
+
+        if self._start_at is not None:
+            start_key = _order_key(self._start_at)
+            children = [
+                (key, value)
+                for key, value in children
+                if _order_key(self._ordered_value(value)) >= start_key
+            ]
+
+        if self._end_at is not None:
+            end_key = _order_key(self._end_at)
+            children = [
+                (key, value)
+                for key, value in children
+                if _order_key(self._ordered_value(value)) <= end_key
+            ]
+
+        if self._limit_to_first is not None:
+            children = children[: self._limit_to_first]
+
+        return OrderedDict(children)
@@ -21,15 +21,250 @@ Included Functions:
     [3] insert_bus_data
     [4] display_full_table
     [5] delete_bus_table
+    [6] SQLiteConnectionPool (class)
+    [7] retrieve_bus_data_many
+    [8] bus_data_cache_stats
+    [9] chunk_bus_ids
 
 .. versionadded:: 1.3.0
+.. versionupdated:: 1.4.0
 
 Read more about the SQL databases used in CroMa in the :ref:`CroMa SQL Databases`
 """
 
+import queue
 import sqlite3
+import threading
 import datetime
 from datetime import datetime
+from pathlib import Path
+from contextlib import contextmanager
+
+from database.database_cache import TTLCache
+
+# Path of the SQL database holding the static data of the buses
+DATABASE_PATH = "croma_playground.db"
+# Maximum number of read-only connections kept open by the connection pool
+CONNECTION_POOL_SIZE = 4
+# Number of prepared statements cached by sqlite3 on each pooled connection
+CACHED_STATEMENTS = 128
+# Maximum number of bus ids bound into a single IN query by the batch lookups
+MAX_BUS_IDS_PER_QUERY = 500
+
+# Maximum number of buses whose operator and type are cached in memory
+BUS_DATA_CACHE_SIZE = 1024
+# Seconds for which the cached operator and type of a bus are served
+BUS_DATA_CACHE_TTL = 3600.0
+# Seconds for which a bus missing from the SQL database is remembered as missing.
+# Buses are added by another process, so a new bus shows up within these seconds
+BUS_DATA_MISSING_TTL = 10.0
+
+# Query to retrieve the bus operator and the bus type of a single bus
+SELECT_BUS_DATA_QUERY = """
+    SELECT BusOperator, BusType
+    FROM Bus
+    WHERE BusId = ?
+"""
+
+
+class SQLiteConnectionPool:
+    """
+    Class to share a set of open connections to the SQL database across threads.
+
+    Lookups borrow one of the pooled read-only connections, so the cost of opening
+    the database file is paid once per connection instead of once per query. The
+    writes go through a single writable connection, guarded by a lock. The journal
+    of the database is switched to WAL, so readers are not blocked by the writer.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Connections are created lazily, the first time they're required by a query
+    """
+
+    def __init__(
+        self,
+        database_path=DATABASE_PATH,
+        pool_size=CONNECTION_POOL_SIZE,
+        cached_statements=CACHED_STATEMENTS,
+    ):
+        """
+        Method to configure the pool. No connection is opened until it is required.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] database_path: Path of the SQLite database file to be connected to
+            [int] pool_size: Maximum number of read-only connections open at a time
+            [int] cached_statements: Prepared statements cached on each connection
+
+        Returns:
+            None -> The pool is configured and ready to hand out the connections
+        """
+        self.database_path = database_path
+        self.pool_size = pool_size
+        self.cached_statements = cached_statements
+
+        # Read-only connections which are open but not borrowed by any thread
+        self._idle_read_connections = queue.LifoQueue()
+        # Bounds the number of read-only connections that are borrowed at a time
+        self._read_slots = threading.BoundedSemaphore(pool_size)
+
+        # The single writable connection, used one thread at a time
+        self._write_connection = None
+        self._write_lock = threading.Lock()
+
+        # Set once the pool has tried to switch the database's journal to WAL
+        self._journal_mode_checked = False
+
+    def _connect(self, read_only):
+        """
+        Method to open a new connection to the database in read-only/writable mode.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [bool] read_only: True to open the database in the read-only mode
+
+        Returns:
+            [sqlite3.Connection] connection: New connection to the SQL database
+        """
+        database_uri = Path(self.database_path).resolve().as_uri()
+
+        if read_only:
+            database_uri = database_uri + "?mode=ro"
+
+        return sqlite3.connect(
+            database_uri,
+            uri=True,
+            check_same_thread=False,  # Connections are passed between the threads
+            cached_statements=self.cached_statements,
+        )
+
+    @contextmanager
+    def read_connection(self):
+        """
+        Method to borrow a read-only connection from the pool for running lookups.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [sqlite3.Connection] connection: Read-only connection, for the with block
+
+        NOTE: Threads block here if all the connections of the pool are borrowed
+        """
+        with self._read_slots:
+            # Open the writable connection once, so the journal is switched to WAL
+            if not self._journal_mode_checked:
+                try:
+                    with self.write_connection():
+                        pass
+                except sqlite3.OperationalError:
+                    pass  # Lookups still work on databases that can't be written
+                self._journal_mode_checked = True
+
+            try:
+                connection = self._idle_read_connections.get_nowait()
+            except queue.Empty:
+                connection = self._connect(read_only=True)
+
+            try:
+                yield connection
+            finally:
+                self._idle_read_connections.put(connection)
+
+    @contextmanager
+    def write_connection(self):
+        """
+        Method to borrow the writable connection, committing when the block exits.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [sqlite3.Connection] connection: Writable connection, for the with block
+
+        NOTE: Changes are rolled back if the with block raises an exception
+        """
+        with self._write_lock:
+            if self._write_connection is None:
+                connection = self._connect(read_only=False)
+                # WAL lets the readers continue while a write is in progress
+                connection.execute("PRAGMA journal_mode=WAL")
+                self._write_connection = connection
+
+            try:
+                yield self._write_connection
+            except BaseException:
+                self._write_connection.rollback()
+                raise
+            else:
+                self._write_connection.commit()
+
+    def close(self):
+        """
+        Method to close all the connections that have been opened by the pool.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> Connections are closed, and are opened again when next required
+        """
+        while True:
+            try:
+                self._idle_read_connections.get_nowait().close()
+            except queue.Empty:
+                break
+
+        with self._write_lock:
+            if self._write_connection is not None:
+                self._write_connection.close()
+                self._write_connection = None
+
+
+# Pool of connections to the SQL database, shared by all the functions of module
+connection_pool = SQLiteConnectionPool()
+
+# Cache of operator and type of the buses, cleared whenever the tables are changed
+bus_data_cache = TTLCache(maxsize=BUS_DATA_CACHE_SIZE, ttl=BUS_DATA_CACHE_TTL)
+# Marks a bus missing from the cache, as None is cached for the unknown bus ids
+_NOT_CACHED = object()
+
+
+def chunk_bus_ids(bus_ids, chunk_size=MAX_BUS_IDS_PER_QUERY):
+    """
+    Function to split the bus ids into chunks, to be bound into the IN clauses.
+
+    SQLite limits the number of variables bound into a single query, so the batch
+    lookups run one query for each chunk, instead of one query for all the buses.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids to be looked up in the SQL DB
+        [int] chunk_size: Maximum number of bus ids bound into a single query
+
+    Returns:
+        [generator] chunks: Tuples of the IN clause's placeholders & the bus ids
+    """
+    bus_ids = list(bus_ids)
+
+    for start in range(0, len(bus_ids), chunk_size):
+        chunk = bus_ids[start : start + chunk_size]
+        yield "(" + ", ".join("?" * len(chunk)) + ")", chunk
+
+
+def _cache_bus_data(bus_id, result, generation):
+    # Missing buses are remembered briefly, so that newly added buses show up soon
+    ttl = BUS_DATA_MISSING_TTL if result is None else None
+    bus_data_cache.set(bus_id, result, ttl=ttl, generation=generation)
 
 
 def retrieve_bus_data_from_sql_database(bus_id):
@@ -40,6 +275,7 @@ def retrieve_bus_data_from_sql_database(bus_id):
     the bus operator, & bus type. None is returned in case when no key is found.
 
     .. versionadded:: 1.3.0
+    .. versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus Id is used to search the SQL DB for the required data
@@ -49,25 +285,75 @@ def retrieve_bus_data_from_sql_database(bus_id):
         [str] bus_type: The type of the public bus as is defined by bus operator
 
     """
-    # Set up connection to the SQL database
-    conn = sqlite3.connect("croma_playground.db")
-    cursor = conn.cursor()
+    # Serve the operator and the type of the bus from cache, if it's been cached
+    result = bus_data_cache.get(bus_id, _NOT_CACHED)
+    if result is not _NOT_CACHED:
+        return result
 
-    # Retrieve specific values from the table
-    select_query = """
-        SELECT BusOperator, BusType
-        FROM Bus
-        WHERE BusId = ?
-    """
-    # Execute the SQL query on the specified table
-    cursor.execute(select_query, (bus_id,))
-    result = cursor.fetchone()  # Fetch the records with the value
+    # Values read before the tables are changed are not cached after the change
+    generation = bus_data_cache.generation
 
-    # Close the database connection
-    conn.close()
+    # Borrow a read-only connection from the pool of connections to the database
+    with connection_pool.read_connection() as conn:
+        # Execute the prepared SQL query on the Bus table
+        result = conn.execute(SELECT_BUS_DATA_QUERY, (bus_id,)).fetchone()
+
+    _cache_bus_data(bus_id, result, generation)
     return result  # Return the output as comma seprated values
 
 
+def retrieve_bus_data_many(bus_ids):
+    """
+    Function to retrieve the bus operator & bus type of multiple buses together.
+
+    The Bus Ids missing from the cache are looked up using one SQL query with an
+    IN clause, instead of one query per bus. Buses which aren't found are left out.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] bus_ids: Bus Ids to search the SQL DB for the required data
+
+    Returns:
+        [dict] bus_data: Tuple of bus operator & bus type, keyed by the Bus Id
+
+    """
+    bus_data = {}
+    uncached_bus_ids = []
+
+    # Serve the buses from the cache, and look up only the remaining ones in SQL DB
+    for bus_id in dict.fromkeys(bus_ids):
+        result = bus_data_cache.get(bus_id, _NOT_CACHED)
+
+        if result is _NOT_CACHED:
+            uncached_bus_ids.append(bus_id)
+        elif result is not None:
+            bus_data[bus_id] = result
+
+    if not uncached_bus_ids:
+        return bus_data
+
+    # Values read before the tables are changed are not cached after the change
+    generation = bus_data_cache.generation
+
+    # Borrow a read-only connection from the pool of connections to the database
+    with connection_pool.read_connection() as conn:
+        # Bind the bus ids in chunks, to stay within SQLite's limit on variables
+        for placeholders, chunk in chunk_bus_ids(uncached_bus_ids):
+            select_query = (
+                "SELECT BusId, BusOperator, BusType FROM Bus WHERE BusId IN "
+                + placeholders
+            )
+            for bus_id, bus_operator, bus_type in conn.execute(select_query, chunk):
+                bus_data[bus_id] = (bus_operator, bus_type)
+
+    # Cache the looked up buses, including the ones that were not found in SQL DB
+    for bus_id in uncached_bus_ids:
+        _cache_bus_data(bus_id, bus_data.get(bus_id), generation)
+
+    return bus_data
+
+
 def create_new_table(table_name):
     """
     Function to create a new table in the SQL database, with name passed in arg.
@@ -84,21 +370,20 @@ def create_new_table(table_name):
         None -> Creates a table with specified fields & stores it in the SQL DB
 
     """
-    # Set up connection to the SQL database
-    conn = sqlite3.connect("croma_playground.db")
-    cursor = conn.cursor()
-
-    # Create the table
-    create_table_query = """
-        CREATE TABLE IF NOT EXISTS ? (
-            BusId TEXT PRIMARY KEY,
-            BusOperator TEXT,
-            BusType TEXT
-        )
-    """
-    # Execute the SQL query on the specified table
-    cursor.execute(create_table_query, (table_name,))
-    conn.close()  # Close the connection to the SQL database
+    # Borrow the writable connection from the pool of connections to the database
+    with connection_pool.write_connection() as conn:
+        cursor = conn.cursor()
+
+        # Create the table
+        create_table_query = """
+            CREATE TABLE IF NOT EXISTS ? (
+                BusId TEXT PRIMARY KEY,
+                BusOperator TEXT,
+                BusType TEXT
+            )
+        """
+        # Execute the SQL query on the specified table
+        cursor.execute(create_table_query, (table_name,))
 
 
 def insert_bus_data(table_name, new_bus_details):
@@ -118,10 +403,6 @@ def insert_bus_data(table_name, new_bus_details):
         None -> Inserts multiple records into the specified table present in DB
 
     """
-    # Set up connection to the SQL database
-    conn = sqlite3.connect("croma_playground.db")
-    cursor = conn.cursor()
-
     # Insert new records into the SQL Bus table
     insert_query = (
         "INSERT INTO " + table_name + " (BusId, BusOperator, BusType) VALUES (?, ?, ?)"
@@ -132,12 +413,12 @@ def insert_bus_data(table_name, new_bus_details):
         VALUES (?, ?, ?)
     '''
     """
-    # Add all new records into the specified table within the SQL database
-    cursor.executemany(insert_query, new_bus_details)
+    # Borrow the writable connection, which commits the changes once block exits
+    with connection_pool.write_connection() as conn:
+        # Add all new records into the specified table within the SQL database
+        conn.executemany(insert_query, new_bus_details)
 
-    # Commit the changes to the database
-    conn.commit()
-    conn.close()  # Close the connection to the SQL database
+    bus_data_cache.clear()  # Cached values may no longer match the SQL database
 
 
 def display_full_table(table_name):
@@ -156,19 +437,16 @@ def display_full_table(table_name):
         [str] rows -> Displays all records present in this table with name as arg
 
     """
-    # Set up the connection to the SQL database
-    conn = sqlite3.connect("croma_playground.db")
-    cursor = conn.cursor()
-
     # Query to display all records of the table
     select_query = """
         SELECT * FROM ?
     """
-    cursor.execute(select_query, (table_name,))  # Execute the SQL query
+    # Borrow a read-only connection from the pool of connections to the database
+    with connection_pool.read_connection() as conn:
+        cursor = conn.execute(select_query, (table_name,))  # Execute the SQL query
 
-    # Fetch all rows from the result set
-    rows = cursor.fetchall()
-    conn.close()  # Close the connection to the database
+        # Fetch all rows from the result set
+        rows = cursor.fetchall()
 
     return rows  # Returns all records stored in the SQL table
 
@@ -189,17 +467,28 @@ def delete_bus_table(table_name):
         None -> The table, if exists is dropped entirely from the SQL database
 
     """
-    # Set up the connection to the SQL database
-    conn = sqlite3.connect("croma_playground.db")
-    cursor = conn.cursor()
-
     # Delete the table, if it exists in the database
     delete_table_query = """
         DROP TABLE IF EXISTS ?
     """
-    cursor.execute(delete_table_query, (table_name,))
+    # Borrow the writable connection, which commits the changes once block exits
+    with connection_pool.write_connection() as conn:
+        conn.execute(delete_table_query, (table_name,))
+
+    bus_data_cache.clear()  # Cached values may no longer match the SQL database
+
+
+def bus_data_cache_stats():
+    """
+    Function to fetch the hit and miss counters of the bus operator and type cache.
 
-    # Commit the changes to the database
-    conn.commit()
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
 
-    conn.close()  # Close the connection to the SQL database
+    Returns:
+        [dict] stats: Hits, misses and the number of buses currently in the cache
+
+    """
+    return bus_data_cache.stats()
@@ -25,7 +25,7 @@ Included Classes and Methdds:
         [e] print_signature_and_date
 
 .. versionadded:: 1.2.0
-.. versionupdated:: 1.3.0
+.. versionupdated:: 1.4.0
 
 Read more about the use case of CroMa reports in :ref:`CroMa Reports and Analytics`
 """
@@ -33,8 +33,6 @@ import random
 from datetime import date
 from fpdf import FPDF
 
-from hardware import terminal
-
 
 class DSRReport(FPDF):
     """
@@ -209,7 +207,7 @@ class DSRReport(FPDF):
         self.line(159.8, 80.0, 159.8, 105.0)  # Draw vertical line that separates column
 
 
-    def print_table_content(self):
+    def print_table_content(self, trip_state):
         """
         This method prints important trip details, such as load factor on the PDF report.
 
@@ -218,10 +216,11 @@ class DSRReport(FPDF):
         PDF page using the set_xy() function, and the cell() functions of the FPDF class.
 
         .. versionadded:: 1.2.0
-        .. versionupdated:: 1.3.0
+        .. versionupdated:: 1.4.0
 
         Parameters:
             [class object] self -> Values are read from the memory as per configruations
+            [TripState] trip_state: State of the trip for which the report is printed
 
         Returns:
             None -> Print important details, such as load factor & collections on a file
@@ -243,7 +242,7 @@ class DSRReport(FPDF):
         self.set_font("Arial", "", 11)  # Set the font style for total passengers
 
         self.cell(
-            w=10, h=10, align="C", txt=str(terminal.passengers_per_trip), border=0
+            w=10, h=10, align="C", txt=str(trip_state.passengers_per_trip), border=0
         )  # Print total passengers value
 
         # Code block to display the label for total collections
@@ -263,7 +262,7 @@ class DSRReport(FPDF):
         self.set_font("Arial", "", 11)  # Set the font style for total collections
 
         self.cell(
-            w=10, h=10, align="C", txt=str(terminal.collection), border=0
+            w=10, h=10, align="C", txt=str(trip_state.collection), border=0
         )  # Print total collection value
 
         # Code block to display the label for load factor
@@ -279,7 +278,7 @@ class DSRReport(FPDF):
         self.set_font("Arial", "", 11)  # Set the font style for load factor
 
         self.cell(
-            w=10, h=10, align="C", txt=str(round(terminal.load_factor, 2)), border=0
+            w=10, h=10, align="C", txt=str(round(trip_state.load_factor, 2)), border=0
         )  # Print load factor value
 
         # Code block to display the label for max boarding
@@ -297,7 +296,7 @@ class DSRReport(FPDF):
         self.set_font("Arial", "", 11)  # Set the font style for max boarding
 
         self.cell(
-            w=10, h=10, align="C", txt=str(terminal.MAX_BOARDING_BUS_STOP), border=0
+            w=10, h=10, align="C", txt=str(trip_state.max_boarding_bus_stop), border=0
         )  # Print max boarding value
 
         # Code block to display the label for max deboarding
@@ -315,7 +314,7 @@ class DSRReport(FPDF):
         self.set_font("Arial", "", 11)  # Set the font style for max deboarding
 
         self.cell(
-            w=10, h=10, align="C", txt=str(terminal.MAX_DEBOARDING_BUS_STOP), border=0
+            w=10, h=10, align="C", txt=str(trip_state.max_deboarding_bus_stop), border=0
         )  # Print max deboarding value
 
 
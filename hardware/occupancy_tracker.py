@@ -0,0 +1,168 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the occupancy tracker used by the ticketing machine on a trip.
+Passengers boarding and deboarding at each bus stop are stored in a Fenwick tree, so
+that the passengers aboard at any stop is found without adding up the full route.
+
+Included Functions:
+    [1] OccupancyTracker (class)
+        [i] add_passengers
+        [ii] passengers_aboard
+        [iii] passengers_between
+        [iv] segment_occupancy
+        [v] net_boardings
+
+.. versionadded:: 1.4.0
+
+Read more about the functionality of hardware in :ref:`CroMa - Ticketing Machine`
+"""
+
+from array import array
+
+
+class OccupancyTracker:
+    """
+    Class to track the passengers aboard a bus, along the bus stops of its route.
+
+    The net number of passengers boarding at each stop (onboards minus deboards) is
+    stored in a Fenwick tree sized to the route, so that both the updates and the
+    prefix queries take logarithmic time, irrespective of the length of the route.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Positions of the bus stops passed to the methods are one based
+    """
+
+    __slots__ = ("stop_count", "_tree")
+
+    def __init__(self, stop_count):
+        """
+        Method to create an empty tracker for a route with the given number of stops.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] stop_count: Number of bus stops in the selected route
+
+        Returns:
+            None -> The tracker is created, with no passengers aboard at any stop
+        """
+        self.stop_count = stop_count
+        # Index 0 is unused, so that the tree can be navigated using one based index
+        self._tree = array("i", bytes(4 * (stop_count + 1)))
+
+    def __len__(self):
+        return self.stop_count
+
+    def add_passengers(self, position, passenger_count):
+        """
+        Method to add the passengers boarding at a stop, negative count if deboarding.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] position: Position of the bus stop in the route
+            [int] passenger_count: Passengers boarding, negative when deboarding
+
+        Returns:
+            None -> The count is added to all the nodes covering the bus stop
+        """
+        if not 1 <= position <= self.stop_count:
+            raise IndexError("Bus stop position is out of the route's range")
+
+        while position <= self.stop_count:
+            self._tree[position] += passenger_count
+            position += position & -position  # Move to the next node covering the stop
+
+    def passengers_aboard(self, position):
+        """
+        Method to fetch the passengers aboard the bus, after it departs from a stop.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] position: Position of the bus stop in the route
+
+        Returns:
+            [int] passengers_aboard: Net boardings at all the stops up to the stop
+        """
+        position = min(position, self.stop_count)
+
+        passengers_aboard = 0
+        while position > 0:
+            passengers_aboard += self._tree[position]
+            position -= position & -position  # Move to the node covering earlier stops
+
+        return passengers_aboard
+
+    def passengers_between(self, first_position, last_position):
+        """
+        Method to fetch the net boardings at the stops between two positions of route.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] first_position: Position of the first bus stop, inclusive
+            [int] last_position: Position of the last bus stop, inclusive
+
+        Returns:
+            [int] net_boardings: Onboards minus deboards at the stops in the range
+        """
+        return self.passengers_aboard(last_position) - self.passengers_aboard(
+            first_position - 1
+        )
+
+    def net_boardings(self, position):
+        """
+        Method to fetch the net number of passengers who boarded the bus at a stop.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] position: Position of the bus stop in the route
+
+        Returns:
+            [int] net_boardings: Onboards minus deboards at the given bus stop
+        """
+        return self.passengers_between(position, position)
+
+    def segment_occupancy(self):
+        """
+        Method to fetch the passengers aboard on each segment between adjacent stops.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [list] occupancy: Passengers aboard between stop i and stop i+1, at [i-1]
+        """
+        # Recover the net boardings at each stop in linear time, by undoing the sums
+        # each node received from its children, starting with the last node
+        net_boardings = array("i", self._tree)
+        for position in range(self.stop_count, 0, -1):
+            parent = position + (position & -position)
+            if parent <= self.stop_count:
+                net_boardings[parent] -= net_boardings[position]
+
+        occupancy = []
+        passengers_aboard = 0
+
+        for position in range(1, self.stop_count):
+            passengers_aboard += net_boardings[position]
+            occupancy.append(passengers_aboard)
+
+        return occupancy
@@ -0,0 +1,188 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the time arithmetic used for the delays & the arrival times.
+Schedule times are held as integer seconds since the start of the service day, so
+that they are added & subtracted directly, without round trips through strings.
+
+A service day starts at SERVICE_DAY_START_HOUR, and not at midnight, so that the
+trips running past midnight are still counted in the day they started on.
+
+Included Functions:
+    [1] service_day
+    [2] to_service_seconds
+    [3] from_service_seconds
+    [4] minutes_between
+    [5] format_clock
+    [6] to_service_seconds_many
+    [7] format_clock_many
+
+.. versionadded:: 1.4.0
+
+Read more about the functionality of hardware in :ref:`CroMa - Ticketing Machine`
+"""
+
+import datetime
+
+import numpy as np
+
+# Hour at which the service day starts, trips before it belong to the previous day
+SERVICE_DAY_START_HOUR = 4
+
+SECONDS_PER_MINUTE = 60
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def service_day(moment):
+    """
+    Function to fetch the service day, on which the given moment is counted.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [datetime] moment: Date and time to be looked up
+
+    Returns:
+        [date] service_date: Calendar date on which the service day started
+    """
+    return (moment - datetime.timedelta(hours=SERVICE_DAY_START_HOUR)).date()
+
+
+def _service_day_start(service_date):
+    return datetime.datetime.combine(
+        service_date, datetime.time(hour=SERVICE_DAY_START_HOUR)
+    )
+
+
+def to_service_seconds(moment, service_date=None):
+    """
+    Function to convert a moment to the seconds elapsed since the service day began.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [datetime] moment: Date and time to be converted
+        [date] service_date: Service day to measure from, the moment's own if None
+
+    Returns:
+        [int] seconds: Whole seconds since the start of the service day
+    """
+    if service_date is None:
+        service_date = service_day(moment)
+
+    elapsed = moment - _service_day_start(service_date)
+    return elapsed.days * SECONDS_PER_DAY + elapsed.seconds
+
+
+def from_service_seconds(seconds, service_date):
+    """
+    Function to convert the seconds since the service day began, back to a moment.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [int] seconds: Whole seconds since the start of the service day
+        [date] service_date: Service day from which the seconds are measured
+
+    Returns:
+        [datetime] moment: Date and time, which the seconds correspond to
+    """
+    return _service_day_start(service_date) + datetime.timedelta(seconds=int(seconds))
+
+
+def minutes_between(start, end):
+    """
+    Function to calculate the whole minutes elapsed from one moment to another.
+
+    Both moments are measured from the service day of the start, so the result
+    stays right when the service day rolls over between them, & seconds are kept
+    till the end, instead of being dropped from both the moments separately.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [datetime] start: Moment from which the minutes are counted
+        [datetime] end: Moment till which the minutes are counted
+
+    Returns:
+        [int] minutes: Whole minutes from start to end, negative if end is earlier
+    """
+    service_date = service_day(start)
+
+    elapsed_seconds = to_service_seconds(end, service_date) - to_service_seconds(
+        start, service_date
+    )
+    return elapsed_seconds // SECONDS_PER_MINUTE
+
+
+def format_clock(seconds):
+    """
+    Function to format the seconds since the service day began, as HH:MM clock time.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [int] seconds: Whole seconds since the start of the service day
+
+    Returns:
+        [str] clock_time: Time of the day in the HH:MM format, wrapped past midnight
+    """
+    minutes = (int(seconds) // SECONDS_PER_MINUTE + SERVICE_DAY_START_HOUR * 60) % (
+        24 * 60
+    )
+    return "%02d:%02d" % divmod(minutes, 60)
+
+
+def to_service_seconds_many(moments, service_date):
+    """
+    Function to convert many moments to seconds since the service day, at once.
+
+    The moments are converted to a NumPy array of datetimes, and the start of the
+    service day is subtracted from all of them in one vectorized operation.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] moments: Datetime objects, or strings in the YYYY-MM-DD HH:MM:SS format
+        [date] service_date: Service day from which the seconds are measured
+
+    Returns:
+        [ndarray] seconds: Whole seconds since the start of the service day, as int64
+    """
+    service_day_start = np.datetime64(_service_day_start(service_date), "s")
+
+    # Truncate the moments to whole seconds, before measuring from the day start
+    moments = np.array(list(moments), dtype="datetime64[s]")
+    return (moments - service_day_start).astype(np.int64)
+
+
+def format_clock_many(seconds):
+    """
+    Function to format many seconds since the service day, as HH:MM clock times.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [list] seconds: Whole seconds since the start of the service day
+
+    Returns:
+        [list] clock_times: Times of the day in the HH:MM format, in the same order
+    """
+    minutes = np.asarray(seconds, dtype=np.int64) // SECONDS_PER_MINUTE
+    hours, minutes = np.divmod((minutes + SERVICE_DAY_START_HOUR * 60) % (24 * 60), 60)
+
+    return [
+        "%02d:%02d" % clock_time
+        for clock_time in zip(hours.tolist(), minutes.tolist())
+    ]
@@ -23,13 +23,32 @@ Categories of Variables:
     [5] Calculated - Value is calculated at runtime during execution
     [6] Counter - Value to maintain count of iteration for logical computations
 
+Values which change during a trip are held in a TripState object per bus, instead
+of module variables, so that a single process can run multiple ticketing machines.
+
+Included Functions:
+    [1] TripState (class)
+        [i] reset
+        [ii] record_ticket
+        [iii] passengers_aboard
+        [iv] record_load_factor
+        [v] segment_load_factors
+        [vi] summarize_trip
+
+    [2] get_trip_state
+
 .. versionadded:: 1.2.0
-.. versionupdated:: 1.3.0
+.. versionupdated:: 1.4.0
 
 NOTE: At runtime values of all of these variables are set to system defaults.
 """
 # pylint: disable=invalid-name
 
+import threading
+from array import array
+
+from hardware.occupancy_tracker import OccupancyTracker
+
 # [Database Fetched] Variable specifying bus type (eg:express, city etc)
 bus_type = None
 
@@ -40,49 +59,21 @@ input_password = None
 # [User Input] Unique Id associated with each route, fetches info from routesDB
 route_id = None
 
-# [Dynamic] The current location of the bus. Default value set to origin at runtime
-current_location = None
-# [Dynamic] Free seats available in a bus in transit. Default value set to 0
-available_seat_count = 0
-# [Dynamic] Total no. of passengers in bus at a given time. Default value is 0
-total_passengers = 0
-
 # [User-Input] Unique Id associate with each bus, fetches info from busDB
 bus_id = "KL13N"
 # [Database Fetched] A list of all bus stops in a given route
 bus_route = "Trivandrum to Kottayam"
 
-# [Calculated] Ration of total passengers in the bus to its maximum capacity
-load_factor = 0
-# [Calculated] List of load factors after each ticket is printed
-load_factor_list = []
 # [Database Fetched] Total capcity of the bus
 BUS_MAX_CAPACITY = 32
 
-# [Calculated] Bus stop from where the maximum passengers boarded the bus
-MAX_BOARDING_BUS_STOP = " "
-# [Calculated] Bus stop where the maximum passengers deboarded the bus
-MAX_DEBOARDING_BUS_STOP = " "
-# [User Input] Number of passengers boarding the bus at each stop
-boarding_tracker = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-# [User Input] Number of passengers deboarding the bus at each stop
-deboarding_tracker = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-
 # [Calculated] Value to disable firebase re-initialization
 count = 0
 # [User Input] Directory location where the DSR report is saved
 report_location = " "
 
-# [Dynamic] Amount collected as fare during the trip. Default value set to 0
-collection = 0
-# [Dynamic] An array of 0s of length(selected_route) managing crowd information
-crowd_manager = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
-# [Dynamic] Total number of co-passengers while printing the ticket
-passenger_count = 0
 # [User Input] Numerical encoded form of the selected route
 selected_route = 0
-# [Dynamic] Total tickets printed throughout the trip. Default value set to 0
-total_tickets_printed = 0
 
 # [Alert] General warning flag for alerting the user
 warning_flag = False
@@ -91,13 +82,6 @@ same_starting_and_destination_location_warning_flag = False
 # [Alert] Warning to alert the user if the destination has already been crossed
 wrong_destination_warning_flag = False
 
-# [Calculated] Total number of passengers who boarded the bus throughout the journey
-total_trip_passenger_count = 0
-# [Calculated] Total number of passengers who boarded the bus throughout the journey
-passengers_per_trip = 0
-# [Calculated] Number of passengers who boarded the bus at a particular time
-current_passenger_count = None
-
 # [User Input] The email address to which the mail is to be delivered
 RECEIVER_EMAIL_ID = " "
 
@@ -120,3 +104,267 @@ br_mail_body = " "
 initialize_firebase_sdk_ticketing_machine = 0
 # [Counter] Counter for initializing firebase sdk for the user application
 initialize_firebase_sdk_user_application = 0
+
+
+class TripState:
+    """
+    Class to hold the values that change during the trip of a single bus.
+
+    Counters indexed by the position of bus stops in the route are stored in typed
+    arrays sized to the route, and a fresh array is created for each of them when
+    the trip is reset, so that the counters never share the same storage. Crowd
+    manager is an OccupancyTracker, to find passengers aboard in logarithmic time.
+
+    .. versionadded:: 1.4.0
+
+    NOTE: Positions of the bus stops passed to the methods are one based
+    """
+
+    __slots__ = (
+        "bus_id",
+        "route_id",
+        "stop_count",
+        "bus_max_capacity",
+        "current_location",
+        "available_seat_count",
+        "total_passengers",
+        "crowd_manager",
+        "boarding_tracker",
+        "deboarding_tracker",
+        "load_factor_list",
+        "load_factor",
+        "collection",
+        "passengers_per_trip",
+        "total_tickets_printed",
+        "max_boarding_bus_stop",
+        "max_deboarding_bus_stop",
+        "is_started",
+        "lock",
+    )
+
+    def __init__(self, bus_id, route_id, stop_count, bus_max_capacity=BUS_MAX_CAPACITY):
+        """
+        Method to create the state of a new trip, with all the counters set to zero.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [str] bus_id: Bus id of the selected bus
+            [str] route_id: Route Id assigned to the bus
+            [int] stop_count: Number of bus stops in the selected route
+            [int] bus_max_capacity: Total capacity of the bus
+
+        Returns:
+            None -> The state of the trip is created with the default values
+        """
+        self.bus_id = bus_id
+        self.route_id = route_id
+        self.stop_count = stop_count
+        self.bus_max_capacity = bus_max_capacity
+
+        # Tickets for a bus may be printed from more than one streamlit session
+        self.lock = threading.RLock()
+        self.reset()
+
+        # Trip is started in the database by the first session of the bus to load
+        self.is_started = False
+
+    def reset(self):
+        """
+        Method to reset all the counters of the trip to their default values.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            None -> The counters are reset, each using a new array of zeroes
+        """
+        with self.lock:
+            # [Dynamic] Values read from the firebase database during the trip
+            self.current_location = None
+            self.available_seat_count = 0
+            self.total_passengers = 0
+
+            # [Dynamic] Passengers onboarded and deboarded at each of the bus stops
+            self.crowd_manager = OccupancyTracker(self.stop_count)
+            self.boarding_tracker = array("i", bytes(4 * self.stop_count))
+            self.deboarding_tracker = array("i", bytes(4 * self.stop_count))
+
+            # [Calculated] Load factors after each ticket is printed, and their mean
+            self.load_factor_list = array("d")
+            self.load_factor = 0
+
+            # [Calculated] Trip totals, printed in the daily status report
+            self.collection = 0
+            self.passengers_per_trip = 0
+            self.total_tickets_printed = 0
+            self.max_boarding_bus_stop = " "
+            self.max_deboarding_bus_stop = " "
+
+    def record_ticket(
+        self,
+        user_starting_point,
+        user_destination,
+        passenger_count,
+        fare,
+        int_current_location,
+    ):
+        """
+        Method to update the counters of the trip, once a ticket has been printed.
+
+        The passengers aboard at the bus's current location are counted before and
+        after the ticket is recorded, under the same lock, so that the change isn't
+        counted twice when tickets are printed from more than one session at once.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] user_starting_point: The onboarding location of the passenger
+            [int] user_destination: The destination location of the passenger
+            [int] passenger_count: The total number of co-passengers boarding together
+            [int] fare: The total fare of the ticket
+            [int] int_current_location: Position of the bus's current location
+
+        Returns:
+            [int] passenger_delta: Change in passengers aboard at current location
+        """
+        with self.lock:
+            passengers_aboard_before = self.passengers_aboard(int_current_location)
+            self.collection = self.collection + fare
+
+            # Passengers are added at the boarding point & removed at the destination
+            self.crowd_manager.add_passengers(user_starting_point, passenger_count)
+            self.crowd_manager.add_passengers(user_destination, -passenger_count)
+
+            self.boarding_tracker[user_starting_point - 1] += passenger_count
+            self.deboarding_tracker[user_destination - 1] += passenger_count
+
+            self.total_tickets_printed = self.total_tickets_printed + 1
+            self.passengers_per_trip = self.passengers_per_trip + passenger_count
+
+            passengers_aboard_after = self.passengers_aboard(int_current_location)
+            return passengers_aboard_after - passengers_aboard_before
+
+    def passengers_aboard(self, int_current_location):
+        """
+        Method to calculate the number of passengers aboard the bus at a given stop.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] int_current_location: Position of the bus's current location
+
+        Returns:
+            [int] total_passengers: Passengers aboard the bus at the given stop
+        """
+        with self.lock:
+            return self.crowd_manager.passengers_aboard(int_current_location)
+
+    def record_load_factor(self, total_passengers):
+        """
+        Method to calculate the load factor of the bus, & add it to the load factors.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [int] total_passengers: Passengers aboard the bus at the instance
+
+        Returns:
+            [float] load_factor: Ratio of total passengers to the bus's capacity
+        """
+        with self.lock:
+            self.total_passengers = total_passengers
+            self.load_factor = total_passengers / self.bus_max_capacity
+            self.load_factor_list.append(self.load_factor)
+
+            return self.load_factor
+
+    def segment_load_factors(self):
+        """
+        Method to calculate the load factor of the bus between each pair of stops.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            None
+
+        Returns:
+            [list] load_factors: Load factor between stop i and stop i+1, at [i-1]
+        """
+        with self.lock:
+            return [
+                passengers_aboard / self.bus_max_capacity
+                for passengers_aboard in self.crowd_manager.segment_occupancy()
+            ]
+
+    def summarize_trip(self, bus_stops):
+        """
+        Method to calculate the overall load factor & busiest stops, at end of trip.
+
+        .. versionadded:: 1.4.0
+
+        Parameters:
+            [list] bus_stops: The list of bus stops in the selected route
+
+        Returns:
+            None -> Load factor, and the max boarding & deboarding stops are set
+        """
+        with self.lock:
+            # Compute the overall load factor, as the mean of all the load factors
+            if len(self.load_factor_list) == 0:
+                self.load_factor = 0
+            else:
+                self.load_factor = sum(self.load_factor_list) / len(
+                    self.load_factor_list
+                )
+
+            # Inspect the boarding_tracker to find the stop with maximum onboards
+            if sum(self.boarding_tracker) == 0:
+                self.max_boarding_bus_stop = "Unavailable"
+            else:
+                max_boarding = self.boarding_tracker.index(max(self.boarding_tracker))
+                self.max_boarding_bus_stop = bus_stops[max_boarding]
+
+            # Inspect the deboarding_tracker to find the stop with maximum deboards
+            if sum(self.deboarding_tracker) == 0:
+                self.max_deboarding_bus_stop = "Unavailable"
+            else:
+                max_deboarding = self.deboarding_tracker.index(
+                    max(self.deboarding_tracker)
+                )
+                self.max_deboarding_bus_stop = bus_stops[max_deboarding]
+
+
+# Bus Id as key, and the state of the bus's current trip as value
+_trip_states = {}
+_trip_states_lock = threading.Lock()
+
+
+def get_trip_state(bus_id, route_id, stop_count):
+    """
+    Function to fetch the state of the bus's current trip, creating it if required.
+
+    The same object is returned to every streamlit session of a bus. A new trip is
+    started if the bus didn't have one, or if it has been assigned another route.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        [str] bus_id: Bus id of the selected bus
+        [str] route_id: Route Id assigned to the bus
+        [int] stop_count: Number of bus stops in the selected route
+
+    Returns:
+        [TripState] trip_state: State of the current trip of the bus
+    """
+    with _trip_states_lock:
+        trip_state = _trip_states.get(bus_id)
+
+        if trip_state is None or trip_state.route_id != route_id:
+            trip_state = TripState(bus_id, route_id, stop_count)
+            _trip_states[bus_id] = trip_state
+
+        return trip_state
+
@@ -19,13 +19,12 @@ several options for performing conductor book-keeping & data-tracking operations
 Included Functions:
     [1] apply_style_to_sidebar_button
     [2] generate_ticket_id
-    [3] calculate_time_difference
-    [4] refresh_real_time_database
-    [5] print_ticket
-    [6] generate_dsr_report
+    [3] refresh_real_time_database
+    [4] print_ticket
+    [5] generate_dsr_report
 
 .. versionadded:: 1.2.0
-.. versionupdated:: 1.3.0
+.. versionupdated:: 1.4.0
 
 Read more about the functionality of hardware in :ref:`CroMa - Ticketing Machine`
 """
@@ -40,11 +39,13 @@ import subprocess
 import datetime
 from datetime import datetime
 
-from database import firebase_database
+from database import bus_state_store
+from database.firebase_write_buffer import write_buffer
 from database import cassandra_database
 
 from hardware import generate_report
 from hardware import send_mail
+from hardware import service_time
 from hardware import terminal
 from hardware.data import bus_fares
 from hardware import application_support_dictionary
@@ -196,82 +197,45 @@ def generate_ticket_id():
     return ticket_id  # Return the unique ticket id to be printed in the ticket
 
 
-def calculate_time_difference(time1, time2):
-    """
-    Function to calculate difference between times and return output as minutes
-
-    Two arguments representing time in HH:MM format, type-casted as strings are
-    passed into the function. Difference is calculated after converting to mins.
-
-    .. versionadded:: 1.3.0
-
-    Parameters:
-        [str] time1: The subtrahend string value of the time var, in HH:MM format
-        [str] time2: The minuend value of time casted as string in HH:MM format
-
-    Returns:
-        [int] difference_minutes: The total difference in time returned as mins
-
-    NOTE: Time difference is returned as mins. Using seconds increases accuracy.
-
-    """
-
-    # Split the subtrahend and minuend into hours and minutes & map as integers
-    hours1, minutes1 = map(int, time1.split(":"))
-    hours2, minutes2 = map(int, time2.split(":"))
-
-    # Convert the time values for both operands into minutes for calculation
-    total_minutes1 = hours1 * 60 + minutes1
-    total_minutes2 = hours2 * 60 + minutes2
-
-    difference_minutes = total_minutes2 - total_minutes1  # Calculate difference
-
-    # Return the calculated time difference as minutes
-    return difference_minutes
-
-
-def refresh_real_time_database(bus_id, bus_stops):
+def refresh_real_time_database(bus_id, bus_stops, trip_state, passenger_delta):
     """
     Function to update the firebase database with node=bus_id with real-time values.
 
     Passenger count at any instance is the sum of all elements in the crowd manager.
-    Available seats are calculated by subtracting passengers count from total seats.
+    The change in the passenger count is written as an atomic increment of the count
+    and a decrement of the available seats, so that no terminal reads them first.
     Load factor is calculated as the ratio of total passengers to the seat capacity.
 
     .. versionadded:: 1.2.0
-    ..versionupdated:: 1.3.0
+    ..versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus id of the selected bus
         [list] bus_stops: The list of bus stops in the selected route
+        [TripState] trip_state: State of the bus's current trip
+        [int] passenger_delta: Change in passengers aboard, due to the ticket
 
     Returns:
-        None -> Values are updated in the given bus's firebase real-time database
+        None -> Increments are staged in write buffer, & written in the next flush
 
     NOTE: At no instance can sum of the crowd manager be any value, other than zero.
 
     """
     # Encode the current location to it's assosciated key value
-    int_current_location = bus_stops.index(current_location) + 1
+    int_current_location = bus_stops.index(trip_state.current_location) + 1
 
     # Calculate the total number of passengers aboard the bus at the given instance
-    terminal.total_passengers = sum(terminal.crowd_manager[:int_current_location])
+    total_passengers = trip_state.passengers_aboard(int_current_location)
 
-    # Update the total passenger count in the firebase real-time database
-    firebase_database.update_passengers_count(bus_id, terminal.total_passengers)
-
-    terminal.available_seat_count = firebase_database.retrieve_available_seats(bus_id)
-    # Calculate available seats by subtracting passenger count from available seats
-    terminal.available_seat_count = (
-        terminal.available_seat_count - terminal.passenger_count
-    )
-
-    # Update the available seat count in the firebase real-time database
-    firebase_database.update_available_seats(bus_id, terminal.available_seat_count)
+    # Calculate available seats locally, instead of reading them back from database
+    trip_state.available_seat_count = trip_state.bus_max_capacity - total_passengers
 
     # Calculate the load factor at the given instace and update the load factor list
-    terminal.load_factor = terminal.total_passengers / terminal.BUS_MAX_CAPACITY
-    terminal.load_factor_list.append(terminal.load_factor)
+    trip_state.record_load_factor(total_passengers)
+
+    # Stage the change in both counts, to be added up with other tickets till flush
+    write_buffer.increment(bus_id, "passengers_count", passenger_delta)
+    write_buffer.increment(bus_id, "available_seats", -passenger_delta)
 
 
 def print_ticket(
@@ -281,6 +245,7 @@ def print_ticket(
     bus_id,
     bus_stops,
     is_subsidy,
+    trip_state,
 ):
     """
     Function to print ticket based on inputs from the user.
@@ -292,7 +257,7 @@ def print_ticket(
     Read more in the :ref:`Fare calculation`.
 
     .. versionadded:: 1.2.0
-    ..versionupdated:: 1.3.0
+    ..versionupdated:: 1.4.0
 
     Parameters:
         [int] user_starting_point: The onboarding location of the passenger
@@ -301,6 +266,7 @@ def print_ticket(
         [str] bus_id: Bus id of the selected bus
         [list] bus_stops: The list of bus stops in the selected route
         [bool] is_subsidy: Indicates whether user has an active subsidy
+        [TripState] trip_state: State of the bus's current trip
 
     Returns:
         [int] total_ticket_fare: The total bus fare, inclusive of all co-passengers
@@ -311,8 +277,6 @@ def print_ticket(
     NOTE: The upcoming update will include saving the printed tickets into a folder
 
     """
-    terminal.passenger_count = passenger_count  # Set passenger count
-
     # Check if passengers are offered any subsidy, if yes don't charge any fare
     if is_subsidy == True:
         total_ticket_fare = 0
@@ -330,36 +294,26 @@ def print_ticket(
         # Total fare is calculated by adding variable price to the fixed price
         total_ticket_fare = (
             FIXED_TICKET_PRICE + (variable_ticket_price_epochs * VARIABLE_TICKET_PRICE)
-        ) * terminal.passenger_count
-
-    # Update the total fare collections by calculating value of each ticket
-    terminal.collection = terminal.collection + total_ticket_fare
-
-    # Increment crowd manager to include passengers who onboarded at the stop
-    terminal.crowd_manager[user_starting_point - 1] += terminal.passenger_count
-    # Decrement crowd manager to remove passengers who deboarded at the stop
-    terminal.crowd_manager[user_destination - 1] -= terminal.passenger_count
-
-    # Update the total_tickets_printed to reflect total number of tickets printed
-    terminal.total_tickets_printed = terminal.total_tickets_printed + 1
+        ) * passenger_count
 
-    # Update the boarding tracker and the deboarding tracker with passenger count
-    terminal.boarding_tracker[user_starting_point - 1] += terminal.passenger_count
-    terminal.deboarding_tracker[user_destination - 1] += terminal.passenger_count
-
-    # Update the value of crowd manager each time new tickets are printed
-    terminal.passengers_per_trip = (
-        terminal.passengers_per_trip + terminal.passenger_count
-    )
+    # Hold the lock, so that the location can't change while the ticket is recorded
+    with trip_state.lock:
+        # Update the collections, crowd manager, & trackers, and count the change
+        passenger_delta = trip_state.record_ticket(
+            user_starting_point,
+            user_destination,
+            passenger_count,
+            total_ticket_fare,
+            bus_stops.index(trip_state.current_location) + 1,
+        )
 
     # Revise the firebase datbase to reflect real time values for the parameters
-    refresh_real_time_database(bus_id, bus_stops)
-    terminal.passenger_count = 0  # Refresh passenger_count's value in terminal
+    refresh_real_time_database(bus_id, bus_stops, trip_state, passenger_delta)
 
     return total_ticket_fare  # Return the payable ticket fare for the passenger
 
 
-def generate_dsr_report(bus_id, route_id):
+def generate_dsr_report(bus_id, route_id, trip_state):
     """
     Function to generate the daily status report for the current trip of the bus.
 
@@ -370,11 +324,12 @@ def generate_dsr_report(bus_id, route_id):
     Read more in the :ref:`CroMa Daily Status Report`.
 
     .. versionadded:: 1.2.0
-    ..versionupdated:: 1.3.0
+    ..versionupdated:: 1.4.0
 
     Parameters:
         [str] bus_id: Bus id of the elected bus
         [str] route_id: Route Id assigned to the bus
+        [TripState] trip_state: State of the bus's current trip
 
     Returns:
         None -> DSR Report is generated and saved within the reports subdirectory
@@ -392,7 +347,7 @@ def generate_dsr_report(bus_id, route_id):
 
     # Preprint the data frame table and enter the values corresponding to the headers
     dsr_report_pdf.create_table()
-    dsr_report_pdf.print_table_content()
+    dsr_report_pdf.print_table_content(trip_state)
 
     # Print the date and emboss the signature of the cluster manager/administrator
     dsr_report_pdf.print_signature_and_date()
@@ -422,15 +377,15 @@ if (
     and bus_id != "Select Bus Id"
 ):
     try:
-        # Initialize the app with a service account, granting admin privileges
-        cred = credentials.Certificate("hardware/adminsdk.json")
-        firebase_admin.initialize_app(
-            cred, {"databaseURL": "https://technoholic-407a3.firebaseio.com/"}
-        )
+        # Local stores of the bus state don't need the firebase app to be set up
+        if bus_state_store.bus_state_store.is_remote:
+            # Initialize the app with a service account, granting admin privileges
+            cred = credentials.Certificate("hardware/adminsdk.json")
+            firebase_admin.initialize_app(
+                cred, {"databaseURL": "https://technoholic-407a3.firebaseio.com/"}
+            )
 
-        # Initialize the database with default values to clear any inconsistency
-        firebase_database.initialize_database(bus_id, route_id)
-        # Increment counter to ensure the db isn't initialized again during trip
+        # Increment counter to ensure the app isn't initialized again in the process
         terminal.initialize_firebase_sdk_ticketing_machine = (
             terminal.initialize_firebase_sdk_ticketing_machine + 1
         )
@@ -442,16 +397,22 @@ if (
 if route_id != "Select Route Id" and bus_id != "Select Bus Id":
     # Fetch the list of bus stops in the selected route
     bus_stops = application_support_dictionary.all_routes[route_id]
+    # Fetch the state of the bus's trip, shared by all the sessions of this bus
+    trip_state = terminal.get_trip_state(bus_id, route_id, len(bus_stops))
+
+    # Start the trip once, so that the reruns don't make any round trip for it
+    with trip_state.lock:
+        if not trip_state.is_started:
+            # Start the trip with default values to clear any inconsistency in db
+            bus_snapshot = bus_state_store.bus_state_store.start_trip(
+                bus_id, route_id, reset_counters=True
+            )
 
-    # """ NEEDS TO CHECK IF UPDATION CAN BE AVOIDED AGAINST DB INITALIZATION """
-    # Initialize the firebase database with current route id and bus status
-    firebase_database.update_current_route_id(bus_id, route_id)
-    firebase_database.update_current_bus_status(bus_id, "Active")
-
-    # Update necessary attributes with values retrieved from firebase database
-    current_location = firebase_database.retrieve_current_location(bus_id)
-    available_seat_count = firebase_database.retrieve_available_seats(bus_id)
-    total_passengers = firebase_database.retrieve_passengers_count(bus_id)
+            # Update necessary attributes with values written to firebase database
+            trip_state.current_location = bus_snapshot.current_location
+            trip_state.available_seat_count = bus_snapshot.available_seats
+            trip_state.total_passengers = bus_snapshot.passengers_count
+            trip_state.is_started = True
 
     # Display title on the streamlit web application
     st.title(":oncoming_bus: Ticketing Machine Playground")
@@ -471,7 +432,7 @@ if route_id != "Select Route Id" and bus_id != "Select Bus Id":
         flag_bus_user_location_mismatch = False
 
     # Fetch numerical value corresponding to the current location
-    bus_current_location = bus_stops.index(current_location) + 1
+    bus_current_location = bus_stops.index(trip_state.current_location) + 1
     # Fetch numerical value corresponding to user's boarding point
     user_starting_point = bus_stops.index(starting_location) + 1
     # Fetch numerical value corresponding to user's dropping point
@@ -545,6 +506,7 @@ if route_id != "Select Route Id" and bus_id != "Select Bus Id":
             bus_id,
             bus_stops,
             subsidy_checkbox,
+            trip_state,
         )
 
         ticket_id = generate_ticket_id()  # Generate a unique ticket id
@@ -597,26 +559,51 @@ if route_id != "Select Route Id" and bus_id != "Select Bus Id":
         stops_in_route = application_support_dictionary.bus_timings.get(route_id)
         # Fetch pre-determined time to reach bus's last location from the origin
         expected_time_from_origin_to_reach_bus_last_loc = stops_in_route[
-            current_location
+            trip_state.current_location
         ]
 
         # Fetch the time of arrival of the bus at the last stop from firebase db
-        last_stop_arrival_time = firebase_database.retrieve_last_stop_arrival_time(
-            bus_id
+        last_stop_arrival_time = datetime.strptime(
+            bus_state_store.bus_state_store.retrieve_field(
+                bus_id, "last_stop_arrival_time"
+            ),
+            "%Y-%m-%d %H:%M:%S",
         )
 
-        current_location = new_location  # Set new location as current location
+        # Hold the lock, so that no ticket is recorded while the bus moves on
+        with trip_state.lock:
+            # Passengers aboard at the last location, before the bus moves on from it
+            passengers_aboard_before = trip_state.passengers_aboard(
+                bus_stops.index(trip_state.current_location) + 1
+            )
+
+            # Set new location as current location
+            trip_state.current_location = new_location
+
+            # Get number correponding to current location from the bus_stops dataframe
+            int_current_location = bus_stops.index(trip_state.current_location) + 1
+
+            # Calculate total passengers aboard the bus at the current location
+            trip_state.total_passengers = trip_state.passengers_aboard(
+                int_current_location
+            )
+            trip_state.available_seat_count = (
+                trip_state.bus_max_capacity - trip_state.total_passengers
+            )
+
+            # Passengers deboarding at new location are added back to available seats
+            passenger_delta = trip_state.total_passengers - passengers_aboard_before
+
         current_stop_arrival_time = datetime.now()  # Determine the current datetime
 
         # Calculate the time in mins to reach the next bus stop from last bus stop
-        mins_to_reach_new_location_from_last_location = calculate_time_difference(
-            current_stop_arrival_time.strftime("%H:%M"),
-            last_stop_arrival_time.strftime("%H:%M"),
+        mins_to_reach_new_location_from_last_location = service_time.minutes_between(
+            last_stop_arrival_time, current_stop_arrival_time
         )
 
         # Fetch pre-determined time to reach bus's current location from the origin
         expected_time_from_origin_to_reach_bus_current_loc = stops_in_route[
-            current_location
+            new_location
         ]
         # Calculate expected time in mins to reach current location from last stop
         expected_mins_to_reach_new_loc_from_last_loc = (
@@ -624,21 +611,30 @@ if route_id != "Select Route Id" and bus_id != "Select Bus Id":
             - expected_time_from_origin_to_reach_bus_last_loc
         )
 
-        # Calculate total delay in journey, negative delay indicates arrival before time
+        # Calculate delay on this leg, negative delay indicates arrival before time
         delay = (
             mins_to_reach_new_location_from_last_location
             - expected_mins_to_reach_new_loc_from_last_loc
-            + firebase_database.retrieve_bus_total_delay(bus_id)
         )
 
-        # Update the total delay and last stop arrival time in firebase database
-        firebase_database.update_bus_total_delay(bus_id, delay)
-        firebase_database.update_last_stop_arrival_time(
-            bus_id, current_stop_arrival_time
-        )
+        # Add the delay to the total delay on the server, without reading it first
+        write_buffer.increment(bus_id, "delay_in_mins", delay)
+
+        # Stage the change in the counts, together with the other tickets till flush
+        write_buffer.increment(bus_id, "passengers_count", passenger_delta)
+        write_buffer.increment(bus_id, "available_seats", -passenger_delta)
 
-        # Update the current location in the firebase real-time database
-        firebase_database.update_current_location(bus_id, new_location)
+        # Stage the new location & its arrival time, and write everything in 1 update
+        write_buffer.stage(
+            bus_id,
+            {
+                "current_location": new_location,
+                "last_stop_arrival_time": current_stop_arrival_time.strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                ),
+            },
+        )
+        write_buffer.flush()
 
         # Display success message indicating the current location has been upodated
         location_updated_alert = st.sidebar.success(
@@ -648,29 +644,6 @@ if route_id != "Select Route Id" and bus_id != "Select Bus Id":
         time.sleep(3)  # Wait for three seconds
         location_updated_alert.empty()  # Clear the location_updated_alert
 
-        # Retrive the current passenger count from the firebase real-time database
-        quondam_passenger_count = firebase_database.retrieve_passengers_count(bus_id)
-        # Get number correponding to current location from the bus_stops dataframe
-        int_current_location = bus_stops.index(current_location) + 1
-
-        # Calculate total passengers aboard the bus at the current location
-        total_passengers = sum(terminal.crowd_manager[:int_current_location])
-
-        firebase_database.update_passengers_count(
-            bus_id, total_passengers
-        )  # Update the passenger count in the database
-
-        # Retrieve the number of currently available seats from the database
-        available_seat_count = firebase_database.retrieve_available_seats(bus_id)
-
-        # Calculate available seat by subtracting passenger count from available seats
-        available_seat_count = (
-            available_seat_count + quondam_passenger_count - total_passengers
-        )
-
-        # Update the available seat count in the firebase real-time database
-        firebase_database.update_available_seats(bus_id, available_seat_count)
-
     st.sidebar.markdown("---", unsafe_allow_html=True)  # Display horizontal rule
 
     # Create an expander to preview the real-time databse values in the sidebar
@@ -686,36 +659,11 @@ if route_id != "Select Route Id" and bus_id != "Select Bus Id":
         # Display an info message indicating that the current trip has been terminated
         trip_terminated_alert = st.info("Current trip has been terminated", icon="ℹ️")
 
-        # Compute and update the overall load factor for the current trip
-        try:
-            terminal.load_factor = sum(terminal.load_factor_list) / len(
-                terminal.load_factor_list
-            )
-        except:
-            terminal.load_factor = 0  # Set load factor as 0 on ZeroDivisionException
-
-        # Inspect the boarding_tracker to find the stop with maximum onboards
-        if sum(terminal.boarding_tracker) == 0:
-            terminal.MAX_BOARDING_BUS_STOP = "Unavailable"  # Set as unavailable
-        else:
-            max_boarding = int(
-                terminal.boarding_tracker.index(max(terminal.boarding_tracker))
-            )
-            # Save the bus stop's name from where maximum passengers onbaorded
-            terminal.MAX_BOARDING_BUS_STOP = bus_stops[max_boarding]
-
-        # Inspect the deboarding_tracker to find the stop with maximum deboards
-        if sum(terminal.deboarding_tracker) == 0:
-            terminal.MAX_DEBOARDING_BUS_STOP = "Unavailable"  # Set as unavailable
-        else:
-            max_deboarding = int(
-                terminal.deboarding_tracker.index(max(terminal.deboarding_tracker))
-            )
-            # Save the bus stop's name where maximum number of passengers debaorded
-            terminal.MAX_DEBOARDING_BUS_STOP = bus_stops[max_deboarding]
+        # Compute the overall load factor, and the stops with max onboards & deboards
+        trip_state.summarize_trip(bus_stops)
 
         # Generate the Daily Status Report (DSR) and displays a success alert
-        generate_dsr_report(bus_id, route_id)
+        generate_dsr_report(bus_id, route_id, trip_state)
         trip_terminated_alert.empty()  # Clear the trip_terminated_alert
 
         # Display an alert when the DSR report is generated
@@ -735,43 +683,44 @@ if route_id != "Select Route Id" and bus_id != "Select Bus Id":
         time.sleep(3)  # Wait for three seconds
         dsr_mail_sent_alert.empty()  # Clear the dsr_mail_sent_alert
 
-        firebase_database.refresh_database(
-            bus_id
-        )  # Refresh the database with the default values
+        # Write the counts still staged, so that they don't overwrite the defaults
+        write_buffer.flush()
 
-        terminal.collection = terminal.load_factor = 0  # Reset colection & load_factor
+        # Refresh the database with the default values, and fetch the reset node
+        bus_snapshot = bus_state_store.bus_state_store.end_trip(bus_id)
 
-        # Reset crowd manager, boarding tracker and deboarding tracker to defaults
-        terminal.crowd_manager = (
-            terminal.boarding_tracker
-        ) = terminal.deboarding_tracker = [0] * 20
+        # Reset collection, load factor, crowd manager, and the trackers to defaults
+        trip_state.reset()
 
-        # Retrive the default current location from the firebase real-time database
-        current_location = firebase_database.retrieve_current_location(bus_id)
-        # Retrive the default available seat count from the firebase real-time database
-        available_seat_count = firebase_database.retrieve_available_seats(bus_id)
-        # Retrive the default total passenger from the firebase real-time database
-        total_passengers = firebase_database.retrieve_passengers_count(bus_id)
+        # Update necessary attributes with the default values written to firebase
+        trip_state.current_location = bus_snapshot.current_location
+        trip_state.available_seat_count = bus_snapshot.available_seats
+        trip_state.total_passengers = bus_snapshot.passengers_count
 
-        terminal.initialize_firebase_sdk_ticketing_machine = (
-            2  # Set the count value to any value higher than 1
-        )
+        # Start a new trip of the bus, when the script runs the next time
+        trip_state.is_started = False
 
     # Display the total number of passengers at that instance in the expander
     expander.markdown(
-        "**:male-office-worker: Passenger Count:**" + " " + str(total_passengers)
+        "**:male-office-worker: Passenger Count:**"
+        + " "
+        + str(trip_state.total_passengers)
     )
 
     # Display the bus's current location at the given instance in the expander
-    expander.markdown("**:world_map: Current Location:**" + " " + str(current_location))
+    expander.markdown(
+        "**:world_map: Current Location:**" + " " + str(trip_state.current_location)
+    )
 
     # Display the total collection at the given instance in the expander
     expander.markdown(
-        "**:moneybag: Total Collections:** Rs." + " " + str(terminal.collection)
+        "**:moneybag: Total Collections:** Rs." + " " + str(trip_state.collection)
     )
 
     # Display the available seat count at the given instance in the expander
-    expander.markdown("**:seat: Seats Available:**" + " " + str(available_seat_count))
+    expander.markdown(
+        "**:seat: Seats Available:**" + " " + str(trip_state.available_seat_count)
+    )
 
     # Display the selected route of the bus in the expander
     expander.markdown(
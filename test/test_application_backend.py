@@ -0,0 +1,214 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the concurrent bus search of the app backend.
+
+Included Functions:
+    [1] bus_stops (supporting function)
+    [2] search_buses (supporting function)
+    [3] test_concurrent_search_respects_max_workers
+    [4] test_concurrent_search_leaves_out_slow_buses
+    [5] test_concurrent_search_is_bounded_when_all_workers_hang
+    [6] test_concurrent_search_skips_failed_reads
+    [7] test_concurrent_search_keeps_support_dictionary_order
+
+.. versionadded:: 1.4.0
+"""
+
+import threading
+import time
+
+import pytest  # pylint: disable=import-error
+
+from application import application_backend
+from application import application_support_dictionary
+from application.application_backend import BackendService
+
+# Buses listed as passing through the boarding point of the searches
+BUS_IDS = ["KL-01-AA-" + str(1000 + bus) for bus in range(12)]
+
+
+@pytest.fixture
+def bus_stops(monkeypatch):
+    """
+    Supporting function to list the buses through the boarding point of the search.
+
+    Every bus whose node could be read is taken to serve the trip, so the results
+    depend only on the reads made by the search.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        None
+    """
+    monkeypatch.setattr(
+        application_support_dictionary, "all_bus_stops", {"Thampanoor": BUS_IDS}
+    )
+    monkeypatch.setattr(
+        BackendService,
+        "is_bus_serving_user_trip",
+        lambda bus_snapshot, boarding_point, dropping_point: bus_snapshot is not None,
+    )
+
+
+def search_buses(**kwargs):
+    """
+    Supporting function to run the concurrent bus search, from Thampanoor to Pattom.
+
+    .. versionadded:: 1.4.0
+    """
+    return BackendService.fetch_buses_to_user_destination_from_user_origin_concurrently(
+        "Thampanoor", "Pattom", **kwargs
+    )
+
+
+def test_concurrent_search_respects_max_workers(
+    bus_stops, monkeypatch  # pylint: disable=redefined-outer-name, unused-argument
+):
+    """
+    Test if no more bus nodes are read at the same time, than the workers allowed.
+
+    .. versionadded:: 1.4.0
+    """
+    lock = threading.Lock()
+    reads = {"running": 0, "peak": 0}
+
+    def retrieve_bus_snapshot(bus_id):
+        with lock:
+            reads["running"] = reads["running"] + 1
+            reads["peak"] = max(reads["peak"], reads["running"])
+
+        time.sleep(0.02)
+
+        with lock:
+            reads["running"] = reads["running"] - 1
+        return bus_id
+
+    monkeypatch.setattr(
+        application_backend, "retrieve_bus_snapshot", retrieve_bus_snapshot
+    )
+
+    assert list(search_buses(max_workers=3)) == BUS_IDS
+    assert reads["peak"] == 3
+
+
+def test_concurrent_search_leaves_out_slow_buses(
+    bus_stops, monkeypatch  # pylint: disable=redefined-outer-name, unused-argument
+):
+    """
+    Test if a bus slower than the timeout is left out, without stalling the others.
+
+    .. versionadded:: 1.4.0
+    """
+    released = threading.Event()
+
+    def retrieve_bus_snapshot(bus_id):
+        if bus_id == BUS_IDS[0]:
+            released.wait(5.0)  # Node of the first bus is stuck, until the test ends
+        return bus_id
+
+    monkeypatch.setattr(
+        application_backend, "retrieve_bus_snapshot", retrieve_bus_snapshot
+    )
+
+    try:
+        start_time = time.monotonic()
+        available_buses = search_buses(max_workers=4, timeout_per_bus=0.2)
+        elapsed_time = time.monotonic() - start_time
+    finally:
+        released.set()
+
+    assert list(available_buses) == BUS_IDS[1:]
+    assert elapsed_time < 1.0
+
+
+def test_concurrent_search_is_bounded_when_all_workers_hang(
+    bus_stops, monkeypatch  # pylint: disable=redefined-outer-name, unused-argument
+):
+    """
+    Test if reads queued behind hung ones are dropped, once the search runs too long.
+
+    .. versionadded:: 1.4.0
+    """
+    released = threading.Event()
+
+    def retrieve_bus_snapshot(bus_id):
+        if bus_id in BUS_IDS[:2]:
+            released.wait(5.0)  # Nodes of the first two buses hold both the workers
+        return bus_id
+
+    monkeypatch.setattr(
+        application_backend, "retrieve_bus_snapshot", retrieve_bus_snapshot
+    )
+
+    try:
+        start_time = time.monotonic()
+        available_buses = search_buses(max_workers=2, timeout_per_bus=0.05)
+        elapsed_time = time.monotonic() - start_time
+    finally:
+        released.set()
+
+    # Search is bounded by the timeout of the reads, six times over for 12 buses
+    assert BUS_IDS[0] not in available_buses and BUS_IDS[1] not in available_buses
+    assert elapsed_time < 1.0
+
+
+def test_concurrent_search_skips_failed_reads(
+    bus_stops, monkeypatch  # pylint: disable=redefined-outer-name, unused-argument
+):
+    """
+    Test if a bus whose node can't be read is skipped, & the others are returned.
+
+    .. versionadded:: 1.4.0
+    """
+
+    def retrieve_bus_snapshot(bus_id):
+        if bus_id in (BUS_IDS[3], BUS_IDS[7]):
+            raise ConnectionError("Bus node could not be read")
+        return bus_id
+
+    monkeypatch.setattr(
+        application_backend, "retrieve_bus_snapshot", retrieve_bus_snapshot
+    )
+
+    assert list(search_buses()) == [
+        bus_id for bus_id in BUS_IDS if bus_id not in (BUS_IDS[3], BUS_IDS[7])
+    ]
+
+
+def test_concurrent_search_keeps_support_dictionary_order(
+    bus_stops, monkeypatch  # pylint: disable=redefined-outer-name, unused-argument
+):
+    """
+    Test if the snapshots are returned in the listed order, whatever order reads end.
+
+    .. versionadded:: 1.4.0
+    """
+
+    def retrieve_bus_snapshot(bus_id):
+        # Buses listed later are read faster, so the reads end in reverse order
+        time.sleep(0.005 * (len(BUS_IDS) - BUS_IDS.index(bus_id)))
+        return "Snapshot of " + bus_id
+
+    monkeypatch.setattr(
+        application_backend, "retrieve_bus_snapshot", retrieve_bus_snapshot
+    )
+
+    bus_snapshots = search_buses(max_workers=len(BUS_IDS))
+    assert list(bus_snapshots) == BUS_IDS
+    assert list(bus_snapshots.values()) == [
+        "Snapshot of " + bus_id for bus_id in BUS_IDS
+    ]
@@ -0,0 +1,210 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the tests for the stores holding the real-time bus state.
+Each test is run on every store, so that they are checked to behave identically.
+
+Included Functions:
+    [1] store
+    [2] test_start_trip_resets_and_resumes_counters
+    [3] test_write_changes_sets_fields_and_increments_counters
+    [4] test_concurrent_increments_are_not_lost
+    [5] test_filtered_reads_return_only_matching_buses
+    [6] test_filtered_reads_of_a_large_fleet
+    [7] test_end_trips_resets_the_fleet
+    [8] test_create_bus_state_store_reads_configuration
+
+.. versionadded:: 1.4.0
+"""
+
+import threading
+
+import pytest  # pylint: disable=import-error
+
+from database import bus_state_store
+from database import firebase_database
+from database.firebase_conditional_reader import conditional_reader
+from database.inmemory_database import InMemoryDatabase
+
+
+@pytest.fixture(params=["firebase", "memory", "sqlite"])
+def store(request, monkeypatch, tmp_path):
+    """
+    Supporting function to create an empty store, of each of the supported kinds.
+
+    .. versionadded:: 1.4.0
+    """
+    if request.param == "firebase":
+        monkeypatch.setattr(firebase_database, "db", InMemoryDatabase(seed=42))
+        conditional_reader.invalidate()
+        yield bus_state_store.FirebaseBusStateStore()
+
+    elif request.param == "memory":
+        yield bus_state_store.InMemoryBusStateStore()
+
+    else:
+        sqlite_store = bus_state_store.SQLiteBusStateStore(str(tmp_path / "bus.db"))
+        yield sqlite_store
+        sqlite_store.connection_pool.close()
+
+
+def test_start_trip_resets_and_resumes_counters(
+    store,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the counters are kept on the same route, and reset on a new route.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshot = store.start_trip("KL13N", "Route01", reset_counters=True)
+    assert bus_snapshot.current_bus_status == "Active"
+    assert bus_snapshot.available_seats == 32
+
+    store.increment_counters("KL13N", {"passengers_count": 3, "available_seats": -3})
+    store.update_fields("KL13N", {"current_bus_status": "Inactive"})
+
+    bus_snapshot = store.start_trip("KL13N", "Route01")
+    assert bus_snapshot.current_bus_status == "Active"
+    assert bus_snapshot.passengers_count == 3
+    assert bus_snapshot.available_seats == 29
+    assert bus_snapshot == store.retrieve_bus_snapshot("KL13N")
+
+    bus_snapshot = store.start_trip("KL13N", "Route02")
+    assert bus_snapshot.current_route_id == "Route02"
+    assert bus_snapshot.passengers_count == 0
+
+
+def test_write_changes_sets_fields_and_increments_counters(
+    store,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the field values & the counter deltas of several buses are all written.
+
+    .. versionadded:: 1.4.0
+    """
+    store.start_trip("KL13N", "Route01", reset_counters=True)
+    store.start_trip("KL14S", "Route02", reset_counters=True)
+
+    store.write_changes(
+        {"KL13N": {"current_location": "Kochi"}},
+        {"KL13N": {"passengers_count": 2}, "KL14S": {"delay_in_mins": 5}},
+    )
+
+    assert store.retrieve_field("KL13N", "current_location") == "Kochi"
+    assert store.retrieve_field("KL13N", "passengers_count") == 2
+    assert store.retrieve_field("KL14S", "delay_in_mins") == 5
+    assert store.retrieve_field("KL99X", "delay_in_mins") is None
+    assert store.retrieve_bus_ids() == ["KL13N", "KL14S"]
+
+
+def test_concurrent_increments_are_not_lost(
+    store,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if increments written by many threads at once are all added up.
+
+    .. versionadded:: 1.4.0
+    """
+    store.start_trip("KL13N", "Route01", reset_counters=True)
+
+    def print_tickets():
+        for _ in range(10):
+            store.increment_counters("KL13N", {"passengers_count": 1})
+
+    threads = [threading.Thread(target=print_tickets) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.retrieve_field("KL13N", "passengers_count") == 80
+
+
+def test_filtered_reads_return_only_matching_buses(
+    store,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the active buses & the buses with seats are picked from the fleet.
+
+    .. versionadded:: 1.4.0
+    """
+    store.start_trip("KL13N", "Route01", reset_counters=True)
+    store.start_trip("KL14S", "Route02", reset_counters=True)
+    store.end_trip("KL15E")
+    store.update_fields("KL14S", {"available_seats": 0})
+
+    assert set(store.retrieve_active_bus_snapshots()) == {"KL13N", "KL14S"}
+    assert set(store.retrieve_active_bus_snapshots(["KL14S"])) == {"KL14S"}
+    assert set(store.retrieve_bus_snapshots_with_seats()) == {"KL13N", "KL15E"}
+    assert set(store.retrieve_bus_snapshots(["KL13N", "KL99X"])) == {"KL13N"}
+
+
+def test_filtered_reads_of_a_large_fleet(
+    store,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if reads of more buses than are bound into one query return all of them.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_ids = ["KL" + str(bus).zfill(4) for bus in range(1200)]
+    store.end_trips(bus_ids)
+    store.write_changes(
+        {bus_id: {"current_bus_status": "Active"} for bus_id in bus_ids[::3]}
+    )
+
+    assert len(store.retrieve_bus_nodes(bus_ids + ["KL9999"])) == 1200
+    assert set(store.retrieve_active_bus_snapshots(bus_ids[:1100])) == set(
+        bus_ids[:1100:3]
+    )
+    assert len(store.retrieve_bus_snapshots_with_seats(bus_ids[100:])) == 1100
+
+
+def test_end_trips_resets_the_fleet(
+    store,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if ending the trips marks the buses inactive, with the default values.
+
+    .. versionadded:: 1.4.0
+    """
+    store.start_trip("KL13N", "Route01", reset_counters=True)
+    store.increment_counters("KL13N", {"passengers_count": 4})
+
+    bus_snapshots = store.end_trips(["KL13N", "KL14S"])
+
+    assert set(bus_snapshots) == {"KL13N", "KL14S"}
+    assert store.retrieve_bus_snapshot("KL13N") == bus_snapshots["KL13N"]
+    assert bus_snapshots["KL13N"].current_bus_status == "Inactive"
+    assert bus_snapshots["KL13N"].passengers_count == 0
+
+
+def test_create_bus_state_store_reads_configuration(monkeypatch, tmp_path):
+    """
+    Test if the store named by the environment is created, & unknown names fail.
+
+    .. versionadded:: 1.4.0
+    """
+    monkeypatch.setenv(bus_state_store.BUS_STATE_STORE_ENV, "sqlite")
+    monkeypatch.setenv(
+        bus_state_store.BUS_STATE_SQLITE_PATH_ENV, str(tmp_path / "b.db")
+    )
+
+    assert isinstance(
+        bus_state_store.create_bus_state_store(), bus_state_store.SQLiteBusStateStore
+    )
+    assert bus_state_store.create_bus_state_store("memory").name == "memory"
+
+    with pytest.raises(ValueError):
+        bus_state_store.create_bus_state_store("cassandra")
@@ -0,0 +1,218 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the in-process caches used with the databases.
+
+Included Functions:
+    [1] test_ttl_cache_expiry
+    [2] test_ttl_cache_evicts_least_recently_used
+    [3] test_ttl_cache_skips_values_read_before_clear
+    [4] test_single_flight_shares_concurrent_calls
+    [5] test_single_flight_shares_errors
+    [6] test_stale_values_are_served_while_refreshing
+    [7] test_values_beyond_max_stale_age_are_reloaded
+
+.. versionadded:: 1.4.0
+"""
+
+import threading
+
+import pytest  # pylint: disable=import-error
+
+from database.database_cache import SingleFlight, StaleWhileRevalidateCache, TTLCache
+
+
+def test_ttl_cache_expiry():
+    """
+    Test if cached values expire after the time-to-live, counting hits & misses.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [100.0]
+    cache = TTLCache(maxsize=4, ttl=10.0, timer=lambda: current_time[0])
+
+    cache.set("KL13N", ("KSRTC", "City Fast Non-AC Bus"))
+    assert cache.get("KL13N") == ("KSRTC", "City Fast Non-AC Bus")
+
+    current_time[0] = 110.0
+    assert cache.get("KL13N", "expired") == "expired"
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 0}
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """
+    Test if the least recently used value is evicted once the cache is full.
+
+    .. versionadded:: 1.4.0
+    """
+    cache = TTLCache(maxsize=2, ttl=60.0)
+
+    cache.set("KL13N", 1)
+    cache.set("KL08B", 2)
+    cache.get("KL13N")  # KL08B is now the least recently used value
+    cache.set("KL17Q", 3)
+
+    assert cache.get("KL08B") is None
+    assert cache.get("KL13N") == 1
+    assert len(cache) == 2
+
+    cache.invalidate("KL13N")
+    assert cache.get("KL13N") is None
+
+
+def test_ttl_cache_skips_values_read_before_clear():
+    """
+    Test if values of a cleared generation are skipped, & entries may expire sooner.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [100.0]
+    cache = TTLCache(ttl=60.0, timer=lambda: current_time[0])
+
+    generation = cache.generation
+    cache.clear()  # Tables are changed while the value is being read
+    cache.set("KL17Q", None, generation=generation)
+    assert cache.get("KL17Q", "missing") == "missing"
+
+    cache.set("KL17Q", None, ttl=5.0, generation=cache.generation)
+    assert cache.get("KL17Q", "missing") is None
+
+    current_time[0] = 105.0
+    assert cache.get("KL17Q", "missing") == "missing"
+
+
+def test_single_flight_shares_concurrent_calls():
+    """
+    Test if callers arriving during an in-flight call receive its result.
+
+    .. versionadded:: 1.4.0
+    """
+    single_flight = SingleFlight()
+    release_call = threading.Event()
+    database_reads = []
+
+    def read_current_location(bus_id):
+        database_reads.append(bus_id)
+        release_call.wait()
+        return "Kollam"
+
+    results = []
+    sessions = [
+        threading.Thread(
+            target=lambda: results.append(
+                single_flight.do("KL13N", read_current_location, "KL13N")
+            )
+        )
+        for _ in range(8)
+    ]
+    for session in sessions:
+        session.start()
+
+    # Release the call only once all the sessions are waiting on it
+    while single_flight.stats()["shared_calls"] < 7:
+        threading.Event().wait(0.001)
+    release_call.set()
+
+    for session in sessions:
+        session.join()
+
+    assert results == ["Kollam"] * 8
+    assert database_reads == ["KL13N"]
+    assert single_flight.stats() == {"calls": 1, "shared_calls": 7}
+
+    # Calls made after the shared call completes, read the database again
+    assert single_flight.do("KL13N", read_current_location, "KL13N") == "Kollam"
+    assert len(database_reads) == 2
+
+
+def test_single_flight_shares_errors():
+    """
+    Test if the exception of a failed call is raised, and the key is released.
+
+    .. versionadded:: 1.4.0
+    """
+    single_flight = SingleFlight()
+
+    def read_unreachable_database():
+        raise ConnectionError("database is unreachable")
+
+    with pytest.raises(ConnectionError):
+        single_flight.do("KL13N", read_unreachable_database)
+
+    assert single_flight.do("KL13N", lambda: "Kollam") == "Kollam"
+
+
+def test_stale_values_are_served_while_refreshing():
+    """
+    Test if a stale value is returned right away, and refreshed in the background.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [100.0]
+    current_locations = iter(["Thampanoor", "Kollam"])
+    refresh_started = threading.Event()
+    release_refresh = threading.Event()
+
+    def load_bus_field(bus_id, field):  # pylint: disable=unused-argument
+        if current_time[0] > 100.0:
+            refresh_started.set()
+            release_refresh.wait()
+        return next(current_locations)
+
+    cache = StaleWhileRevalidateCache(
+        load_bus_field,
+        freshness_budgets={"current_location": 10.0},
+        timer=lambda: current_time[0],
+    )
+
+    assert cache.get(("KL13N", "current_location")) == "Thampanoor"
+    current_time[0] = 105.0
+    assert cache.get(("KL13N", "current_location")) == "Thampanoor"
+    assert cache.age(("KL13N", "current_location")) == 5.0
+
+    # Budget of the field is exhausted, so the stale value is served & refreshed
+    current_time[0] = 115.0
+    assert cache.get(("KL13N", "current_location")) == "Thampanoor"
+    assert cache.get(("KL13N", "current_location")) == "Thampanoor"
+    assert refresh_started.wait(1.0)
+
+    release_refresh.set()
+    while cache.age(("KL13N", "current_location")) != 0.0:
+        threading.Event().wait(0.001)
+
+    assert cache.get(("KL13N", "current_location")) == "Kollam"
+    assert cache.stats() == {"fresh_hits": 2, "stale_hits": 2, "misses": 1, "size": 1}
+
+
+def test_values_beyond_max_stale_age_are_reloaded():
+    """
+    Test if a value older than the maximum stale age waits for the loader.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [100.0]
+    loaded_values = iter([300, 315])
+
+    cache = StaleWhileRevalidateCache(
+        lambda bus_id, field: next(loaded_values),
+        default_budget=1.0,
+        max_stale_age=60.0,
+        timer=lambda: current_time[0],
+    )
+
+    assert cache.get(("KL13N", "delay_in_mins")) == 300
+
+    current_time[0] = 200.0
+    assert cache.get(("KL13N", "delay_in_mins")) == 315
+    assert cache.stats()["misses"] == 2
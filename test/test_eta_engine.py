@@ -0,0 +1,215 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the tests for the ETA engine used to time the search results.
+
+Included Functions:
+    [1] eta_engine (supporting function)
+    [2] bus_snapshot (supporting function)
+    [3] test_route_offset
+    [4] test_estimate_arrivals
+    [5] test_estimate_arrivals_past_midnight
+    [6] test_estimate_arrivals_skips_unscheduled_buses
+    [7] test_route_timetable
+    [8] test_route_timetable_is_memoized
+
+.. versionadded:: 1.4.0
+"""
+
+import datetime
+
+import pytest  # pylint: disable=import-error
+
+from application.application_eta_engine import ArrivalEstimate, EtaEngine
+from application.application_route_index import RouteIndex
+from database.firebase_database import BusSnapshot
+from hardware import service_time
+
+
+@pytest.fixture
+def eta_engine():
+    """
+    Supporting function to build an ETA engine over a small network of routes.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        eta_engine (EtaEngine)
+    """
+    all_routes = {
+        "RouteA": ["S1", "S2", "S3", "S4", "S5", "S6"],
+        "RouteB": ["S6", "S5", "S4", "S3"],
+    }
+    bus_timings = {
+        "RouteA": {"S1": 0, "S2": 5, "S3": 9, "S4": 14, "S5": 20, "S6": 26},
+        "RouteB": {"S6": 0, "S5": 4, "S4": 10},
+    }
+
+    return EtaEngine(RouteIndex(all_routes, bus_timings))
+
+
+def bus_snapshot(bus_id, route_id, current_location, delay, last_stop_arrival_time):
+    """
+    Supporting function to create the snapshot of an active bus on a route.
+
+    .. versionadded:: 1.4.0
+    """
+    return BusSnapshot(
+        bus_id=bus_id,
+        available_seats=30,
+        current_location=current_location,
+        passengers_count=2,
+        current_bus_status="Active",
+        current_route_id=route_id,
+        delay_in_mins=delay,
+        last_stop_arrival_time=last_stop_arrival_time,
+    )
+
+
+def test_route_offset(
+    eta_engine,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the scheduled seconds from the origin are held for each route's stop.
+
+    .. versionadded:: 1.4.0
+    """
+    assert eta_engine.route_offset("RouteA", "S4") == 14 * 60
+    assert eta_engine.route_offset("RouteB", "S5") == 4 * 60
+    assert eta_engine.route_offset("RouteB", "S3") is None
+    assert eta_engine.route_offset("RouteC", "S1") is None
+
+
+def test_estimate_arrivals(
+    eta_engine,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the arrivals of many buses are estimated with their individual delays.
+
+    .. versionadded:: 1.4.0
+    """
+    now = datetime.datetime(2024, 1, 15, 10, 0)
+    bus_snapshots = {
+        "KL13N": bus_snapshot("KL13N", "RouteA", "S1", 0, now),
+        "KL14S": bus_snapshot(
+            "KL14S", "RouteA", "S2", 3, now - datetime.timedelta(minutes=2)
+        ),
+    }
+
+    arrival_estimates = eta_engine.estimate_arrivals(
+        bus_snapshots, "S3", "S5", now=now
+    )
+
+    now_seconds = service_time.to_service_seconds(now)
+    assert arrival_estimates["KL13N"] == ArrivalEstimate(now_seconds + 20 * 60, 9)
+    assert arrival_estimates["KL14S"] == ArrivalEstimate(
+        now_seconds + (15 + 3) * 60, 4 - 2 + 3
+    )
+
+
+def test_estimate_arrivals_past_midnight(
+    eta_engine,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the time since the last stop is right, when the service day rolls over.
+
+    .. versionadded:: 1.4.0
+    """
+    now = datetime.datetime(2024, 1, 16, 0, 3)
+    last_stop_arrival_time = datetime.datetime(2024, 1, 15, 23, 58)
+    bus_snapshots = {
+        "KL13N": bus_snapshot("KL13N", "RouteA", "S1", 0, last_stop_arrival_time)
+    }
+
+    arrival_estimates = eta_engine.estimate_arrivals(
+        bus_snapshots, "S3", "S6", now=now
+    )
+
+    assert arrival_estimates["KL13N"].minutes_to_reach_boarding_point == 9 - 5
+    assert service_time.format_clock(
+        arrival_estimates["KL13N"].arrival_time_at_dropping_point
+    ) == "00:29"
+
+
+def test_estimate_arrivals_skips_unscheduled_buses(
+    eta_engine,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the buses whose stops have no scheduled times are left out.
+
+    .. versionadded:: 1.4.0
+    """
+    now = datetime.datetime(2024, 1, 15, 10, 0)
+    bus_snapshots = {
+        "KL13N": bus_snapshot("KL13N", "RouteB", "S6", 0, now),
+        "KL14S": bus_snapshot("KL14S", "RouteC", "S6", 0, now),
+    }
+
+    assert eta_engine.estimate_arrivals(bus_snapshots, "S5", "S3") == {}
+    assert set(eta_engine.estimate_arrivals(bus_snapshots, "S5", "S4")) == {"KL13N"}
+
+
+def test_route_timetable(
+    eta_engine,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the scheduled & expected arrivals are given for every stop of a route.
+
+    .. versionadded:: 1.4.0
+    """
+    route_guide = eta_engine.route_timetable(
+        "RouteA", "S3", datetime.datetime(2024, 1, 15, 23, 50), 5
+    )
+
+    assert [route_guide_stop.bus_stop for route_guide_stop in route_guide] == [
+        "S1",
+        "S2",
+        "S3",
+        "S4",
+        "S5",
+        "S6",
+    ]
+    assert route_guide[0] == ("S1", "23:36", None)
+    assert route_guide[2] == ("S3", "23:45", "23:50")
+    assert route_guide[5] == ("S6", "00:02", "00:07")
+
+    last_stop_arrival_time = datetime.datetime(2024, 1, 15, 10, 0)
+    assert eta_engine.route_timetable("RouteB", "S3", last_stop_arrival_time, 0) is None
+    assert eta_engine.route_timetable("RouteB", "S5", last_stop_arrival_time, 0)[
+        3
+    ] == ("S3", None, None)
+
+
+def test_route_timetable_is_memoized(
+    eta_engine,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the timetable is computed again, only when the bus reports new values.
+
+    .. versionadded:: 1.4.0
+    """
+    last_stop_arrival_time = datetime.datetime(2024, 1, 15, 10, 0)
+
+    route_guide = eta_engine.route_timetable("RouteA", "S2", last_stop_arrival_time, 0)
+    assert (
+        eta_engine.route_timetable("RouteA", "S2", last_stop_arrival_time, 0)
+        is route_guide
+    )
+
+    eta_engine.route_timetable("RouteA", "S2", last_stop_arrival_time, 3)
+    assert eta_engine.route_timetables.hits == 1
+    assert eta_engine.route_timetables.misses == 2
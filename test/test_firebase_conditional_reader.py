@@ -0,0 +1,101 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the conditional reader of the firebase database.
+
+Included Functions:
+    [1] inmemory_database
+    [2] test_unchanged_node_is_not_downloaded_again
+    [3] test_changed_node_is_downloaded_again
+    [4] test_bus_ids_are_listed_with_shallow_read
+
+.. versionadded:: 1.4.0
+"""
+
+import pytest  # pylint: disable=import-error
+
+from database import firebase_database
+from database.firebase_conditional_reader import ConditionalReader
+from database.inmemory_database import InMemoryDatabase
+
+
+@pytest.fixture
+def inmemory_database(monkeypatch):
+    """
+    Supporting function to read the bus nodes from a seeded in-memory database.
+
+    .. versionadded:: 1.4.0
+    """
+    database = InMemoryDatabase(seed=42)
+    monkeypatch.setattr(firebase_database, "db", database)
+
+    firebase_database.start_trip("KL13N", "Route01", reset_counters=True)
+    firebase_database.start_trip("KL08B", "Route02", reset_counters=True)
+    database.reference("users").set({"admin": True})
+    return database
+
+
+def test_unchanged_node_is_not_downloaded_again(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if repeated reads of an unchanged node are served without its payload.
+
+    .. versionadded:: 1.4.0
+    """
+    conditional_reader = ConditionalReader()
+
+    first_snapshot = conditional_reader.retrieve_bus_snapshot("KL13N")
+    second_snapshot = conditional_reader.retrieve_bus_snapshot("KL13N")
+    third_snapshot = conditional_reader.retrieve_bus_snapshot("KL13N")
+
+    assert first_snapshot == second_snapshot == third_snapshot
+    assert inmemory_database.round_trips["get"] == 1
+    assert inmemory_database.round_trips["get_if_changed"] == 2
+
+    stats = conditional_reader.stats()
+    assert stats["full_reads"] == 1
+    assert stats["not_modified_reads"] == 2
+    assert stats["bytes_saved"] == 2 * stats["bytes_downloaded"] > 0
+
+
+def test_changed_node_is_downloaded_again(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if a node is downloaded again, once any of its children has changed.
+
+    .. versionadded:: 1.4.0
+    """
+    conditional_reader = ConditionalReader()
+    conditional_reader.retrieve_bus_snapshot("KL13N")
+
+    firebase_database.update_current_location("KL13N", "Kollam")
+
+    assert conditional_reader.retrieve_bus_snapshot("KL13N").current_location == (
+        "Kollam"
+    )
+    assert conditional_reader.stats()["full_reads"] == 2
+    assert conditional_reader.stats()["bytes_saved"] == 0
+
+
+def test_bus_ids_are_listed_with_shallow_read(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the Bus Ids are listed from the keys of the root, skipping other nodes.
+
+    .. versionadded:: 1.4.0
+    """
+    assert firebase_database.retrieve_bus_ids() == ["KL08B", "KL13N"]
+    assert inmemory_database.round_trip_count() == 4
@@ -0,0 +1,224 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the trip lifecycle of the firebase database.
+
+Included Functions:
+    [1] inmemory_database
+    [2] test_start_trip_resets_node_in_one_round_trip
+    [3] test_start_trip_resumes_ongoing_trip
+    [4] test_end_trips_resets_fleet_in_one_round_trip
+    [5] test_indexed_queries_return_only_matching_buses
+    [6] test_parse_bus_snapshot
+    [7] test_parse_bus_snapshot_with_missing_fields
+    [8] test_retrieve_bus_snapshots_skips_missing_buses
+
+.. versionadded:: 1.4.0
+"""
+
+from datetime import datetime
+import pytest  # pylint: disable=import-error
+
+from database import firebase_database
+from database.inmemory_database import InMemoryDatabase
+
+
+@pytest.fixture
+def inmemory_database(monkeypatch):
+    """
+    Supporting function to run the trip lifecycle on an empty in-memory database.
+
+    .. versionadded:: 1.4.0
+    """
+    database = InMemoryDatabase(seed=42)
+    monkeypatch.setattr(firebase_database, "db", database)
+    return database
+
+
+def test_start_trip_resets_node_in_one_round_trip(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if a fresh trip writes the default node in one update, & returns the node.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshot = firebase_database.start_trip("KL13N", "Route01", reset_counters=True)
+
+    assert inmemory_database.round_trip_count() == 1
+    assert bus_snapshot.current_bus_status == "Active"
+    assert bus_snapshot.current_route_id == "Route01"
+    assert bus_snapshot == firebase_database.retrieve_bus_snapshot("KL13N")
+
+
+def test_start_trip_resumes_ongoing_trip(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the counters are kept on the same route, and reset on a new route.
+
+    .. versionadded:: 1.4.0
+    """
+    firebase_database.start_trip("KL13N", "Route01", reset_counters=True)
+    firebase_database.increment_bus_counters(
+        "KL13N", {"passengers_count": 3, "available_seats": -3}
+    )
+    firebase_database.update_current_bus_status("KL13N", "Inactive")
+
+    round_trips = inmemory_database.round_trip_count()
+    bus_snapshot = firebase_database.start_trip("KL13N", "Route01")
+
+    assert inmemory_database.round_trip_count() == round_trips + 1
+    assert bus_snapshot.current_bus_status == "Active"
+    assert bus_snapshot.passengers_count == 3
+    assert bus_snapshot.available_seats == 29
+
+    bus_snapshot = firebase_database.start_trip("KL13N", "Route02")
+
+    assert bus_snapshot.current_route_id == "Route02"
+    assert bus_snapshot.passengers_count == 0
+
+
+def test_end_trips_resets_fleet_in_one_round_trip(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the trips of several buses are ended by a single multi-path update.
+
+    .. versionadded:: 1.4.0
+    """
+    for bus_id in ["KL13N", "KL08B", "KL17Q"]:
+        firebase_database.start_trip(bus_id, "Route01", reset_counters=True)
+        firebase_database.increment_bus_counters(bus_id, {"passengers_count": 5})
+
+    round_trips = inmemory_database.round_trip_count()
+    bus_snapshots = firebase_database.end_trips(["KL13N", "KL08B", "KL17Q"])
+
+    assert inmemory_database.round_trip_count() == round_trips + 1
+    assert set(bus_snapshots) == {"KL13N", "KL08B", "KL17Q"}
+
+    for bus_id, bus_snapshot in bus_snapshots.items():
+        assert bus_snapshot.current_bus_status == "Inactive"
+        assert bus_snapshot.passengers_count == 0
+        assert firebase_database.retrieve_bus_snapshot(bus_id) == bus_snapshot
+
+    assert firebase_database.end_trip("KL13N").current_route_id == "Route00"
+
+
+def test_indexed_queries_return_only_matching_buses(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the status and seat queries leave out the buses that don't match.
+
+    .. versionadded:: 1.4.0
+    """
+    for bus_id in ["KL13N", "KL08B", "KL17Q", "KL24P"]:
+        firebase_database.start_trip(bus_id, "Route01", reset_counters=True)
+
+    firebase_database.end_trip("KL17Q")
+    firebase_database.update_available_seats("KL13N", 0)
+    firebase_database.update_available_seats("KL08B", 4)
+
+    active_bus_snapshots = firebase_database.retrieve_active_bus_snapshots(
+        ["KL13N", "KL08B", "KL17Q"]
+    )
+    assert set(active_bus_snapshots) == {"KL13N", "KL08B"}
+    assert set(firebase_database.retrieve_active_bus_snapshots()) == {
+        "KL13N",
+        "KL08B",
+        "KL24P",
+    }
+
+    bus_snapshots = firebase_database.retrieve_bus_snapshots_with_seats(
+        ["KL13N", "KL08B", "KL24P"]
+    )
+    assert set(bus_snapshots) == {"KL08B", "KL24P"}
+
+    bus_snapshots = firebase_database.retrieve_bus_snapshots_with_seats(
+        min_seats=1, max_seats=10
+    )
+    assert list(bus_snapshots) == ["KL08B"]
+    assert inmemory_database.round_trips["query"] == 4
+
+
+def test_parse_bus_snapshot():
+    """
+    Test if the bus node is parsed into a snapshot, with the arrival time parsed.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshot = firebase_database.parse_bus_snapshot(
+        "KL13N",
+        {
+            "available_seats": 28,
+            "current_location": "Stop03",
+            "passengers_count": 4,
+            "current_bus_status": "Active",
+            "current_route_id": "Route01",
+            "delay_in_mins": None,
+            "last_stop_arrival_time": "2023-07-14 09:42:05",
+        },
+    )
+
+    assert bus_snapshot.bus_id == "KL13N"
+    assert bus_snapshot.available_seats == 28
+    assert bus_snapshot.passengers_count == 4
+    assert bus_snapshot.delay_in_mins is None
+    assert bus_snapshot.last_stop_arrival_time == datetime(2023, 7, 14, 9, 42, 5)
+
+
+def test_parse_bus_snapshot_with_missing_fields():
+    """
+    Test if the missing children are returned as None, and missing nodes as None.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshot = firebase_database.parse_bus_snapshot(
+        "KL13N", {"current_bus_status": "Inactive"}
+    )
+
+    assert bus_snapshot.current_bus_status == "Inactive"
+    assert bus_snapshot.available_seats is None
+    assert bus_snapshot.delay_in_mins is None
+    assert bus_snapshot.last_stop_arrival_time is None
+
+    assert firebase_database.parse_bus_snapshot("KL13N", None) is None
+
+
+def test_retrieve_bus_snapshots_skips_missing_buses(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the snapshots are read in one round trip, and missing buses skipped.
+
+    .. versionadded:: 1.4.0
+    """
+    inmemory_database.reference("KL13N").set(
+        {"current_location": "Stop02", "last_stop_arrival_time": "2023-07-14 09:42:05"}
+    )
+    inmemory_database.reference("KL08B").set({"delay_in_mins": None})
+
+    round_trips = inmemory_database.round_trip_count()
+    bus_snapshots = firebase_database.retrieve_bus_snapshots(
+        ["KL13N", "KL08B", "KL17Q"]
+    )
+
+    assert inmemory_database.round_trip_count() == round_trips + 1
+    assert list(bus_snapshots) == ["KL13N", "KL08B"]
+    assert bus_snapshots["KL13N"] == firebase_database.retrieve_bus_snapshot("KL13N")
+    assert bus_snapshots["KL13N"].last_stop_arrival_time == datetime(
+        2023, 7, 14, 9, 42, 5
+    )
+    assert bus_snapshots["KL08B"].current_location is None
+    assert firebase_database.retrieve_bus_snapshot("KL17Q") is None
@@ -0,0 +1,211 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the fleet mirror used by the passenger app.
+
+Included Functions:
+    [1] event_source
+    [2] push
+    [3] test_fleet_mirror_applies_pushed_events
+    [4] test_quiet_fleet_mirror_stays_synced
+    [5] test_fleet_mirror_resyncs_once_disconnected
+    [6] test_application_reads_are_served_from_fleet_mirror
+
+.. versionadded:: 1.4.0
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest  # pylint: disable=import-error
+
+from application import application_database
+from database import firebase_database
+from database.firebase_fleet_mirror import FleetMirror
+
+FLEET = {
+    "KL13N": {
+        "available_seats": 32,
+        "current_location": "Thampanoor",
+        "passengers_count": 0,
+        "current_bus_status": "Active",
+        "current_route_id": "Route01",
+        "delay_in_mins": 0,
+        "last_stop_arrival_time": "2023-08-01 09:00:00",
+    },
+    "KL08B": {
+        "available_seats": 20,
+        "current_location": "Kollam",
+        "passengers_count": 12,
+        "current_bus_status": "Inactive",
+        "current_route_id": "Route00",
+        "delay_in_mins": 0,
+        "last_stop_arrival_time": "2023-08-01 09:00:00",
+    },
+}
+
+
+@pytest.fixture
+def event_source(monkeypatch):
+    """
+    Supporting function to replace the firebase database with a local event source.
+
+    Every subscription receives the current fleet as a put event on the root, like
+    the firebase database does. Tests push further events through the returned list
+    of subscriber callbacks. Reads of any node made by the code under test fail.
+
+    .. versionadded:: 1.4.0
+    """
+    subscribers = []
+
+    class FakeRegistration:
+        def __init__(self, callback):
+            self.callback = callback
+
+        def close(self):
+            subscribers.remove(self.callback)
+
+    class FakeReference:
+        def __init__(self, path):
+            self.path = path
+
+        def listen(self, callback):
+            subscribers.append(callback)
+            callback(SimpleNamespace(event_type="put", path="/", data=FLEET))
+            return FakeRegistration(callback)
+
+        def get(self):
+            raise AssertionError("Reads should be served from the fleet mirror")
+
+        def child(self, path):
+            return FakeReference(self.path + "/" + path)
+
+    class FakeDatabase:
+        @staticmethod
+        def reference(path="/"):
+            return FakeReference(path)
+
+    monkeypatch.setattr(firebase_database, "db", FakeDatabase)
+    return subscribers
+
+
+def push(subscribers, event_type, path, data):
+    """
+    Supporting function to push an event to all the subscribers of the event source.
+
+    .. versionadded:: 1.4.0
+    """
+    for callback in list(subscribers):
+        callback(SimpleNamespace(event_type=event_type, path=path, data=data))
+
+
+def test_fleet_mirror_applies_pushed_events(
+    event_source,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if put and patch events are applied to the in-memory table of the mirror.
+
+    .. versionadded:: 1.4.0
+    """
+    fleet_mirror = FleetMirror()
+    assert fleet_mirror.start()
+
+    push(event_source, "put", "/KL13N/current_location", "Kollam")
+    push(event_source, "patch", "/", {"KL13N/passengers_count": 4, "KL08B": None})
+    push(event_source, "patch", "/KL13N", {"available_seats": 28})
+
+    bus_snapshot = fleet_mirror.retrieve_bus_snapshot("KL13N")
+    assert bus_snapshot.current_location == "Kollam"
+    assert bus_snapshot.passengers_count == 4
+    assert bus_snapshot.available_seats == 28
+
+    assert fleet_mirror.retrieve_bus_snapshots(["KL13N", "KL08B"]).keys() == {"KL13N"}
+    assert FLEET["KL13N"]["current_location"] == "Thampanoor"
+
+    fleet_mirror.close()
+    assert not fleet_mirror.is_synced()
+
+
+def test_quiet_fleet_mirror_stays_synced(
+    event_source,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if a connected mirror stays in sync, when no bus moves for a long time.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [0.0]
+    fleet_mirror = FleetMirror(resync_interval=30.0, timer=lambda: current_time[0])
+    fleet_mirror.start()
+
+    current_time[0] = 600.0
+    assert fleet_mirror.staleness() == 600.0
+    assert fleet_mirror.is_synced()
+
+    subscriber = event_source[0]
+    assert fleet_mirror.is_synced()
+    assert event_source == [subscriber]  # Database wasn't subscribed to again
+
+    fleet_mirror.close()
+
+
+def test_fleet_mirror_resyncs_once_disconnected(
+    event_source,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the mirror falls back to the db once the stream is lost, & resubscribes.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [0.0]
+    fleet_mirror = FleetMirror(resync_interval=30.0, timer=lambda: current_time[0])
+    fleet_mirror.start()
+
+    push(event_source, "put", "/KL13N/current_location", "Kollam")
+    push(event_source, "cancel", "/", "Permission denied")
+
+    current_time[0] = 45.0
+    assert not fleet_mirror.is_synced()  # Reads use the database while resubscribing
+
+    deadline = time.monotonic() + 5.0
+    while not fleet_mirror.is_synced():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert len(event_source) == 1
+    assert fleet_mirror.retrieve_field("KL13N", "current_location") == "Thampanoor"
+
+    fleet_mirror.close()
+
+
+def test_application_reads_are_served_from_fleet_mirror(
+    event_source, monkeypatch  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the application's database reads are served from a started mirror.
+
+    .. versionadded:: 1.4.0
+    """
+    fleet_mirror = FleetMirror()
+    monkeypatch.setattr(application_database, "fleet_mirror", fleet_mirror)
+    fleet_mirror.start()
+
+    push(event_source, "patch", "/KL08B", {"current_bus_status": "Active"})
+
+    assert application_database.retrieve_current_bus_status("KL08B") == "Active"
+    assert application_database.retrieve_available_seats("KL13N") == 32
+    bus_snapshots = application_database.retrieve_bus_snapshots(["KL08B"])
+    assert bus_snapshots["KL08B"].current_location == "Kollam"
+    assert application_database.retrieve_fleet_staleness() < 1.0
+
+    fleet_mirror.close()
@@ -0,0 +1,198 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the write-behind buffer of the firebase database.
+
+Included Functions:
+    [1] recorded_updates
+    [2] test_write_buffer_coalesces_changes_into_one_update
+    [3] test_write_buffer_keeps_changes_of_failed_flush
+    [4] test_write_buffer_batches_increments_into_one_server_value
+    [5] test_write_buffer_adds_increments_to_values_of_failed_flush
+
+.. versionadded:: 1.4.0
+"""
+
+import pytest  # pylint: disable=import-error
+
+from database import firebase_database
+from database.firebase_write_buffer import FirebaseWriteBuffer
+
+
+@pytest.fixture
+def recorded_updates(monkeypatch):
+    """
+    Supporting function to replace the firebase database with a local stand-in.
+
+    The stand-in records every update written to it, and fails the writes while
+    the first element of the returned list's failure flag is set to True.
+
+    .. versionadded:: 1.4.0
+    """
+    updates = []
+    should_fail = [False]
+
+    class FakeReference:
+        def __init__(self, path):
+            self.path = path
+
+        def update(self, value):
+            if should_fail[0]:
+                raise ConnectionError("database is unreachable")
+            updates.append((self.path, dict(value)))
+
+    class FakeDatabase:
+        @staticmethod
+        def reference(path="/"):
+            return FakeReference(path)
+
+    monkeypatch.setattr(firebase_database, "db", FakeDatabase)
+    return updates, should_fail
+
+
+def test_write_buffer_coalesces_changes_into_one_update(
+    recorded_updates,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if changes to several buses are written as a single multi-path update.
+
+    .. versionadded:: 1.4.0
+    """
+    updates, _ = recorded_updates
+    write_buffer = FirebaseWriteBuffer(flush_interval=None)
+
+    write_buffer.stage("KL13N", {"passengers_count": 2, "available_seats": 30})
+    write_buffer.stage("KL13N", {"passengers_count": 5, "available_seats": 27})
+    write_buffer.stage("KL08B", {"passengers_count": 1})
+    write_buffer.flush()
+    write_buffer.flush()  # Nothing is pending, so nothing should be written
+
+    assert updates == [
+        (
+            "/",
+            {
+                "KL13N/passengers_count": 5,
+                "KL13N/available_seats": 27,
+                "KL08B/passengers_count": 1,
+            },
+        )
+    ]
+    assert write_buffer.flush_count == 1
+
+
+def test_write_buffer_keeps_changes_of_failed_flush(
+    recorded_updates,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if changes are retried after a failed flush, without replacing newer ones.
+
+    .. versionadded:: 1.4.0
+    """
+    updates, should_fail = recorded_updates
+    write_buffer = FirebaseWriteBuffer(flush_interval=None)
+
+    write_buffer.stage("KL13N", {"passengers_count": 2, "available_seats": 30})
+
+    should_fail[0] = True
+    with pytest.raises(ConnectionError):
+        write_buffer.flush()
+
+    write_buffer.stage("KL13N", {"passengers_count": 3})
+    assert write_buffer.pending_updates() == {
+        "KL13N/passengers_count": 3,
+        "KL13N/available_seats": 30,
+    }
+
+    should_fail[0] = False
+    write_buffer.flush()
+
+    assert updates == [
+        ("/", {"KL13N/passengers_count": 3, "KL13N/available_seats": 30})
+    ]
+
+
+def test_write_buffer_batches_increments_into_one_server_value(
+    recorded_updates,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if increments are added up till flush, and kept after a failed flush.
+
+    .. versionadded:: 1.4.0
+    """
+    updates, should_fail = recorded_updates
+    write_buffer = FirebaseWriteBuffer(flush_interval=None)
+
+    write_buffer.increment("KL13N", "passengers_count", 2)
+    write_buffer.increment("KL13N", "passengers_count", 3)
+    write_buffer.increment("KL13N", "available_seats", -5)
+
+    should_fail[0] = True
+    with pytest.raises(ConnectionError):
+        write_buffer.flush()
+
+    write_buffer.increment("KL13N", "passengers_count", 1)
+    write_buffer.stage("KL08B", {"available_seats": 30})
+    write_buffer.increment("KL08B", "available_seats", -2)
+
+    should_fail[0] = False
+    write_buffer.flush()
+
+    assert updates == [
+        (
+            "/",
+            {
+                "KL08B/available_seats": 28,
+                "KL13N/passengers_count": {".sv": {"increment": 6}},
+                "KL13N/available_seats": {".sv": {"increment": -5}},
+            },
+        )
+    ]
+
+
+def test_write_buffer_adds_increments_to_values_of_failed_flush():
+    """
+    Test if increments staged during a failed flush are added to its values.
+
+    .. versionadded:: 1.4.0
+    """
+    written_changes = []
+
+    class FlakyStore:
+        @staticmethod
+        def write_changes(pending, pending_increments):
+            if not written_changes:
+                written_changes.append(None)
+
+                # Passengers board while the values are being written, & it fails
+                write_buffer.increment("KL13N", "passengers_count", 2)
+                write_buffer.increment("KL13N", "available_seats", -2)
+                raise ConnectionError("database is unreachable")
+
+            written_changes.append((pending, pending_increments))
+
+    write_buffer = FirebaseWriteBuffer(flush_interval=None, store=FlakyStore)
+    write_buffer.stage("KL13N", {"passengers_count": 0, "available_seats": 32})
+
+    with pytest.raises(ConnectionError):
+        write_buffer.flush()
+
+    assert write_buffer.pending_updates() == {
+        "KL13N/passengers_count": 2,
+        "KL13N/available_seats": 30,
+    }
+
+    write_buffer.flush()
+    pending, pending_increments = written_changes[1]
+
+    assert pending == {"KL13N": {"passengers_count": 2, "available_seats": 30}}
+    assert not any(pending_increments.values())
@@ -0,0 +1,59 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the geocoder used to locate the bus stops.
+
+Included Functions:
+    [1] test_stop_geocoder_geocodes_each_stop_once
+
+.. versionadded:: 1.4.0
+"""
+
+from application.application_geocoder import StopGeocoder
+from database.sql_database import SQLiteConnectionPool
+
+
+def test_stop_geocoder_geocodes_each_stop_once(tmp_path):
+    """
+    Test if seeded stops need no geocoding, and new stops are geocoded only once.
+
+    A local stand-in replaces the geocoding service, and counts the calls made to
+    it. A second geocoder over the same database represents an app restart.
+
+    .. versionadded:: 1.4.0
+    """
+    seed_file = tmp_path / "stop_coordinates.csv"
+    seed_file.write_text("Name,Latitude,Longitude\nThampanoor,8.4875,76.9525\n")
+    connection_pool = SQLiteConnectionPool(str(tmp_path / "croma_test.db"))
+
+    geocoded_places = []
+
+    def geocode_function(place_name):
+        geocoded_places.append(place_name)
+        return {"Pattom": (8.5203, 76.9432)}.get(place_name)
+
+    geocoder = StopGeocoder(geocode_function, str(seed_file), connection_pool)
+
+    assert geocoder.locate("Thampanoor") == (8.4875, 76.9525)
+    assert geocoder.locate("Pattom") == (8.5203, 76.9432)
+    assert geocoder.locate("Pattom") == (8.5203, 76.9432)
+    assert geocoder.locate("Atlantis") is None
+    assert geocoder.locate("Atlantis") is None
+    assert geocoded_places == ["Pattom", "Atlantis"]
+
+    restarted_geocoder = StopGeocoder(geocode_function, str(seed_file), connection_pool)
+
+    assert restarted_geocoder.locate("Pattom") == (8.5203, 76.9432)
+    assert geocoded_places == ["Pattom", "Atlantis"]
+
+    connection_pool.close()
@@ -0,0 +1,173 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the hedged, deadline-bounded database reads.
+
+Included Functions:
+    [1] test_latency_histogram_percentiles
+    [2] test_slow_read_is_hedged
+    [3] test_read_past_deadline_raises
+    [4] test_read_past_deadline_falls_back_to_last_value
+    [5] test_short_deadline_joining_slow_read_is_honoured
+
+.. versionadded:: 1.4.0
+"""
+
+import threading
+import time
+
+import pytest  # pylint: disable=import-error
+
+from application import application_database
+from database import firebase_database
+from database.database_cache import StaleWhileRevalidateCache
+from database.hedged_reader import HedgedReader, LatencyHistogram, ReadDeadlineExceeded
+from database.inmemory_database import InMemoryDatabase
+
+
+def test_latency_histogram_percentiles():
+    """
+    Test if percentiles are estimated as the upper bound of their buckets.
+
+    .. versionadded:: 1.4.0
+    """
+    histogram = LatencyHistogram(bucket_bounds=(0.01, 0.1, 1.0))
+    assert histogram.percentile(0.95) is None
+
+    for latency in [0.005] * 90 + [0.05] * 8 + [3.0] * 2:
+        histogram.record(latency)
+
+    assert histogram.percentile(0.5) == 0.01
+    assert histogram.percentile(0.95) == 0.1
+    assert histogram.percentile(0.99) == float("inf")
+    assert histogram.snapshot() == {0.01: 90, 0.1: 8, 1.0: 0, float("inf"): 2}
+
+
+def test_slow_read_is_hedged():
+    """
+    Test if a second request is sent for a slow read, and its result is used.
+
+    .. versionadded:: 1.4.0
+    """
+    hedged_reader = HedgedReader(deadline=5.0, hedge_min_samples=5)
+
+    for _ in range(5):
+        hedged_reader.read("current_location", lambda: "Thampanoor")
+
+    release_first_request = threading.Event()
+    requests = []
+
+    def read_current_location():
+        requests.append(len(requests))
+        if len(requests) == 1:
+            release_first_request.wait()  # First request is stuck on the network
+        return "Kollam"
+
+    assert hedged_reader.read("current_location", read_current_location) == "Kollam"
+    release_first_request.set()
+
+    assert len(requests) == 2
+    assert hedged_reader.stats()["hedges_sent"] == 1
+    assert hedged_reader.stats()["hedges_won"] == 1
+
+
+def test_read_past_deadline_raises():
+    """
+    Test if a read is abandoned once its deadline passes, without any hedge.
+
+    .. versionadded:: 1.4.0
+    """
+    hedged_reader = HedgedReader(hedge=False)
+    release_request = threading.Event()
+
+    with pytest.raises(ReadDeadlineExceeded):
+        hedged_reader.read("delay_in_mins", release_request.wait, deadline=0.05)
+
+    release_request.set()
+    assert hedged_reader.stats()["deadlines_exceeded"] == 1
+
+
+def test_read_past_deadline_falls_back_to_last_value(monkeypatch):
+    """
+    Test if the app serves the value read the last time, when the db is too slow.
+
+    .. versionadded:: 1.4.0
+    """
+    database = InMemoryDatabase(seed=42)
+    monkeypatch.setattr(firebase_database, "db", database)
+    monkeypatch.setattr(
+        application_database,
+        "bus_values",
+        StaleWhileRevalidateCache(
+            application_database._load_bus_value,  # pylint: disable=protected-access
+            default_budget=0.0,
+            max_stale_age=0.0,
+        ),
+    )
+
+    firebase_database.start_trip("KL13N", "Route01", reset_counters=True)
+    assert application_database.retrieve_current_location("KL13N") == "Thampanoor"
+
+    firebase_database.update_current_location("KL13N", "Kollam")
+    database.latency = 0.5
+
+    assert (
+        application_database.retrieve_current_location("KL13N", deadline=0.05)
+        == "Thampanoor"
+    )
+    with pytest.raises(ReadDeadlineExceeded):
+        application_database.retrieve_passengers_count("KL13N", deadline=0.05)
+
+
+def test_short_deadline_joining_slow_read_is_honoured(monkeypatch):
+    """
+    Test if a session joining a slow read in flight gives up at its own deadline.
+
+    .. versionadded:: 1.4.0
+    """
+    database = InMemoryDatabase(seed=42)
+    monkeypatch.setattr(firebase_database, "db", database)
+    monkeypatch.setattr(
+        application_database,
+        "bus_values",
+        StaleWhileRevalidateCache(
+            application_database._load_bus_value,  # pylint: disable=protected-access
+            default_budget=0.0,
+            max_stale_age=0.0,
+        ),
+    )
+
+    firebase_database.start_trip("KL13N", "Route01", reset_counters=True)
+    assert application_database.retrieve_current_location("KL13N") == "Thampanoor"
+
+    firebase_database.update_current_location("KL13N", "Kollam")
+    database.latency = 0.5
+
+    # Another session starts a read of the location, with the default deadline
+    slow_read = threading.Thread(
+        target=application_database.retrieve_current_location, args=("KL13N",)
+    )
+    slow_read.start()
+    time.sleep(0.05)
+
+    shared_calls = application_database.bus_reads.stats()["shared_calls"]
+    start_time = time.monotonic()
+    current_location = application_database.retrieve_current_location(
+        "KL13N", deadline=0.05
+    )
+    elapsed_time = time.monotonic() - start_time
+    slow_read.join()
+
+    assert application_database.bus_reads.stats()["shared_calls"] == shared_calls + 1
+    assert current_location == "Thampanoor"
+    assert elapsed_time < 0.3
@@ -0,0 +1,166 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the in-memory stand-in of the firebase database.
+
+Included Functions:
+    [1] inmemory_database
+    [2] test_crud_operations_run_on_inmemory_database
+    [3] test_inmemory_database_notifies_listeners
+    [4] test_inmemory_database_injects_errors
+    [5] test_concurrent_increments_are_not_lost
+    [6] test_transaction_updates_node_from_its_value
+
+.. versionadded:: 1.4.0
+"""
+
+import queue
+import threading
+
+import pytest  # pylint: disable=import-error
+from firebase_admin import exceptions
+
+from database import firebase_database
+from database.inmemory_database import InMemoryDatabase
+
+
+@pytest.fixture
+def inmemory_database(monkeypatch):
+    """
+    Supporting function to run the CRUD operations on an empty in-memory database.
+
+    .. versionadded:: 1.4.0
+    """
+    database = InMemoryDatabase(seed=42)
+    monkeypatch.setattr(firebase_database, "db", database)
+    return database
+
+
+def test_crud_operations_run_on_inmemory_database(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the firebase database module works unchanged on top of the stand-in.
+
+    .. versionadded:: 1.4.0
+    """
+    firebase_database.initialize_database("KL13N", "Route01")
+    firebase_database.update_current_location("KL13N", "Kollam")
+    firebase_database.update_passengers_count("KL13N", 6)
+
+    assert firebase_database.retrieve_current_location("KL13N") == "Kollam"
+    assert firebase_database.retrieve_passengers_count("KL13N") == 6
+    assert firebase_database.retrieve_bus_snapshot("KL13N").current_route_id == (
+        "Route01"
+    )
+    assert inmemory_database.reference("/").get(shallow=True) == {"KL13N": True}
+    assert inmemory_database.round_trips["update"] == 3
+    assert inmemory_database.round_trips["get"] == 4
+
+
+def test_inmemory_database_notifies_listeners(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if listeners get the full node first, and then an event for every change.
+
+    .. versionadded:: 1.4.0
+    """
+    firebase_database.initialize_database("KL13N", "Route01")
+
+    events = queue.Queue()
+    registration = inmemory_database.reference("KL13N").listen(events.put)
+
+    inmemory_database.reference("KL13N").update({"available_seats": 30})
+    inmemory_database.reference("/").update(
+        {"KL13N/passengers_count": 2, "KL13N/current_location": "Kollam"}
+    )
+
+    first_event = events.get(timeout=5)
+    assert (first_event.event_type, first_event.path) == ("put", "/")
+    assert first_event.data["available_seats"] == 32
+
+    assert events.get(timeout=5) == ("put", "/available_seats", 30)
+    assert events.get(timeout=5) == (
+        "patch",
+        "/",
+        {"passengers_count": 2, "current_location": "Kollam"},
+    )
+
+    registration.close()
+    inmemory_database.reference("KL13N").update({"available_seats": 28})
+    assert events.empty()
+
+
+def test_inmemory_database_injects_errors():
+    """
+    Test if the configured fraction of calls fail, repeatably for the same seed.
+
+    .. versionadded:: 1.4.0
+    """
+
+    def count_failures(database):
+        failures = 0
+        for _ in range(200):
+            try:
+                database.reference("KL13N").get()
+            except exceptions.UnavailableError:
+                failures = failures + 1
+        return failures
+
+    failures = count_failures(InMemoryDatabase(error_rate=0.25, seed=7))
+
+    assert 25 < failures < 75
+    assert failures == count_failures(InMemoryDatabase(error_rate=0.25, seed=7))
+
+
+def test_concurrent_increments_are_not_lost(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if increments of the same counter made by many threads are all applied.
+
+    .. versionadded:: 1.4.0
+    """
+    firebase_database.initialize_database("KL13N", "Route01")
+    inmemory_database.latency = 0.001
+
+    def print_tickets():
+        for _ in range(5):
+            firebase_database.increment_bus_counters(
+                "KL13N", {"passengers_count": 1, "available_seats": -1}
+            )
+
+    threads = [threading.Thread(target=print_tickets) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert firebase_database.retrieve_passengers_count("KL13N") == 30
+    assert firebase_database.retrieve_available_seats("KL13N") == 2
+
+
+def test_transaction_updates_node_from_its_value(
+    inmemory_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if a transaction replaces a node with the value computed from its own.
+
+    .. versionadded:: 1.4.0
+    """
+    firebase_database.initialize_database("KL13N", "Route01")
+    ref = inmemory_database.reference("KL13N").child("delay_in_mins")
+
+    assert ref.transaction(lambda delay: (delay or 0) + 7) == 7
+    assert firebase_database.retrieve_bus_total_delay("KL13N") == 7
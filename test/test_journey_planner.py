@@ -0,0 +1,169 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the tests for the journey planner used to find the transfers.
+
+Included Functions:
+    [1] journey_planner (supporting function)
+    [2] bus_snapshot (supporting function)
+    [3] test_plan_journeys_returns_pareto_optimal_journeys
+    [4] test_plan_journeys_allows_time_to_transfer
+    [5] test_plan_journeys_skips_passed_stops
+    [6] test_plan_journeys_with_unknown_stops
+
+.. versionadded:: 1.4.0
+"""
+
+import datetime
+
+import pytest  # pylint: disable=import-error
+
+from application.application_journey_planner import JourneyPlanner
+from application.application_route_index import RouteIndex
+from database.firebase_database import BusSnapshot
+from hardware import service_time
+
+NOW = datetime.datetime(2024, 1, 15, 10, 0)
+
+
+@pytest.fixture
+def journey_planner():
+    """
+    Supporting function to build a journey planner over a small network of routes.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        journey_planner (JourneyPlanner)
+    """
+    all_routes = {
+        "RouteA": ["S1", "S2", "S3", "S4"],
+        "RouteB": ["S3", "S7", "S8"],
+        "RouteC": ["S1", "S9", "S8"],
+    }
+    bus_timings = {
+        "RouteA": {"S1": 0, "S2": 5, "S3": 10, "S4": 15},
+        "RouteB": {"S3": 0, "S7": 5, "S8": 10},
+        "RouteC": {"S1": 0, "S9": 20, "S8": 40},
+    }
+
+    return JourneyPlanner(RouteIndex(all_routes, bus_timings))
+
+
+def bus_snapshot(bus_id, route_id, current_location, minutes_from_now):
+    """
+    Supporting function to create the snapshot of a bus, arriving at its location.
+
+    .. versionadded:: 1.4.0
+    """
+    return BusSnapshot(
+        bus_id=bus_id,
+        available_seats=30,
+        current_location=current_location,
+        passengers_count=2,
+        current_bus_status="Active",
+        current_route_id=route_id,
+        delay_in_mins=0,
+        last_stop_arrival_time=NOW + datetime.timedelta(minutes=minutes_from_now),
+    )
+
+
+def minutes_from_now(seconds):
+    """
+    Supporting function to convert the service seconds to minutes after NOW.
+
+    .. versionadded:: 1.4.0
+    """
+    return (seconds - service_time.to_service_seconds(NOW)) // 60
+
+
+def test_plan_journeys_returns_pareto_optimal_journeys(
+    journey_planner,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the direct journey & the earlier journey with a transfer are returned.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshots = {
+        "KL13N": bus_snapshot("KL13N", "RouteA", "S1", 1),
+        "KL14S": bus_snapshot("KL14S", "RouteB", "S3", 14),
+        "KL15E": bus_snapshot("KL15E", "RouteC", "S1", 2),
+    }
+
+    direct, transfer = journey_planner.plan_journeys(
+        "S1", "S8", bus_snapshots, now=NOW
+    )
+
+    assert direct.transfers == 0
+    assert [leg.bus_id for leg in direct.legs] == ["KL15E"]
+    assert minutes_from_now(direct.arrival_time) == 42
+
+    assert transfer.transfers == 1
+    assert [leg.bus_id for leg in transfer.legs] == ["KL13N", "KL14S"]
+    assert [leg.dropping_point for leg in transfer.legs] == ["S3", "S8"]
+    assert minutes_from_now(transfer.arrival_time) == 24
+
+
+def test_plan_journeys_allows_time_to_transfer(
+    journey_planner,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if a connection leaving before the user can change buses is not taken.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshots = {
+        "KL13N": bus_snapshot("KL13N", "RouteA", "S1", 1),
+        "KL14S": bus_snapshot("KL14S", "RouteB", "S3", 12),
+        "KL15E": bus_snapshot("KL15E", "RouteC", "S1", 2),
+    }
+
+    journeys = journey_planner.plan_journeys("S1", "S8", bus_snapshots, now=NOW)
+
+    assert [journey.transfers for journey in journeys] == [0]
+
+
+def test_plan_journeys_skips_passed_stops(
+    journey_planner,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the buses which have passed the user's boarding point aren't boarded.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshots = {"KL13N": bus_snapshot("KL13N", "RouteA", "S2", 1)}
+
+    assert journey_planner.plan_journeys("S1", "S4", bus_snapshots, now=NOW) == []
+    assert (
+        journey_planner.plan_journeys("S2", "S4", bus_snapshots, now=NOW)[0].transfers
+        == 0
+    )
+
+
+def test_plan_journeys_with_unknown_stops(
+    journey_planner,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if no journeys are returned for stops outside the network, or same stops.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_snapshots = {"KL13N": bus_snapshot("KL13N", "RouteA", "S1", 1)}
+
+    assert journey_planner.plan_journeys("S1", "S99", bus_snapshots, now=NOW) == []
+    assert journey_planner.plan_journeys("S1", "S1", bus_snapshots, now=NOW) == []
@@ -0,0 +1,73 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the occupancy tracker of the ticketing machine.
+
+Included Functions:
+    [1] test_occupancy_tracker_matches_crowd_manager_list
+    [2] test_occupancy_tracker_rejects_stops_outside_route
+
+.. versionadded:: 1.4.0
+"""
+
+import random
+
+import pytest  # pylint: disable=import-error
+
+from hardware.occupancy_tracker import OccupancyTracker
+
+
+def test_occupancy_tracker_matches_crowd_manager_list():
+    """
+    Test if the tracker gives the same counts as summing a list, on a long route.
+
+    .. versionadded:: 1.4.0
+    """
+    stop_count = 300
+    tracker = OccupancyTracker(stop_count)
+    crowd_manager = [0] * stop_count
+
+    generator = random.Random(42)
+    for _ in range(1000):
+        boarding_point = generator.randint(1, stop_count - 1)
+        dropping_point = generator.randint(boarding_point + 1, stop_count)
+        passenger_count = generator.randint(1, 10)
+
+        tracker.add_passengers(boarding_point, passenger_count)
+        tracker.add_passengers(dropping_point, -passenger_count)
+        crowd_manager[boarding_point - 1] += passenger_count
+        crowd_manager[dropping_point - 1] -= passenger_count
+
+    for position in (1, 17, 150, 299, 300):
+        assert tracker.passengers_aboard(position) == sum(crowd_manager[:position])
+
+    assert tracker.passengers_between(10, 20) == sum(crowd_manager[9:20])
+    assert tracker.net_boardings(150) == crowd_manager[149]
+    assert tracker.segment_occupancy() == [
+        sum(crowd_manager[:position]) for position in range(1, stop_count)
+    ]
+    assert tracker.passengers_aboard(stop_count) == 0
+
+
+def test_occupancy_tracker_rejects_stops_outside_route():
+    """
+    Test if an error is raised when passengers are added to a stop outside route.
+
+    .. versionadded:: 1.4.0
+    """
+    tracker = OccupancyTracker(9)
+
+    with pytest.raises(IndexError):
+        tracker.add_passengers(10, 1)
+    with pytest.raises(IndexError):
+        tracker.add_passengers(0, 1)
@@ -0,0 +1,111 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the route index used while searching buses.
+
+Included Functions:
+    [1] route_index (supporting function)
+    [2] test_candidate_routes
+    [3] test_is_bus_serving_trip
+    [4] test_time_from_origin
+
+.. versionadded:: 1.4.0
+"""
+
+import pytest  # pylint: disable=import-error
+
+from application.application_route_index import RouteIndex
+
+
+@pytest.fixture
+def route_index():
+    """
+    Supporting function to build a route index over a small network of routes.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        route_index (RouteIndex)
+    """
+    all_routes = {
+        "RouteA": ["S1", "S2", "S3", "S4", "S5", "S6"],
+        "RouteB": ["S6", "S5", "S4", "S3"],
+        "RouteC": ["S2", "S7", "S5"],
+    }
+    bus_timings = {"RouteA": {"S1": 0, "S2": 5, "S3": 9, "S4": 14, "S5": 20, "S6": 26}}
+
+    return RouteIndex(all_routes, bus_timings)
+
+
+@pytest.mark.parametrize(
+    "boarding_point, dropping_point, expected_routes",
+    [
+        ("S2", "S5", {"RouteA", "RouteC"}),
+        ("S5", "S3", {"RouteB"}),
+        ("S3", "S1", set()),
+        ("S1", "S9", set()),
+    ],
+)
+def test_candidate_routes(
+    boarding_point,
+    dropping_point,
+    expected_routes,
+    route_index,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if only routes passing the boarding point before dropping point are found.
+
+    .. versionadded:: 1.4.0
+    """
+    assert route_index.candidate_routes(boarding_point, dropping_point) == expected_routes
+
+
+@pytest.mark.parametrize(
+    "current_location, boarding_point, expected_output",
+    [
+        ("S5", "S5", True),
+        ("S2", "S5", True),
+        ("S1", "S5", False),
+        ("S6", "S5", False),
+        ("S1", "S2", True),
+    ],
+)
+def test_is_bus_serving_trip(
+    current_location,
+    boarding_point,
+    expected_output,
+    route_index,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if buses are served only when within three stops of the boarding point.
+
+    .. versionadded:: 1.4.0
+    """
+    assert (
+        route_index.is_bus_serving_trip("RouteA", current_location, boarding_point, "S6")
+        == expected_output
+    )
+
+
+def test_time_from_origin(route_index):  # pylint: disable=redefined-outer-name
+    """
+    Test if scheduled times are read from the index, and None without timings.
+
+    .. versionadded:: 1.4.0
+    """
+    assert route_index.time_from_origin("RouteA", "S4") == 14
+    assert route_index.time_from_origin("RouteB", "S4") is None
+    assert route_index.reachable_window("RouteA", "S2") == (0, 1)
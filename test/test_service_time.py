@@ -0,0 +1,109 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the tests for the service time arithmetic of the delays & ETAs.
+
+Included Functions:
+    [1] test_service_day_starts_after_midnight
+    [2] test_minutes_between_across_midnight
+    [3] test_format_clock_wraps_past_midnight
+    [4] test_bulk_conversions_match_single_conversions
+
+.. versionadded:: 1.4.0
+"""
+
+import datetime
+
+import pytest  # pylint: disable=import-error
+
+from hardware import service_time
+
+
+@pytest.mark.parametrize(
+    "moment, expected_service_date",
+    [
+        (datetime.datetime(2024, 1, 15, 10, 0), datetime.date(2024, 1, 15)),
+        (datetime.datetime(2024, 1, 16, 0, 30), datetime.date(2024, 1, 15)),
+        (datetime.datetime(2024, 1, 16, 4, 0), datetime.date(2024, 1, 16)),
+    ],
+)
+def test_service_day_starts_after_midnight(moment, expected_service_date):
+    """
+    Test if the trips running past midnight are counted in the day they started on.
+
+    .. versionadded:: 1.4.0
+    """
+    assert service_time.service_day(moment) == expected_service_date
+
+    seconds = service_time.to_service_seconds(moment)
+    assert service_time.from_service_seconds(seconds, expected_service_date) == moment
+
+
+def test_minutes_between_across_midnight():
+    """
+    Test if the minutes are right across midnight, and keep the seconds till the end.
+
+    .. versionadded:: 1.4.0
+    """
+    assert (
+        service_time.minutes_between(
+            datetime.datetime(2024, 1, 15, 23, 58, 30),
+            datetime.datetime(2024, 1, 16, 0, 3, 10),
+        )
+        == 4
+    )
+    assert (
+        service_time.minutes_between(
+            datetime.datetime(2024, 1, 15, 10, 0, 50),
+            datetime.datetime(2024, 1, 15, 10, 1, 10),
+        )
+        == 0
+    )
+
+
+def test_format_clock_wraps_past_midnight():
+    """
+    Test if the seconds since the service day began are formatted as clock time.
+
+    .. versionadded:: 1.4.0
+    """
+    assert service_time.format_clock(0) == "04:00"
+    assert service_time.format_clock(19 * 3600 + 59 * 60 + 59) == "23:59"
+    assert service_time.format_clock(20 * 3600 + 29 * 60) == "00:29"
+
+
+def test_bulk_conversions_match_single_conversions():
+    """
+    Test if the bulk conversions give the same values as converting one at a time.
+
+    .. versionadded:: 1.4.0
+    """
+    service_date = datetime.date(2024, 1, 15)
+    moments = [
+        datetime.datetime(2024, 1, 15, 4, 0, 0),
+        datetime.datetime(2024, 1, 15, 17, 45, 12),
+        datetime.datetime(2024, 1, 16, 1, 2, 3),
+    ]
+
+    seconds = service_time.to_service_seconds_many(moments, service_date)
+
+    assert seconds.tolist() == [
+        service_time.to_service_seconds(moment, service_date) for moment in moments
+    ]
+    assert service_time.to_service_seconds_many(
+        ["2024-01-16 01:02:03"], service_date
+    ).tolist() == [seconds[-1]]
+    assert service_time.format_clock_many(seconds) == [
+        service_time.format_clock(moment_seconds) for moment_seconds in seconds
+    ]
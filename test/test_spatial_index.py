@@ -0,0 +1,161 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+
+"""
+This module contains the tests for the spatial index used for the nearby searches.
+
+Included Functions:
+    [1] random_points (supporting function)
+    [2] brute_force_distances (supporting function)
+    [3] test_nearest_matches_brute_force
+    [4] test_within_radius_matches_brute_force
+    [5] test_insert_moves_and_remove_drops_points
+    [6] test_nearest_with_fewer_points_than_k
+
+.. versionadded:: 1.4.0
+"""
+
+import math
+
+import numpy as np
+import pytest  # pylint: disable=import-error
+
+from application.application_spatial_index import (
+    KM_PER_DEGREE_LATITUDE,
+    KM_PER_DEGREE_LONGITUDE,
+    REFERENCE_LATITUDE,
+    SpatialIndex,
+)
+
+# Locations around which the queries are made, including one outside the points
+QUERY_LOCATIONS = [(8.5, 76.95), (8.45, 77.0), (8.9, 76.5), (10.2, 76.3)]
+
+
+@pytest.fixture
+def random_points():
+    """
+    Supporting function to scatter a few thousand points around Thiruvananthapuram.
+
+    .. versionadded:: 1.4.0
+    """
+    generator = np.random.default_rng(7)
+    latitudes = generator.uniform(8.3, 8.7, 2000)
+    longitudes = generator.uniform(76.8, 77.1, 2000)
+
+    return {
+        "P" + str(point): (latitude, longitude)
+        for point, (latitude, longitude) in enumerate(zip(latitudes, longitudes))
+    }
+
+
+def brute_force_distances(points, latitude, longitude):
+    """
+    Supporting function to measure the distances to all the points, one at a time.
+
+    .. versionadded:: 1.4.0
+    """
+    km_per_degree_longitude = KM_PER_DEGREE_LONGITUDE * math.cos(
+        math.radians(REFERENCE_LATITUDE)
+    )
+
+    distances = {}
+    for key, (point_latitude, point_longitude) in points.items():
+        distances[key] = math.hypot(
+            (point_longitude - longitude) * km_per_degree_longitude,
+            (point_latitude - latitude) * KM_PER_DEGREE_LATITUDE,
+        )
+
+    return sorted(distances.items(), key=lambda item: item[1])
+
+
+def test_nearest_matches_brute_force(
+    random_points,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the nearest points are the ones found by measuring all of the points.
+
+    .. versionadded:: 1.4.0
+    """
+    spatial_index = SpatialIndex(cell_size_km=0.5)
+    spatial_index.load(random_points)
+
+    for latitude, longitude in QUERY_LOCATIONS:
+        expected = brute_force_distances(random_points, latitude, longitude)
+
+        for k in (1, 5, 25):
+            nearest = spatial_index.nearest(latitude, longitude, k)
+
+            assert [distance for _, distance in nearest] == pytest.approx(
+                [distance for _, distance in expected[:k]]
+            )
+
+
+def test_within_radius_matches_brute_force(
+    random_points,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the points within the radius are the ones found by measuring them all.
+
+    .. versionadded:: 1.4.0
+    """
+    spatial_index = SpatialIndex(cell_size_km=0.5)
+    spatial_index.load(random_points)
+
+    for latitude, longitude in QUERY_LOCATIONS:
+        expected = brute_force_distances(random_points, latitude, longitude)
+
+        for radius_km in (0.2, 1.0, 3.5):
+            within_radius = spatial_index.within_radius(latitude, longitude, radius_km)
+
+            assert {key for key, _ in within_radius} == {
+                key for key, distance in expected if distance <= radius_km
+            }
+
+
+def test_insert_moves_and_remove_drops_points():
+    """
+    Test if inserting a present key moves the point, and removed points are gone.
+
+    .. versionadded:: 1.4.0
+    """
+    spatial_index = SpatialIndex()
+    spatial_index.insert("KL-01-AA-1234", 8.4875, 76.9525)
+    spatial_index.insert("KL-01-AA-5678", 8.5203, 76.9432)
+
+    assert spatial_index.nearest(8.52, 76.94)[0][0] == "KL-01-AA-5678"
+
+    spatial_index.insert("KL-01-AA-1234", 8.5204, 76.9433)
+    assert len(spatial_index) == 2
+    assert [key for key, _ in spatial_index.within_radius(8.4875, 76.9525, 1.0)] == []
+
+    spatial_index.remove("KL-01-AA-5678")
+    spatial_index.remove("KL-01-AA-0000")
+    assert len(spatial_index) == 1
+    assert spatial_index.nearest(8.52, 76.94, 3)[0][0] == "KL-01-AA-1234"
+
+
+def test_nearest_with_fewer_points_than_k():
+    """
+    Test if all the points are returned when there are fewer than k, or none.
+
+    .. versionadded:: 1.4.0
+    """
+    spatial_index = SpatialIndex()
+    assert spatial_index.nearest(8.5, 76.95, 3) == []
+    assert spatial_index.within_radius(8.5, 76.95, 5.0) == []
+
+    spatial_index.load({"Thampanoor": (8.4875, 76.9525), "Kochi": (9.9312, 76.2673)})
+    assert [key for key, _ in spatial_index.nearest(8.5, 76.95, 3)] == [
+        "Thampanoor",
+        "Kochi",
+    ]
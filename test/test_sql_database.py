@@ -0,0 +1,223 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the lookups made on the CroMa SQL database.
+
+Included Functions:
+    [1] bus_database (supporting function)
+    [2] test_retrieve_bus_data_from_sql_database
+    [3] test_retrieve_bus_data_many
+    [4] test_read_connections_are_read_only
+    [5] test_bus_data_cache_invalidated_on_insert
+    [6] test_read_racing_an_insert_is_not_cached
+    [7] test_missing_buses_are_cached_briefly
+    [8] test_chunk_bus_ids
+
+.. versionadded:: 1.4.0
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pytest  # pylint: disable=import-error
+
+from database import sql_database
+from database.database_cache import TTLCache
+
+
+@pytest.fixture
+def bus_database(tmp_path, monkeypatch):
+    """
+    Supporting function to point the SQL database module to a temporary database.
+
+    .. versionadded:: 1.4.0
+
+    Parameters:
+        None
+
+    Returns:
+        connection_pool (SQLiteConnectionPool)
+    """
+    database_path = tmp_path / "croma_test.db"
+
+    conn = sqlite3.connect(database_path)
+    conn.execute(
+        "CREATE TABLE Bus (BusId TEXT PRIMARY KEY, BusOperator TEXT, BusType TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO Bus VALUES (?, ?, ?)",
+        [
+            ("KL13N", "KSRTC", "City Fast Non-AC Bus"),
+            ("KL08B", "KSRTC", "Minnal AC-Sleeper Bus"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    connection_pool = sql_database.SQLiteConnectionPool(str(database_path))
+    monkeypatch.setattr(sql_database, "connection_pool", connection_pool)
+    monkeypatch.setattr(sql_database, "bus_data_cache", TTLCache())
+
+    yield connection_pool
+    connection_pool.close()
+
+
+def test_retrieve_bus_data_from_sql_database(
+    bus_database,  # pylint: disable=redefined-outer-name,unused-argument
+):
+    """
+    Test if lookups from many threads return the same rows, using the pool.
+
+    .. versionadded:: 1.4.0
+    """
+    results = []
+
+    def lookup():
+        for _ in range(50):
+            results.append(sql_database.retrieve_bus_data_from_sql_database("KL13N"))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [("KSRTC", "City Fast Non-AC Bus")] * 400
+    assert sql_database.retrieve_bus_data_from_sql_database("KL99Z") is None
+
+
+def test_retrieve_bus_data_many(
+    bus_database,  # pylint: disable=redefined-outer-name,unused-argument
+):
+    """
+    Test if the batch lookup returns the found buses, keyed by their bus ids.
+
+    .. versionadded:: 1.4.0
+    """
+    assert sql_database.retrieve_bus_data_many(["KL08B", "KL99Z", "KL13N", "KL08B"]) == {
+        "KL08B": ("KSRTC", "Minnal AC-Sleeper Bus"),
+        "KL13N": ("KSRTC", "City Fast Non-AC Bus"),
+    }
+    assert sql_database.retrieve_bus_data_many([]) == {}
+
+
+def test_read_connections_are_read_only(
+    bus_database,  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if the pooled read connections refuse writes, and the journal is WAL.
+
+    .. versionadded:: 1.4.0
+    """
+    with bus_database.read_connection() as conn:
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM Bus")
+
+        assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_bus_data_cache_invalidated_on_insert(
+    bus_database,  # pylint: disable=redefined-outer-name,unused-argument
+):
+    """
+    Test if repeated lookups hit the cache, and inserts make new buses visible.
+
+    .. versionadded:: 1.4.0
+    """
+    assert sql_database.retrieve_bus_data_from_sql_database("KL17Q") is None
+    assert sql_database.retrieve_bus_data_from_sql_database("KL17Q") is None
+    assert sql_database.bus_data_cache_stats()["hits"] == 1
+
+    sql_database.insert_bus_data("Bus", [("KL17Q", "KSRTC", "Fast Double Decker Bus")])
+
+    assert sql_database.retrieve_bus_data_many(["KL17Q"]) == {
+        "KL17Q": ("KSRTC", "Fast Double Decker Bus")
+    }
+
+
+def test_read_racing_an_insert_is_not_cached(
+    bus_database, monkeypatch  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if a lookup made before an insert doesn't cache the bus as missing after it.
+
+    .. versionadded:: 1.4.0
+    """
+    read_connection = bus_database.read_connection
+
+    @contextmanager
+    def read_connection_then_insert():
+        with read_connection() as conn:
+            yield conn
+
+        # Bus is added after the lookup read the table, but before it is cached
+        sql_database.insert_bus_data(
+            "Bus", [("KL17Q", "KSRTC", "Fast Double Decker Bus")]
+        )
+
+    monkeypatch.setattr(bus_database, "read_connection", read_connection_then_insert)
+    assert sql_database.retrieve_bus_data_from_sql_database("KL17Q") is None
+
+    monkeypatch.setattr(bus_database, "read_connection", read_connection)
+    assert sql_database.retrieve_bus_data_from_sql_database("KL17Q") == (
+        "KSRTC",
+        "Fast Double Decker Bus",
+    )
+
+
+def test_missing_buses_are_cached_briefly(
+    bus_database, monkeypatch  # pylint: disable=redefined-outer-name
+):
+    """
+    Test if buses added by another process show up once their missing entry expires.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [100.0]
+    monkeypatch.setattr(
+        sql_database, "bus_data_cache", TTLCache(timer=lambda: current_time[0])
+    )
+
+    assert sql_database.retrieve_bus_data_many(["KL13N", "KL17Q"]) == {
+        "KL13N": ("KSRTC", "City Fast Non-AC Bus")
+    }
+
+    # Another process adds the bus, so the cache of this process isn't cleared
+    with bus_database.write_connection() as conn:
+        conn.execute(
+            "INSERT INTO Bus VALUES (?, ?, ?)",
+            ("KL17Q", "KSRTC", "Fast Double Decker Bus"),
+        )
+
+    assert sql_database.retrieve_bus_data_from_sql_database("KL17Q") is None
+
+    current_time[0] = current_time[0] + sql_database.BUS_DATA_MISSING_TTL
+    assert sql_database.retrieve_bus_data_from_sql_database("KL17Q") == (
+        "KSRTC",
+        "Fast Double Decker Bus",
+    )
+    assert sql_database.bus_data_cache.get("KL13N") is not None
+
+
+def test_chunk_bus_ids():
+    """
+    Test if the bus ids are split into chunks, each with its own IN placeholders.
+
+    .. versionadded:: 1.4.0
+    """
+    assert list(sql_database.chunk_bus_ids(["KL13N", "KL08B", "KL17Q"], 2)) == [
+        ("(?, ?)", ["KL13N", "KL08B"]),
+        ("(?)", ["KL17Q"]),
+    ]
+    assert list(sql_database.chunk_bus_ids([])) == []
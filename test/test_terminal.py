@@ -0,0 +1,97 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the trip state held by the ticketing machine.
+
+Included Functions:
+    [1] test_trip_state_counters_are_independent_after_reset
+    [2] test_trip_states_are_kept_per_bus
+    [3] test_ticket_deltas_add_up_across_sessions
+
+.. versionadded:: 1.4.0
+"""
+
+import threading
+
+from hardware import application_support_dictionary
+from hardware import terminal
+
+
+def test_trip_state_counters_are_independent_after_reset():
+    """
+    Test if the counters of a trip are updated separately, after a trip is reset.
+
+    .. versionadded:: 1.4.0
+    """
+    bus_stops = application_support_dictionary.all_routes["Route01"]
+    trip_state = terminal.TripState("KL13N", "Route01", len(bus_stops))
+
+    assert trip_state.record_ticket(1, 4, 2, 30, 1) == 2
+    trip_state.reset()
+    assert trip_state.record_ticket(2, 5, 3, 45, 1) == 0
+
+    assert trip_state.crowd_manager.segment_occupancy()[:5] == [0, 3, 3, 3, 0]
+    assert list(trip_state.boarding_tracker[:5]) == [0, 3, 0, 0, 0]
+    assert list(trip_state.deboarding_tracker[:5]) == [0, 0, 0, 0, 3]
+    assert trip_state.collection == 45
+    assert trip_state.passengers_aboard(3) == 3
+
+    trip_state.record_load_factor(3)
+    trip_state.summarize_trip(bus_stops)
+
+    assert trip_state.max_boarding_bus_stop == bus_stops[1]
+    assert trip_state.max_deboarding_bus_stop == bus_stops[4]
+
+
+def test_trip_states_are_kept_per_bus():
+    """
+    Test if each bus gets its own trip state, & a new unstarted trip on route change.
+
+    .. versionadded:: 1.4.0
+    """
+    first_bus_trip = terminal.get_trip_state("KL08B", "Route01", 9)
+    second_bus_trip = terminal.get_trip_state("KL17Q", "Route01", 9)
+
+    first_bus_trip.record_ticket(1, 2, 1, 15, 1)
+    first_bus_trip.is_started = True
+
+    assert terminal.get_trip_state("KL08B", "Route01", 9) is first_bus_trip
+    assert second_bus_trip.collection == 0
+    assert not second_bus_trip.is_started
+
+    rerouted_trip = terminal.get_trip_state("KL08B", "Route02", 9)
+    assert rerouted_trip is not first_bus_trip
+    assert rerouted_trip.collection == 0
+    assert not rerouted_trip.is_started
+
+
+def test_ticket_deltas_add_up_across_sessions():
+    """
+    Test if the changes returned to sessions printing at once, add up to the total.
+
+    .. versionadded:: 1.4.0
+    """
+    trip_state = terminal.TripState("KL13N", "Route01", 9)
+    passenger_deltas = []
+
+    def print_tickets():
+        for _ in range(200):
+            passenger_deltas.append(trip_state.record_ticket(2, 6, 1, 15, 3))
+
+    sessions = [threading.Thread(target=print_tickets) for _ in range(8)]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+
+    assert sum(passenger_deltas) == trip_state.passengers_aboard(3) == 1600
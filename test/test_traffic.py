@@ -0,0 +1,86 @@
+# Author: Ashwin Raj <thisisashwinraj@gmail.com>
+# License: Creative Commons Attribution - NonCommercial - NoDerivs License
+# Discussions-to: github.com/thisisashwinraj/CroMa-Crowd-Management-System/discussions
+
+# By exercising the Licensed Rights (defined in LICENSE), You accept and agree
+# to be bound by the terms and conditions of the Creative Commons
+# Attribution-NonCommercial-NoDerivatives 4.0 International Public License
+# ("Public License"). To the extent this Public License may be interpreted as
+# a contract, You are granted the Licensed Rights in consideration of Your
+# acceptance of the terms and conditions, and the Licensor grants You such
+# rights in consideration of benefits the Licensor receives from making the
+# Licensed Material available under terms and conditions described in LICENSE.
+"""
+This module contains the tests for the traffic level service of the application.
+
+Included Functions:
+    [1] test_traffic_level_is_refreshed_in_background
+    [2] test_circuit_breaker_serves_last_known_traffic_level
+
+.. versionadded:: 1.4.0
+"""
+
+import time
+import datetime
+
+from application.application_traffic import (
+    DEFAULT_TRAFFIC_LEVEL,
+    CircuitBreaker,
+    TrafficLevelService,
+)
+
+
+def test_traffic_level_is_refreshed_in_background():
+    """
+    Test if lookups don't wait for the API, & later lookups are served from cache.
+
+    .. versionadded:: 1.4.0
+    """
+    fetched_pairs = []
+
+    def fake_fetch(origin, destination):
+        fetched_pairs.append((origin, destination))
+        return 4200
+
+    service = TrafficLevelService(fetch_function=fake_fetch)
+    assert service.get_traffic_level("Kottayam", "Thrissur") == DEFAULT_TRAFFIC_LEVEL
+
+    deadline = time.monotonic() + 5.0
+    while service.get_traffic_level("Kottayam", "Thrissur") != 4200:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert service.get_traffic_level("Kottayam", "Thrissur") == 4200
+    assert fetched_pairs == [("Kottayam", "Thrissur")]
+
+
+def test_circuit_breaker_serves_last_known_traffic_level():
+    """
+    Test if the last known level is served, and API isn't called once circuit opens.
+
+    .. versionadded:: 1.4.0
+    """
+    current_time = [datetime.datetime(2023, 8, 1, 9, 0)]
+    responses = [5100, RuntimeError("quota exceeded"), RuntimeError("quota exceeded")]
+
+    def fake_fetch(origin, destination):  # pylint: disable=unused-argument
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    service = TrafficLevelService(
+        fetch_function=fake_fetch,
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60.0),
+        clock=lambda: current_time[0],
+    )
+    assert service.refresh("Kottayam", "Thrissur") == 5100
+
+    # Time-of-day bucket changes, and both refreshes of the new bucket fail
+    current_time[0] = datetime.datetime(2023, 8, 1, 10, 0)
+    assert service.refresh("Kottayam", "Thrissur") == 5100
+    assert service.refresh("Kottayam", "Thrissur") == 5100
+
+    assert not service.circuit_breaker.allow_request()
+    assert service.get_traffic_level("Kottayam", "Thrissur") == 5100
+    assert not responses